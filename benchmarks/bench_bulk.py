@@ -0,0 +1,307 @@
+"""Bulk actions on many selected tasks against the same actions one task at a time
+
+Usage: python benchmarks/bench_bulk.py [SELECTED ...]
+
+For each storage backend that takes change records, completes, reprioritises,
+deletes and moves a random selection out of a 10,000 task tree, shown in a
+tree view with every branch open. The bulk path makes the whole selection one
+undo step in one store batch, writes one batch record and updates the status
+label once; the other path does each task on its own, as a loop over the single task actions
+would. Times include the repaint and writing the records out, and both paths
+are checked to leave the same tasks on disk. A bulk action has to reach the
+view in at most BATCH_ROW_CHANGES + 1 updates per store batch, however many
+tasks are selected. The bulk action is then undone (in one step, as Ctrl+Z
+does), which has to bring back the tasks as they were.
+First counts the view updates of completing top-level tasks in a tree with
+most branches closed, as the selection usually is, and checks moving tasks
+on the Todo List page under a task in a branch that was never expanded and
+under one the search hides.
+"""
+import contextlib
+import copy
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PyQt6.QtWidgets import QApplication, QLabel, QTreeView  # noqa: E402
+
+from todo_model import TodoTreeModel  # noqa: E402
+from todo_session import TodoSession  # noqa: E402
+from todo_storage import JsonStorage, assign_todo_ids, open_storage  # noqa: E402
+from todo_store import TodoStore, walk  # noqa: E402
+from synthetic import generate_todos  # noqa: E402
+
+TASKS = 10_000
+ACTIONS = ["complete", "priority", "delete", "move"]
+# Store batches a bulk action makes: moving removes, then adds
+BATCHES = {"complete": 1, "priority": 1, "delete": 1, "move": 2}
+# View updates a store batch may send: a few one by one, then one layout change
+BATCH_UPDATES = TodoTreeModel.BATCH_ROW_CHANGES + 1
+
+
+class Page:
+    """A loaded session with an open view, as on the Todo List page"""
+
+    def __init__(self, app, directory, kind):
+        self.app = app
+        self.path = path = os.path.join(directory, f"todos-{kind}.json")
+        snapshot = JsonStorage(path)
+        todos = generate_todos(TASKS, breadth=6, depth=3, seed=1)
+        # As saved by the app, so what is on disk compares equal to the store
+        assign_todo_ids(todos)
+        snapshot.save(todos)
+        snapshot.close()
+        self.session = TodoSession.open(path, kind)
+        self.session.load()
+        self.store = self.session.store
+        self.model = TodoTreeModel(self.store)
+        self.view = QTreeView()
+        self.view.setModel(self.model)
+        self.view.setUniformRowHeights(True)
+        self.view.resize(1200, 800)
+        self.view.show()
+        # Every task with sub-items open, as expanding them one by one leaves
+        # it; expandAll() would also keep a persistent index for every leaf
+        for todo in walk(self.store.todos):
+            if todo.children:
+                index = self.model.index_of(todo)
+                self.model.fetchMore(index)
+                self.view.expand(index)
+        self.status = QLabel()
+        self.repaints = 0
+        self.model.dataChanged.connect(self.count_repaint)
+        self.model.rowsRemoved.connect(self.count_repaint)
+        self.model.rowsInserted.connect(self.count_repaint)
+        self.model.rowsMoved.connect(self.count_repaint)
+        self.model.layoutChanged.connect(self.count_repaint)
+        app.processEvents()
+
+    def count_repaint(self, *args):
+        self.repaints += 1
+
+    def perform(self, change):
+        # As the Todo List page makes every change: undoable, then saved
+        self.session.perform(change)
+
+    def update_status(self):
+        self.status.setText(f"Total: {self.store.total} | Completed: {self.store.completed}")
+
+    def selection(self, count, seed):
+        """A random selection of tasks, none inside another, as the tree view hands them over"""
+        rng = random.Random(seed)
+        ids = sorted(self.store.nodes)
+        todos = self.store.outermost([self.store.get(todo_id) for todo_id in rng.sample(ids, count)])
+        paths = self.store.paths_of(todos)
+        todos = [todo for _, todo in sorted(zip(paths, todos), key=lambda pair: pair[0])]
+        # Somewhere to move them to that is not being moved
+        moved = {todo.id for todo in walk(todos)}
+        target = next(todo for todo in self.store.todos if todo.id not in moved)
+        return todos, target
+
+    def finish(self):
+        self.app.processEvents()
+        if hasattr(self.session.storage, "flush"):
+            self.session.storage.flush()
+
+    def close(self):
+        self.session.close()
+        self.view.close()
+
+
+def removal_changes(store, todos):
+    # Last first, so the paths of the others still hold
+    return [{"op": "remove", "path": path} for path in sorted(store.paths_of(todos), reverse=True)]
+
+
+def run_bulk(page, action, todos, target):
+    store = page.store
+    if action == "complete":
+        changes = [{"op": "complete", "path": path, "completed": True} for path in store.paths_of(todos)]
+    elif action == "priority":
+        changes = [{"op": "edit", "path": path, "fields": {"priority": "Critical"}} for path in store.paths_of(todos)]
+    elif action == "delete":
+        changes = removal_changes(store, todos)
+    else:
+        with page.session.group():
+            page.perform({"op": "batch", "changes": removal_changes(store, todos)})
+            parent_path = store.path_of(target)
+            page.perform({"op": "batch", "changes": [
+                {"op": "add", "path": parent_path, "item": todo} for todo in todos]})
+        page.update_status()
+        return
+    page.perform({"op": "batch", "changes": changes})
+    page.update_status()
+
+
+def run_each(page, action, todos, target):
+    store = page.store
+    for todo in todos:
+        path = store.path_of(todo)
+        if action == "complete":
+            page.perform({"op": "complete", "path": path, "completed": True})
+        elif action == "priority":
+            page.perform({"op": "edit", "path": path, "fields": {"priority": "Critical"}})
+        elif action == "delete":
+            page.perform({"op": "remove", "path": path})
+        else:
+            page.perform({"op": "remove", "path": path})
+            page.perform({"op": "add", "path": store.path_of(target), "item": todo})
+        page.update_status()
+
+
+def measure(app, directory, kind, action, count, run, undo=False):
+    """Run an action and check the saved tasks; with undo, undo it again and time that too"""
+    page = Page(app, directory, kind)
+    todos, target = page.selection(count, seed=count)
+    before = copy.deepcopy(page.store.todos)
+    start = time.perf_counter()
+    run(page, action, todos, target)
+    page.finish()
+    elapsed = (time.perf_counter() - start) * 1000
+    after = copy.deepcopy(page.store.todos)
+    records, repaints = page.session.change_count, page.repaints
+    undone = None
+    if undo:
+        start = time.perf_counter()
+        page.session.undo()
+        page.update_status()
+        page.finish()
+        undone = (time.perf_counter() - start) * 1000
+        assert page.store.todos == before, f"{kind} {action}: undo left different tasks"
+    page.close()
+    # What ended up on disk
+    saved = open_storage(page.path, kind)
+    todos = saved.load()
+    saved.close()
+    assert todos == page.store.todos, f"{kind} {action}: saved tasks differ from the store"
+    return elapsed, undone, records, repaints, after
+
+
+def closed_branch_repaints(app, count):
+    """View updates for completing count top-level tasks with a few branches open, in a batch and not"""
+    updates = []
+    for batched in (True, False):
+        store = TodoStore()
+        store.reset(generate_todos(TASKS, breadth=6, depth=3, seed=1))
+        model = TodoTreeModel(store)
+        view = QTreeView()
+        view.setModel(model)
+        view.show()
+        for todo in store.todos[:40:8]:
+            index = model.index_of(todo)
+            model.fetchMore(index)
+            view.expand(index)
+        app.processEvents()
+        signals = []
+        model.dataChanged.connect(signals.append)
+        model.layoutChanged.connect(signals.append)
+        rows = sorted(random.Random(count).sample(range(len(store.todos)), count))
+        with store.batch() if batched else contextlib.nullcontext():
+            for row in rows:
+                store.set_completed([row], True)
+        app.processEvents()
+        updates.append(len(signals))
+        view.close()
+    print(f"{count} top-level tasks completed with 5 branches open: {updates[0]} view updates in a batch, "
+          f"{updates[1]} one by one")
+    assert updates[0] <= BATCH_UPDATES, f"a batch sent {updates[0]} view updates"
+
+
+def check_move_targets(app, directory):
+    """Move tasks on the Todo List page under a task in an unexpanded branch, then under a filtered out one"""
+    import main
+    from PyQt6.QtCore import QItemSelectionModel
+    from PyQt6.QtWidgets import QDialog
+
+    os.chdir(directory)
+    os.environ["XDG_CONFIG_HOME"] = os.path.join(directory, "config")
+    snapshot = JsonStorage("todos.json")
+    snapshot.save(generate_todos(TASKS, breadth=6, depth=3, seed=1))
+    snapshot.close()
+    page = main.TodoInterface()
+    page.resize(1200, 800)
+    page.show()
+    page.start_loader()
+    while page.loader is not None:
+        app.processEvents()
+    store, model, view = page.store, page.todo_model, page.todo_tree
+    target = None
+
+    class PickTarget:
+        # Stands in for the dialog: the user picks target
+        def __init__(self, *args):
+            pass
+
+        def exec(self):
+            return QDialog.DialogCode.Accepted
+
+        def target(self):
+            return target
+
+    def move(todos):
+        view.selectionModel().clearSelection()
+        for todo in todos:
+            view.selectionModel().select(model.index_of(todo), QItemSelectionModel.SelectionFlag.Select
+                                         | QItemSelectionModel.SelectionFlag.Rows)
+        page.move_selected()
+        app.processEvents()
+        assert all(store.parent_of(todo) is target for todo in todos), "tasks not moved under the target"
+
+    dialog, main.MoveTodosDialog = main.MoveTodosDialog, PickTarget
+    try:
+        # A task three levels down under the last root, none of it expanded yet
+        target = store.todos[-1].children[0].children[0]
+        assert model.index_of(target) is None
+        move(store.todos[:3])
+        index = model.index_of(target)
+        assert index is not None and view.isExpanded(index), "the target was not expanded"
+        # Only the searched for task is shown; the target is hidden
+        todo = store.todos[0]
+        page.search_box.setText(todo.text)
+        page.apply_filters()
+        target = store.todos[-2].children[0]
+        assert model.index_of(todo) is not None and model.index_of(target) is None
+        move([todo])
+    finally:
+        main.MoveTodosDialog = dialog
+    page.flush_todos()
+    saved = JsonStorage("todos.json")
+    todos = saved.load()
+    saved.close()
+    assert todos == store.todos, "the moves did not reach todos.json"
+    page.close()
+    os.chdir(ROOT)
+    print("moved under a task in an unexpanded branch and under a filtered out task: ok")
+
+
+def main():
+    app = QApplication(sys.argv)
+    closed_branch_repaints(app, 50)
+    with tempfile.TemporaryDirectory() as directory:
+        check_move_targets(app, directory)
+    counts = [int(arg) for arg in sys.argv[1:]] or [100, 1_000]
+    for kind in ("journal", "sqlite"):
+        for count in counts:
+            for action in ACTIONS:
+                with tempfile.TemporaryDirectory() as directory:
+                    bulk, undo, bulk_records, bulk_repaints, bulk_todos = measure(
+                        app, directory, kind, action, count, run_bulk, undo=True)
+                with tempfile.TemporaryDirectory() as directory:
+                    each, _, each_records, each_repaints, each_todos = measure(
+                        app, directory, kind, action, count, run_each)
+                assert bulk_todos == each_todos, f"{kind} {action}: bulk and one-by-one results differ"
+                assert bulk_repaints <= BATCH_UPDATES * BATCHES[action], \
+                    f"{kind} {action}: {bulk_repaints} view updates for one bulk action"
+                print(f"{kind:8} {action:9} {count:5} selected: bulk {bulk:8.1f} ms "
+                      f"({bulk_records} record, {bulk_repaints} view updates, undone in {undo:.1f} ms), "
+                      f"one by one {each:8.1f} ms ({each_records} records, {each_repaints} view updates)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Memory and time of undo history entries
+
+Usage: python benchmarks/bench_history.py [SIZE ...]
+
+Makes typical changes to a large tree through a TodoHistory and reports the
+estimated bytes each undo entry keeps against the estimated size of the whole
+tree (what a snapshot per step would cost). A removal keeps the removed tasks
+themselves, so its entry is as large as what it removed. Also times making
+each change, undoing it and redoing it, and checks that the undo gives back
+the exact tree the change started from and the redo the exact tree it made.
+Then checks that a small byte cap drops the oldest entries first.
+"""
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from todo_history import TodoHistory, change_size  # noqa: E402
+from todo_store import TodoStore, walk  # noqa: E402
+from synthetic import generate_todos  # noqa: E402
+
+
+def changes(store):
+    """(name, change record) pairs for the changes to measure, each made on the tree the last one left"""
+    root = store.todos[len(store.todos) // 2]
+    row = store.todos.index(root)
+    yield "edit one task", {"op": "edit", "path": [row, 0], "fields": {"text": "Renamed", "priority": "Critical"}}
+    yield f"complete a subtree of {1 + store.rollup(root).descendants}", {
+        "op": "complete", "path": [row], "completed": True}
+    yield "delete that subtree", {"op": "remove", "path": [row]}
+    paths = store.paths_of(list(walk(store.todos))[:1000])
+    yield f"reprioritise {len(paths)} tasks", {"op": "batch", "changes": [
+        {"op": "edit", "path": path, "fields": {"priority": "Low"}} for path in paths]}
+    yield f"clear {sum(todo.completed for todo in store.todos)} completed root tasks", {"op": "clear_completed"}
+    yield "clear all", {"op": "clear_all"}
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for size in sizes:
+        store = TodoStore()
+        store.reset(generate_todos(size, breadth=5, depth=4, completed_ratio=0.2))
+        history = TodoHistory(store, max_bytes=sys.maxsize)
+        tree_bytes = change_size(store.todos)
+        print(f"{size} tasks, about {tree_bytes / 1e6:.1f} MB as a tree:")
+        for name, change in changes(store):
+            before = copy.deepcopy(store.todos)
+            _, apply_ms = timed(lambda: history.apply(change))
+            after = copy.deepcopy(store.todos)
+            entry = history.undo_stack[-1][1]
+            _, undo_ms = timed(history.undo)
+            assert store.todos == before, f"undoing '{name}' left a different tree"
+            _, redo_ms = timed(history.redo)
+            assert store.todos == after, f"redoing '{name}' left a different tree"
+            print(f"  {name:36} entry {entry:>10,} bytes ({entry / tree_bytes:7.3%} of the tree), "
+                  f"apply {apply_ms:7.1f} ms, undo {undo_ms:7.1f} ms, redo {redo_ms:7.1f} ms")
+
+    # Oldest first eviction under a cap
+    store = TodoStore()
+    store.reset(generate_todos(1000, depth=0))
+    history = TodoHistory(store, max_bytes=64 * 1024)
+    for step in range(5000):
+        history.apply({"op": "edit", "path": [step % 1000], "fields": {"text": f"Edit {step}"}})
+    assert history.size <= history.max_bytes
+    kept = len(history.undo_stack)
+    oldest = history.undo_stack[0][0]
+    # The entries kept are those of the latest edits
+    assert oldest["path"] == [(5000 - kept) % 1000]
+    while history.can_undo():
+        history.undo()
+    assert store.todos[(5000 - kept) % 1000].text == oldest["fields"]["text"]
+    print(f"\n5000 edits under a {history.max_bytes // 1024} KB cap: the latest {kept} kept "
+          f"({history.size:,} bytes), all undone")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Memory per task of a loaded todo list, as dicts and as Todo nodes
+
+Usage: python benchmarks/bench_memory.py [SIZE ...]
+
+Parses a synthetic todos.json and measures (with tracemalloc) the bytes the
+list of dicts takes per task, then the bytes per task of the same list held
+as Todo nodes, with the time each takes to build and to write back. Writing
+the nodes has to give back the file as read, including for a sample of
+values the typed fields can't hold (odd dates and priorities, unknown keys).
+"""
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from todo_node import Todo, todos_from_dicts  # noqa: E402
+from todo_storage import gc_paused  # noqa: E402
+from synthetic import generate_todos  # noqa: E402
+
+# Values as an older or hand-edited file might hold them
+ODD_TODOS = [
+    {"text": "Old flag", "completed": 1, "priority": "Medium", "due_date": "", "create_date": "", "children": []},
+    {"text": "Unknown priority", "completed": False, "priority": "Urgent", "due_date": "2025-1-5",
+     "create_date": "2025-01-05T10:00:00", "children": [], "tags": ["work"]},
+    {"text": "Last day", "completed": False, "priority": "High", "due_date": "9999-12-31",
+     "create_date": "2025-01-05 10:00", "children": [
+         {"text": "Compact date", "completed": True, "priority": None, "due_date": "20250105",
+          "create_date": "", "children": [], "id": 7},
+     ]},
+]
+
+
+def measure(build):
+    """Return what build() made and the bytes it still holds"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    odd = json.dumps(todos_from_dicts(json.loads(json.dumps(ODD_TODOS))), default=Todo.to_json)
+    assert json.loads(odd) == ODD_TODOS, "odd values not kept"
+    print(f"{'tasks':>10} {'dict B/task':>12} {'node B/task':>12} {'convert (s)':>12} "
+          f"{'dump dicts (s)':>15} {'dump nodes (s)':>15}")
+    for size in sizes:
+        text = json.dumps(generate_todos(size))
+        dicts, dict_bytes = measure(lambda: json.loads(text))
+        # The dicts are let go as soon as they are converted, as on loading
+        nodes, node_bytes = measure(lambda: todos_from_dicts(json.loads(text)))
+        with gc_paused():
+            # As the storages convert on loading
+            convert = timed(lambda: todos_from_dicts(dicts))
+        dump_dicts = timed(lambda: json.dumps(dicts))
+        dump_nodes = timed(lambda: json.dumps(nodes, default=Todo.to_json))
+        assert json.dumps(nodes, default=Todo.to_json) == text, "nodes don't write back the file as read"
+        print(f"{size:>10} {dict_bytes / size:>12.0f} {node_bytes / size:>12.0f} {convert:>12.3f} "
+              f"{dump_dicts:>15.3f} {dump_nodes:>15.3f}")
+        del dicts, nodes
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Reminder scheduler driven by a simulated clock
+
+Usage: python benchmarks/bench_reminders.py [SIZE ...]
+
+Runs the scheduler over 60 simulated days of random edits and completions,
+jumping the clock to each moment its timer is armed for, and checks every
+reminder against the tasks: each open task is reported due on its due day
+and overdue after it, once, and the timer is never armed past the next
+reminder. Then times loading the heap and re-arming it on edits and
+completions, which should not grow with the number of tasks.
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QCoreApplication  # noqa: E402
+
+from todo_reminders import ReminderScheduler  # noqa: E402
+from todo_store import TodoStore, walk  # noqa: E402
+from synthetic import generate_todos  # noqa: E402
+
+START = datetime(2025, 1, 1, 9, 30)
+DAYS = 60
+
+
+class SimulatedClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def expected_reminder(todo, today):
+    """The reminder an open task should have been given by today: "due", "overdue" or None"""
+    if todo.completed or not todo["due_date"]:
+        return None
+    due = date.fromisoformat(todo["due_date"])
+    if due == today:
+        return "due"
+    if due < today:
+        return "overdue"
+    return None
+
+
+def simulate(size, seed):
+    rng = random.Random(seed)
+    store = TodoStore()
+    clock = SimulatedClock(START)
+    scheduler = ReminderScheduler(store, clock)
+    # id -> reminders given since the task's due date was set or it was reopened
+    reported = {}
+    # Reminders that are already due when loading are given all at once
+    store.reset(generate_todos(size, completed_ratio=0.3, date_spread_days=30, seed=seed))
+
+    def on_due(due, overdue):
+        for kind, todos in (("due", due), ("overdue", overdue)):
+            for todo in todos:
+                assert expected_reminder(todo, clock().date()) == kind, (todo, kind, clock())
+                given = reported.setdefault(todo.id, set())
+                assert kind not in given, f"task {todo.id} reported {kind} twice"
+                given.add(kind)
+
+    scheduler.remindersDue.connect(on_due)
+    scheduler.start()
+    ids = list(store.nodes)
+    checks = 0
+    end = START + timedelta(days=DAYS)
+    while clock.now < end:
+        today = clock().date()
+        # Nothing due by now is left unreported
+        for todo in store.nodes.values():
+            expected = expected_reminder(todo, today)
+            assert expected is None or expected in reported.get(todo.id, ()), (todo, today)
+        # The timer wakes up no later than the start of the next reminder day
+        next_day = scheduler.queue.next_day()
+        assert scheduler.timer.isActive() or next_day is None
+        wake = clock.now + timedelta(milliseconds=scheduler.timer.interval())
+        assert next_day is None or wake <= datetime.combine(date.fromordinal(next_day), datetime.min.time()), wake
+        # Some edits and completions before the timer fires
+        for _ in range(rng.randrange(4)):
+            todo = store.get(rng.choice(ids))
+            path = store.path_of(todo)
+            if rng.random() < 0.5:
+                due = (today + timedelta(days=rng.randrange(-2, 5))).isoformat()
+                if due != todo["due_date"]:
+                    # A new due date is reminded of afresh
+                    reported.pop(todo.id, None)
+                store.update(path, {"due_date": due})
+            else:
+                completed = not todo.completed
+                # So is a reopened task, and its reopened subtasks
+                for sub in walk([todo]):
+                    if sub.completed != completed:
+                        reported.pop(sub.id, None)
+                store.set_completed(path, completed)
+            wake = clock.now + timedelta(milliseconds=scheduler.timer.interval())
+        clock.now = max(clock.now, wake)
+        scheduler.check()
+        checks += 1
+    return checks, len(reported)
+
+
+def main():
+    app = QCoreApplication(sys.argv)  # noqa: F841 - timers need an application
+    for seed in range(3):
+        checks, reported = simulate(300, seed)
+        print(f"simulation {seed}: {checks} timer wake-ups over {DAYS} days, {reported} tasks reported, ok")
+    print()
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for size in sizes:
+        store = TodoStore()
+        scheduler = ReminderScheduler(store, SimulatedClock(START))
+        todos = generate_todos(size, date_spread_days=365)
+        start = time.perf_counter()
+        store.reset(todos)
+        load = time.perf_counter() - start
+        scheduler.start()
+        rng = random.Random(0)
+        paths = [store.path_of(store.get(todo_id)) for todo_id in rng.sample(list(store.nodes), 1000)]
+        start = time.perf_counter()
+        for path in paths:
+            day = START.date() + timedelta(days=rng.randrange(365))
+            store.update(path, {"due_date": day.isoformat()})
+        edit = (time.perf_counter() - start) * 1e6 / len(paths)
+        start = time.perf_counter()
+        for path in paths:
+            store.set_completed(path, True)
+        complete = (time.perf_counter() - start) * 1e6 / len(paths)
+        print(f"{size} tasks: heap of {scheduler.queue.live} built on load in {load:.2f} s, "
+              f"edit {edit:.1f} us, completion {complete:.1f} us (store update included)")
+
+
+if __name__ == "__main__":
+    main()
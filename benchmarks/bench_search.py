@@ -0,0 +1,197 @@
+"""Search and quick filter latency of the indexes against a scan of every task
+
+Usage: python benchmarks/bench_search.py [SIZE ...]
+
+A query or filter should stay under one 60 Hz frame (16.7 ms) on 100k tasks.
+Then times the whole path on the Todo List page (offscreen unless
+QT_QPA_PLATFORM says otherwise): from the search box's timer or a quick
+filter firing to the tree repainted with the rows that match, expanded
+where the matches are. That lays out every top-level row the filter shows,
+so it gets a quarter of a second rather than a frame. The benchmark fails
+if anything takes longer than its budget.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from todo_search import QuickFilter, TodoFieldIndex, TodoSearchIndex  # noqa: E402
+from todo_store import TodoStore  # noqa: E402
+from synthetic import generate_todos  # noqa: E402
+
+FRAME_MS = 1000 / 60
+PAGE_MS = 250
+# From rare to matching nearly everything; the two-letter one can't use trigrams
+QUERIES = ["task 4217", "ship", "review", "42", "task", "no such task"]
+# The synthetic due dates fall in the first half of 2025
+TODAY = date(2025, 2, 15)
+QUICK_FILTERS = {
+    "open": QuickFilter(hide_completed=True),
+    "high+": QuickFilter(min_priority=3),
+    "overdue": QuickFilter(overdue=True),
+    "due in 7d": QuickFilter(due_within=7),
+    "open critical 7d": QuickFilter(hide_completed=True, min_priority=4, due_within=7),
+}
+
+
+def timed(function, *args, repeats=5):
+    """Return the result of function(*args) and its best time in ms"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def scan(store, query):
+    query = query.casefold()
+    return {todo_id for todo_id, todo in store.nodes.items() if query in todo.text.casefold()}
+
+
+def scan_fields(store, quick_filter):
+    return {todo_id for todo_id, todo in store.nodes.items() if TodoFieldIndex.accepts(quick_filter, todo, TODAY)}
+
+
+def set_quick_filter(page, quick_filter):
+    """Set the filter options of the page to a QuickFilter without applying it"""
+    from todo_storage import PRIORITY_ORDER
+
+    widgets = (page.hide_completed_check, page.overdue_check, page.min_priority_combo, page.due_within_check,
+               page.due_within_spin)
+    for widget in widgets:
+        widget.blockSignals(True)
+    page.hide_completed_check.setChecked(quick_filter.hide_completed)
+    page.overdue_check.setChecked(quick_filter.overdue)
+    min_priority = quick_filter.min_priority
+    page.min_priority_combo.setCurrentIndex(min_priority - PRIORITY_ORDER["Low"] if min_priority else 0)
+    page.due_within_check.setChecked(quick_filter.due_within is not None)
+    if quick_filter.due_within is not None:
+        page.due_within_spin.setValue(quick_filter.due_within)
+    for widget in widgets:
+        widget.blockSignals(False)
+
+
+def view_latencies(app, size, slow):
+    """Time filtering the Todo List page on size tasks until the tree has been repainted
+
+    Adds a line to slow for each case over PAGE_MS.
+    """
+    import main
+    from todo_storage import JsonStorage
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        os.environ["XDG_CONFIG_HOME"] = os.path.join(directory, "config")
+        storage = JsonStorage("todos.json")
+        storage.save(generate_todos(size))
+        storage.close()
+        page = main.TodoInterface()
+        page.resize(1200, 800)
+        page.show()
+        page.start_loader()
+        while page.loader is not None:
+            app.processEvents()
+        # Built on first use, and timed above
+        page.search_index.search("")
+        page.field_index.select(QuickFilter(hide_completed=True), TODAY)
+
+        def painted(apply):
+            start = time.perf_counter()
+            apply()
+            app.processEvents()
+            page.todo_tree.viewport().repaint()
+            return (time.perf_counter() - start) * 1000
+
+        def search(query):
+            page.search_box.setText(query)
+            # What the search box's timer calls once typing pauses
+            page.apply_filters()
+
+        print(f"{'page':>18} {'top rows':>8} {'painted (ms)':>13} {'budget':>6}")
+        latencies = []
+        cases = [(repr(query), lambda query=query: search(query)) for query in QUERIES]
+        cases.append(("no search", lambda: search("")))
+        for name, quick_filter in QUICK_FILTERS.items():
+            cases.append((name, lambda quick_filter=quick_filter: (set_quick_filter(page, quick_filter),
+                                                                   page.apply_filters())))
+        for name, apply in cases:
+            elapsed = painted(apply)
+            latencies.append(elapsed)
+            print(f"{name:>18} {page.todo_model.rowCount():>8} {elapsed:>13.2f} "
+                  f"{'ok' if elapsed < PAGE_MS else 'SLOW':>6}")
+            if elapsed >= PAGE_MS:
+                slow.append(f"{size} tasks, page {name}: {elapsed:.2f} ms")
+        page.flush_todos()
+        page.deleteLater()
+        app.processEvents()
+        os.chdir(ROOT)
+    print(f"median on the page {statistics.median(latencies):.2f} ms, worst {max(latencies):.2f} ms\n")
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication(sys.argv)  # For the timings on the page
+    slow = []
+    for size in sizes:
+        store = TodoStore()
+        store.reset(generate_todos(size))
+        index = TodoSearchIndex(store)
+        start = time.perf_counter()
+        index.search("")
+        build = time.perf_counter() - start
+        print(f"{size} tasks, index built in {build:.2f} s")
+        print(f"{'query':>14} {'matches':>8} {'index (ms)':>11} {'scan (ms)':>10} {'frame':>6}")
+        latencies = []
+        for query in QUERIES:
+            found, indexed = timed(index.search, query)
+            expected, scanned = timed(scan, store, query, repeats=1)
+            assert found == expected, query
+            latencies.append(indexed)
+            print(f"{query!r:>14} {len(found):>8} {indexed:>11.2f} {scanned:>10.2f} "
+                  f"{'ok' if indexed < FRAME_MS else 'SLOW':>6}")
+            if indexed >= FRAME_MS:
+                slow.append(f"{size} tasks, query {query!r}: {indexed:.2f} ms")
+
+        fields = TodoFieldIndex(store)
+        start = time.perf_counter()
+        fields.select(QuickFilter(hide_completed=True), TODAY)
+        build = time.perf_counter() - start
+        print(f"field index built in {build:.2f} s")
+        print(f"{'filter':>18} {'matches':>8} {'index (ms)':>11} {'scan (ms)':>10} {'frame':>6}")
+        for name, quick_filter in QUICK_FILTERS.items():
+            found, indexed = timed(fields.select, quick_filter, TODAY)
+            expected, scanned = timed(scan_fields, store, quick_filter, repeats=1)
+            assert found == expected, name
+            latencies.append(indexed)
+            print(f"{name:>18} {len(found):>8} {indexed:>11.2f} {scanned:>10.2f} "
+                  f"{'ok' if indexed < FRAME_MS else 'SLOW':>6}")
+            if indexed >= FRAME_MS:
+                slow.append(f"{size} tasks, filter {name}: {indexed:.2f} ms")
+
+        # Keeping the index current: add, edit and remove one task
+        todo = {"text": "Benchmark task", "completed": False, "priority": "Medium",
+                "due_date": "", "create_date": "", "children": []}
+        start = time.perf_counter()
+        row = store.insert([], todo)
+        store.update([row], {"text": "Benchmark task, edited", "priority": "High", "due_date": "2025-02-20"})
+        store.set_completed([row], True)
+        store.remove([row])
+        update = (time.perf_counter() - start) * 1000
+        print(f"median query {statistics.median(latencies):.2f} ms, worst {max(latencies):.2f} ms, "
+              f"add + edit + complete + remove {update:.2f} ms")
+        view_latencies(app, size, slow)
+    if slow:
+        sys.exit("Over budget:\n" + "\n".join(slow))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""The todo list core on its own, without Qt
+
+Usage: python benchmarks/bench_session.py [SIZE ...]
+
+Opens a synthetic todo list with each storage backend through TodoSession,
+as a batch job would, and times loading it, a run of single task changes
+saved one by one, undoing all of them and closing (which writes whatever a
+whole-file backend still holds). Undoing has to give back the list as
+generated, the list read back afterwards has to match the store, and PyQt6
+must never have been imported.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from todo_node import todos_from_dicts  # noqa: E402
+from todo_session import TodoSession  # noqa: E402
+from todo_storage import JsonStorage, assign_todo_ids  # noqa: E402
+from synthetic import generate_todos  # noqa: E402
+
+CHANGES = 1000
+
+
+def changes(store, rng):
+    """Random single task changes, each made on the tree the last one left"""
+    # Drawn up front so picking a task doesn't count towards the time
+    ids = rng.sample(sorted(store.nodes), CHANGES)
+    for step, todo_id in enumerate(ids):
+        todo = store.nodes.get(todo_id)
+        if todo is None:
+            # Went with a removed subtree
+            continue
+        path = store.path_of(todo)
+        kind = step % 4
+        if kind == 0:
+            yield {"op": "edit", "path": path, "fields": {"text": f"Edited {step}", "priority": "High"}}
+        elif kind == 1:
+            yield {"op": "complete", "path": path, "completed": not todo.completed}
+        elif kind == 2:
+            yield {"op": "add", "path": path, "item": {
+                "text": f"Added {step}", "completed": False, "priority": "Low", "due_date": "",
+                "create_date": "2025-01-01 00:00:00", "children": []}}
+        else:
+            yield {"op": "remove", "path": path}
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for size in sizes:
+        todos = generate_todos(size, breadth=5, depth=3)
+        assign_todo_ids(todos)
+        # As the store holds them, to compare with
+        todos = todos_from_dicts(todos)
+        for kind in ("json", "journal", "sqlite"):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "todos.json")
+                snapshot = JsonStorage(path)
+                snapshot.save(todos)
+                snapshot.close()
+                session = TodoSession.open(path, kind)
+                load_ms = timed(session.load)
+                store = session.store
+                rng = random.Random(size)
+
+                def perform_all():
+                    for change in changes(store, rng):
+                        session.perform(change)
+
+                change_ms = timed(perform_all)
+
+                def undo_all():
+                    while session.history.can_undo():
+                        session.undo()
+
+                undo_ms = timed(undo_all)
+                close_ms = timed(session.close)
+                saved = TodoSession.open(path, kind)
+                saved.load()
+                saved.close()
+                assert saved.store.todos == store.todos, f"{kind}: saved tasks differ from the store"
+                assert store.todos == todos, f"{kind}: undoing every change left different tasks"
+                print(f"{size:7} tasks {kind:8} load {load_ms:8.1f} ms, {CHANGES} changes {change_ms:8.1f} ms, "
+                      f"undone {undo_ms:8.1f} ms, close {close_ms:8.1f} ms")
+    assert "PyQt6" not in sys.modules, "the todo list core imported Qt"
+
+
+if __name__ == "__main__":
+    main()
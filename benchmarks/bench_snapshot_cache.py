@@ -0,0 +1,49 @@
+"""Cold start with and without the binary snapshot cache
+
+Usage: python benchmarks/bench_snapshot_cache.py [SIZE ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from todo_storage import JsonStorage, dump_document  # noqa: E402
+from synthetic import generate_todos  # noqa: E402
+
+
+def cold_start(path):
+    """Time JsonStorage.load() on a current-version file"""
+    storage = JsonStorage(path)
+    start = time.perf_counter()
+    storage.load()
+    elapsed = time.perf_counter() - start
+    storage.writer.close()
+    return elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    print(f"{'tasks':>10} {'json (s)':>10} {'cache (s)':>10} {'speedup':>8} {'json MB':>8} {'cache MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"todos-{size}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(dump_document(generate_todos(size)))
+            storage = JsonStorage(path)
+            repeats = 3 if size < 1_000_000 else 1
+
+            without = min(cold_start(path) for _ in range(repeats))
+            storage.cache.write(path, storage.load())
+            storage.writer.close()
+            with_cache = min(cold_start(path) for _ in range(repeats))
+
+            json_mb = os.path.getsize(path) / 1e6
+            cache_mb = os.path.getsize(storage.cache.path) / 1e6
+            print(f"{size:>10} {without:>10.3f} {with_cache:>10.3f} {without / with_cache:>7.1f}x "
+                  f"{json_mb:>8.1f} {cache_mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Startup time of the app: imports, first paint and time to interactive
+
+Usage: python benchmarks/bench_startup.py [SIZE ...]
+
+Starts the app in a fresh interpreter on a synthetic todos.json of each
+size (offscreen unless QT_QPA_PLATFORM says otherwise; TODO_STORAGE picks
+the backend as usual) and reports, in ms since the interpreter started
+running the script:
+- import: main and everything it imports loaded
+- window: TodoApp built
+- paint: the Todo List page first painted
+- interactive: every task loaded and editing enabled again
+The first start reads todos.json itself; the later ones can use the
+snapshot cache the one before left, as a restart does.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+START = time.perf_counter()
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RESTARTS = 3
+MARKS = ("import", "window", "paint", "interactive")
+
+
+def run_app():
+    """Start the app, wait until it is interactive and print the marks as JSON"""
+    marks = {}
+
+    def mark(name):
+        marks.setdefault(name, (time.perf_counter() - START) * 1000)
+
+    import main
+    from PyQt6.QtCore import QEvent, QObject
+    from PyQt6.QtWidgets import QApplication
+    mark("import")
+
+    app = QApplication(sys.argv)
+    window = main.TodoApp()
+    mark("window")
+    page = window.todo_interface
+
+    class FirstPaint(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Type.Paint:
+                mark("paint")
+            return False
+
+    first_paint = FirstPaint()
+    page.installEventFilter(first_paint)
+    finish_loading = page.finish_loading
+
+    def finished():
+        finish_loading()
+        mark("interactive")
+        app.quit()
+
+    page.finish_loading = finished
+    window.show()
+    app.exec()
+    # Saves nothing (nothing changed) but writes the snapshot cache
+    window.close()
+    print(json.dumps(marks))
+
+
+def start(directory):
+    env = dict(os.environ, XDG_CONFIG_HOME=os.path.join(directory, "config"))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--run"], cwd=directory, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    from todo_storage import JsonStorage
+    from synthetic import generate_todos
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    print(f"{'tasks':>8} {'start':>8} " + " ".join(f"{mark:>12}" for mark in MARKS))
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            storage = JsonStorage(os.path.join(directory, "todos.json"))
+            storage.save(generate_todos(size))
+            storage.writer.close()
+            first = start(directory)
+            restarts = [start(directory) for _ in range(RESTARTS)]
+        for name, marks in (("first", first), ("restart", {
+                mark: statistics.median(run[mark] for run in restarts) for mark in MARKS})):
+            print(f"{size:>8} {name:>8} " + " ".join(f"{marks[mark]:>9.0f} ms" for mark in MARKS))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--run"]:
+        run_app()
+    else:
+        main()
@@ -0,0 +1,137 @@
+"""Statistics panel queries over the columns against a walk over the tree
+
+Usage: python benchmarks/bench_stats.py [SIZE ...]
+
+Builds the TodoColumns of a synthetic tree and times a full TodoStats query
+with NumPy (when installed) and with the plain Python reductions, against
+computing the same numbers with a walk over every todo. Then times keeping
+the columns current through edits, completions, additions and removals, and
+checks both query paths against the walk after them.
+"""
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import todo_stats  # noqa: E402
+from todo_stats import DUE_SOON_DAYS, WEEKS, TodoColumns, week_of  # noqa: E402
+from todo_store import TodoStore  # noqa: E402
+from synthetic import generate_todos  # noqa: E402
+
+# The synthetic dates fall in the first half of 2025
+TODAY = date(2025, 2, 15)
+CHANGES = 1000
+
+
+def walk_stats(store, today):
+    """The numbers of a TodoStats, from a walk over the tree"""
+    today = today.toordinal()
+    total = completed = overdue = due_soon = 0
+    open_by_priority = Counter()
+    by_depth = Counter()
+    weeks = Counter()
+    pending = [(todo, 0) for todo in store.todos]
+    while pending:
+        todo, depth = pending.pop()
+        total += 1
+        by_depth[depth] += 1
+        if todo.created:
+            weeks[week_of(todo.created // 86400)] += 1
+        if todo.completed:
+            completed += 1
+        else:
+            open_by_priority[todo.priority] += 1
+            overdue += todo.due < today
+            due_soon += today <= todo.due <= today + DUE_SOON_DAYS
+        pending.extend((child, depth + 1) for child in todo.children)
+    first_week = week_of(today) - WEEKS + 1
+    return (total, completed, {priority: count for priority, count in open_by_priority.items() if count},
+            overdue, due_soon, tuple(by_depth[depth] for depth in range(len(by_depth))),
+            tuple(weeks[first_week + week] for week in range(WEEKS)))
+
+
+def numbers(stats):
+    """The numbers of a TodoStats, as walk_stats() gives them"""
+    return (stats.total, stats.completed,
+            {priority: count for priority, count in stats.open_by_priority.items() if count},
+            stats.overdue, stats.due_soon, stats.by_depth, tuple(count for _, count in stats.created_per_week))
+
+
+def python_stats(columns, today):
+    numpy, todo_stats.numpy = todo_stats.numpy, None
+    try:
+        return columns.stats(today)
+    finally:
+        todo_stats.numpy = numpy
+
+
+def timed(function, *args, repeats=5):
+    """Return the result of function(*args) and its best time in ms"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def changes(store, rng):
+    """Make random single task changes on the store"""
+    ids = rng.sample(sorted(store.nodes), CHANGES)
+    for step, todo_id in enumerate(ids):
+        todo = store.nodes.get(todo_id)
+        if todo is None:
+            continue
+        path = store.path_of(todo)
+        kind = step % 4
+        if kind == 0:
+            store.update(path, {"priority": "Critical", "due_date": "2025-02-17"})
+        elif kind == 1:
+            store.set_completed(path, not todo.completed)
+        elif kind == 2:
+            store.insert(path, {"text": f"Added {step}", "create_date": "2025-02-14 09:00:00", "due_date": "2025-02-10"})
+        else:
+            store.remove(path)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    if todo_stats.numpy is None:
+        print("NumPy is not installed; only the Python reductions are timed")
+    for size in sizes:
+        store = TodoStore()
+        store.reset(generate_todos(size, breadth=5, depth=4))
+        columns = TodoColumns(store)
+        _, build_ms = timed(columns.stats, TODAY, repeats=1)
+        expected, walk_ms = timed(walk_stats, store, TODAY, repeats=3)
+        line = f"{size:>9} tasks: columns built in {build_ms:7.1f} ms, walk {walk_ms:7.1f} ms"
+        if todo_stats.numpy is not None:
+            stats, numpy_ms = timed(columns.stats, TODAY)
+            assert numbers(stats) == expected, "NumPy statistics differ from the walk"
+            line += f", NumPy {numpy_ms:6.1f} ms"
+        stats, python_ms = timed(python_stats, columns, TODAY, repeats=3)
+        assert numbers(stats) == expected, "Python statistics differ from the walk"
+        line += f", Python {python_ms:6.1f} ms"
+        rng = random.Random(size)
+        start = time.perf_counter()
+        changes(store, rng)
+        change_us = (time.perf_counter() - start) * 1e6 / CHANGES
+        # The same changes without columns listening, to tell their share
+        bare = TodoStore()
+        bare.reset(generate_todos(size, breadth=5, depth=4))
+        start = time.perf_counter()
+        changes(bare, random.Random(size))
+        bare_us = (time.perf_counter() - start) * 1e6 / CHANGES
+        expected = walk_stats(store, TODAY)
+        assert numbers(columns.stats(TODAY)) == expected, "statistics differ from the walk after changes"
+        assert numbers(python_stats(columns, TODAY)) == expected, "statistics differ from the walk after changes"
+        print(f"{line}; a change {change_us:.1f} us with the columns, {bare_us:.1f} us without")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""The Todo List page end to end, headless, with results saved as JSON
+
+Usage: python benchmarks/bench_suite.py [--output FILE] [--compare FILE]
+                                         [--breadth N] [--depth N] [--completed-ratio R]
+                                         [--date-spread DAYS] [SIZE ...]
+
+For each size (1k, 10k and 100k tasks by default) starts a fresh interpreter
+that opens the Todo List page on a synthetic todos.json under the offscreen
+Qt platform (TODO_STORAGE picks the backend as usual) and times, in ms:
+- load_todos: streaming the whole list into a new page until editing is
+  enabled again
+- ensure_todo_fields: the field migration over the decoded list
+- rebuild_tree: the store reset with the same list, which rebuilds the model
+  and view (what populate_tree_items / update_todo_tree used to do)
+- sort_todos:<criterion>: sorting the view by each sort criterion
+- update_status: one status bar update
+- save_todos: saving the whole list, including the background write
+- complete_subtree / reopen_subtree: toggling the largest root task
+- clear_completed: removing the completed root tasks
+and the peak resident set size of the process (not measured on Windows).
+The results go to FILE (bench_suite.json by default) with the commit, the
+versions and the tree parameters; --compare prints each number against an
+earlier results file, so a regression between versions stands out.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SORT_CRITERIA = ["Create Date", "Priority", "Due Date", "Name"]
+STATUS_REPEATS = 100
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, None where it can't be read"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+
+
+def run_size(size, tree):
+    """Time the steps on a page with size tasks (in a scratch directory) and print the results as JSON"""
+    from PyQt6.QtWidgets import QApplication
+
+    import main
+    from todo_storage import JsonStorage, dump_document, ensure_todo_fields
+    from synthetic import generate_todos
+
+    timings = {}
+    app = QApplication(sys.argv)
+
+    def timed(name, function, *args):
+        start = time.perf_counter()
+        function(*args)
+        # Whatever the step left for the event loop (repaints, queued batches)
+        app.processEvents()
+        timings[name] = (time.perf_counter() - start) * 1000
+
+    def wait_until_loaded():
+        while page.loader is not None:
+            app.processEvents()
+
+    def wait_for_storage():
+        # The json and journal backends write on a thread of their own
+        storage = page.storage
+        if hasattr(storage, "writer"):
+            storage.writer.flush()
+        elif hasattr(storage, "flush"):
+            storage.flush()
+
+    todos = generate_todos(size, **tree)
+    text = dump_document(todos)
+    storage = JsonStorage("todos.json")
+    storage.save(todos)
+    storage.close()
+    del todos, storage
+
+    # The first page migrates the file to the backend's own format; a page
+    # loads only once, so the one timed is the next
+    page = main.TodoInterface()
+    page.start_loader()
+    wait_until_loaded()
+    page.flush_todos()
+    page.deleteLater()
+    app.processEvents()
+
+    # The constructor calls load_todos, which starts the loader on first paint
+    page = main.TodoInterface()
+    page.resize(1200, 800)
+    page.show()
+
+    def load():
+        page.start_loader()
+        wait_until_loaded()
+
+    timed("load_todos", load)
+    timed("ensure_todo_fields", ensure_todo_fields, json.loads(text)["todos"])
+    del text
+    timed("rebuild_tree", page.store.reset, list(page.store.todos))
+    for criterion in SORT_CRITERIA:
+        page.sort_combo.blockSignals(True)
+        page.sort_combo.setCurrentText(criterion)
+        page.sort_combo.blockSignals(False)
+        timed(f"sort_todos:{criterion}", page.sort_todos)
+
+    def update_status():
+        for _ in range(STATUS_REPEATS):
+            page.update_status()
+
+    timed("update_status", update_status)
+    timings["update_status"] /= STATUS_REPEATS
+
+    def save():
+        page.save_todos()
+        wait_for_storage()
+
+    timed("save_todos", save)
+    largest = max(page.store.todos, key=lambda todo: page.store.rollup(todo).descendants)
+    index = page.todo_model.index_of(largest)
+    for name, completed in (("complete_subtree", True), ("reopen_subtree", False)):
+        timed(name, page.on_todo_checked, index, completed)
+    wait_for_storage()
+    timed("clear_completed", page.clear_completed)
+    wait_for_storage()
+    page.flush_todos()
+    print(json.dumps({"tasks": size, "timings_ms": timings, "peak_rss_mb": peak_rss_mb()}))
+
+
+def run_in_child(size, tree):
+    """Run one size in a fresh interpreter and scratch directory; return its results"""
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, XDG_CONFIG_HOME=os.path.join(directory, "config"))
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run", str(size), json.dumps(tree)],
+            cwd=directory, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            sys.exit(f"{size} tasks failed:\n{result.stderr}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def describe():
+    """What the results were measured on"""
+    from PyQt6.QtCore import QT_VERSION_STR
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "platform": platform.platform(),
+        "storage": os.getenv("TODO_STORAGE", "").strip() or "json",
+    }
+
+
+def print_results(results, baseline):
+    """Print a table of the results, with each number over its baseline one where there is one"""
+    earlier = {entry["tasks"]: entry for entry in baseline["results"]} if baseline else {}
+    for entry in results:
+        before = earlier.get(entry["tasks"])
+        print(f"{entry['tasks']} tasks:")
+        rows = list(entry["timings_ms"].items()) + [("peak RSS (MB)", entry["peak_rss_mb"])]
+        for name, value in rows:
+            if value is None:
+                print(f"  {name:28} {'-':>10}")
+                continue
+            line = f"  {name:28} {value:10.2f}"
+            if before is not None:
+                old = before["peak_rss_mb"] if name == "peak RSS (MB)" else before["timings_ms"].get(name)
+                if old:
+                    line += f"  {value / old:6.2f}x of {old:.2f}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the Todo List page headless and save the results as JSON")
+    parser.add_argument("sizes", nargs="*", type=int, default=[1_000, 10_000, 100_000])
+    parser.add_argument("--output", default="bench_suite.json", help="where to write the results")
+    parser.add_argument("--compare", help="earlier results to compare with")
+    parser.add_argument("--breadth", type=int, default=5)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--completed-ratio", type=float, default=0.3)
+    parser.add_argument("--date-spread", type=int, default=90, help="days the create and due dates spread over")
+    args = parser.parse_args()
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    tree = {"breadth": args.breadth, "depth": args.depth, "completed_ratio": args.completed_ratio,
+            "date_spread_days": args.date_spread}
+    report = {**describe(), "tree": tree, "results": [run_in_child(size, tree) for size in args.sizes]}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_results(report["results"], baseline)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        run_size(int(sys.argv[2]), json.loads(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,84 @@
+"""Cost of completing a large subtree, and many tasks at once, in an open tree view
+
+Usage: python benchmarks/bench_toggle.py [SUBTREE_SIZE ...]
+
+Every row of the subtree is fetched (the whole tree is expanded), so each of
+them has to be repainted. Counts the updates the view gets (dataChanged and
+layout changes), which have to stay within one store batch's worth however
+large the subtree, and times the store update plus the repaint that follows
+(best of three).
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication, QTreeView  # noqa: E402
+
+from todo_model import TodoTreeModel  # noqa: E402
+from todo_store import TodoStore  # noqa: E402
+from synthetic import generate_todos  # noqa: E402
+
+REPEATS = 3
+
+
+def timed(app, function):
+    start = time.perf_counter()
+    function()
+    app.processEvents()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    app = QApplication(sys.argv)
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 5_000]
+    for size in sizes:
+        store = TodoStore()
+        root = generate_todos(1, seed=1)[0]
+        root["children"] = generate_todos(size - 1, breadth=8, depth=4, completed_ratio=0)
+        store.reset([root])
+        model = TodoTreeModel(store)
+        view = QTreeView()
+        view.setModel(model)
+        # As the Todo List page sets it
+        view.setUniformRowHeights(True)
+        view.resize(1200, 800)
+        view.show()
+        view.expandAll()
+        app.processEvents()
+        signals = []
+        model.dataChanged.connect(lambda *args: signals.append(args))
+        model.layoutChanged.connect(lambda *args: signals.append(args))
+
+        complete = reopen = float("inf")
+        for _ in range(REPEATS):
+            signals.clear()
+            complete = min(complete, timed(app, lambda: store.set_completed([0], True)))
+            completed_signals = len(signals)
+            reopen = min(reopen, timed(app, lambda: store.set_completed([0], False)))
+
+        # Each child of the root separately, in one batch
+        paths = [[0, row] for row in range(len(root["children"]))]
+
+        def complete_each():
+            with store.batch():
+                for path in paths:
+                    store.set_completed(path, True)
+
+        batched = float("inf")
+        for _ in range(REPEATS):
+            store.set_completed([0], False)
+            app.processEvents()
+            signals.clear()
+            batched = min(batched, timed(app, complete_each))
+        print(f"subtree of {size}: complete {complete:.1f} ms, reopen {reopen:.1f} ms, "
+              f"{completed_signals} view updates; its {len(paths)} children in a batch {batched:.1f} ms, "
+              f"{len(signals)} view updates")
+        for updates in (completed_signals, len(signals)):
+            assert updates <= TodoTreeModel.BATCH_ROW_CHANGES + 1, f"subtree of {size}: {updates} view updates"
+
+
+if __name__ == "__main__":
+    main()
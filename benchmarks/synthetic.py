@@ -0,0 +1,43 @@
+"""Synthetic todo trees for the benchmarks"""
+import random
+from datetime import datetime, timedelta
+
+PRIORITIES = ["Low", "Medium", "High", "Critical"]
+
+
+def generate_todos(count, breadth=5, depth=3, completed_ratio=0.3, date_spread_days=90, seed=0):
+    """Build a todo tree of exactly count items in the todos.json format
+
+    Every item gets up to breadth children until depth levels are reached;
+    further roots are added until count items exist. Create and due dates are
+    spread over date_spread_days starting at 2025-01-01.
+    """
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1)
+    spread = max(date_spread_days, 1)
+    remaining = count
+
+    def make(level):
+        nonlocal remaining
+        remaining -= 1
+        created = base + timedelta(seconds=rng.randrange(spread * 86400))
+        due = created + timedelta(days=rng.randrange(spread))
+        todo = {
+            "text": f"Task {count - remaining} {rng.choice(['plan', 'review', 'ship', 'fix', 'write'])}",
+            "completed": rng.random() < completed_ratio,
+            "priority": rng.choice(PRIORITIES),
+            "due_date": due.strftime("%Y-%m-%d"),
+            "create_date": created.strftime("%Y-%m-%d %H:%M:%S"),
+            "children": []
+        }
+        if level < depth:
+            for _ in range(breadth):
+                if remaining <= 0:
+                    break
+                todo["children"].append(make(level + 1))
+        return todo
+
+    todos = []
+    while remaining > 0:
+        todos.append(make(1))
+    return todos
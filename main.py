@@ -1,29 +1,118 @@
+import gc
 import sys
-import json
 import os
-from datetime import datetime
+import queue
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
-    QTreeWidgetItem,
+    QListWidgetItem, QAbstractItemView,
     QFormLayout, QGroupBox, QDialog, QDialogButtonBox
 )
-from PyQt6.QtCore import Qt, QDate
-from PyQt6.QtGui import QTextCharFormat
+from PyQt6.QtCore import Qt, QDate, QTimer, QThread, QSettings, pyqtSignal
+from PyQt6.QtGui import QKeySequence, QShortcut, QTextCharFormat
 from qfluentwidgets import (
     FluentWindow, PrimaryPushButton, PushButton, LineEdit, 
     MessageBox, Theme, setTheme, Icon,
     BodyLabel, InfoBar, InfoBarPosition, NavigationItemPosition,
-    FluentIcon, TreeWidget, ComboBox, DateEdit, CheckBox
+    FluentIcon, TreeView, ComboBox, DateEdit, SearchLineEdit, CheckBox, SpinBox,
+    ListWidget, RoundMenu, Action
 )
+from todo_model import TodoTreeModel, TodoItemDelegate, TodoProgressDelegate, TodoActionsDelegate
+from todo_reminders import ReminderScheduler
+from todo_search import QuickFilter, TodoFieldIndex, TodoSearchIndex
+from todo_node import Priority
+from todo_session import SaveError, TodoSession
+from todo_stats import DUE_SOON_DAYS, WEEKS, TodoColumns
+from todo_storage import PRIORITY_ORDER
+from todo_store import walk
+
+
+class TodoLoader(QThread):
+    """Background thread that streams todos out of storage in batches"""
+    batch_ready = pyqtSignal(float)  # Fraction of the file parsed so far
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, storage, parent=None):
+        super().__init__(parent)
+        self.storage = storage
+        # Batches are handed over through a queue so the GUI can also drain
+        # them synchronously (e.g. when the window closes mid-load)
+        self.batches = queue.Queue()
+        self.progress = 0.0
+        self.done = False  # Set once every batch has been queued
+
+    def run(self):
+        try:
+            for batch, progress in self.storage.stream():
+                self.batches.put(batch)
+                self.progress = progress
+                self.batch_ready.emit(progress)
+        except Exception as e:
+            self.load_failed.emit(str(e))
+        finally:
+            self.done = True
 
 
 class TodoInterface(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.todo_file = "todos.json"
-        self.todos = []  # Will store hierarchical todo structure
-        # Store references to custom widgets for tree items
-        self.item_widgets = {}  # item_id -> {'checkbox': CheckBox, 'text_label': BodyLabel}
+        # The todo list itself: every change goes through the session's store
+        # so the tree view can update just the affected rows, is kept for
+        # undo and is saved. Storage backend: "json" (default, write-behind
+        # whole-file saves), "journal" (append-only todos.json.journal) or
+        # "sqlite" (todos.db). TODO_DEBUG=1 re-checks the store's counters
+        # after every change
+        self.session = TodoSession.open(
+            self.todo_file,
+            os.getenv('TODO_STORAGE', '').strip() or "json",
+            debug=os.getenv('TODO_DEBUG', '').strip() == "1",
+        )
+        self.store = self.session.store
+        self.storage = self.session.storage
+        self.history = self.session.history
+        self.todos = self.store.todos  # Will store hierarchical todo structure
+        # Trigram index over the task texts, kept up to date by the store
+        self.search_index = TodoSearchIndex(self.store)
+        self.field_index = TodoFieldIndex(self.store)
+        # Tells the user as tasks come due; started once the todos are loaded
+        self.reminders = ReminderScheduler(self.store, parent=self)
+        self.reminders.remindersDue.connect(self.on_reminders_due)
+        # Whole-file backends: mutations mark the list dirty and a single
+        # save runs once edits have been quiet for save_delay_ms
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(500)  # save_delay_ms
+        self.save_timer.timeout.connect(self.save_todos)
+        self.loader = None  # TodoLoader while todos are still streaming in
+        # The loader thread starts once the page has first been painted:
+        # parsing holds the GIL for long stretches and would hold up the
+        # first frame
+        self.painted = False
+        # Loaded batches are taken one per event loop pass so the window can
+        # repaint between them
+        self.batch_timer = QTimer(self)
+        self.batch_timer.setSingleShot(True)
+        self.batch_timer.setInterval(0)
+        self.batch_timer.timeout.connect(self.take_loaded_batch)
+        # The tree is filtered once typing pauses briefly, not on every keystroke
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.apply_filters)
+        # While filtered: the walk that expands the rows holding matches, a
+        # screenful at a time as the tree is scrolled down (see expand_filtered),
+        # and the ids of the rows it expanded that the user hadn't
+        self.filtered_expansion = None
+        self.search_expanded = set()
+        # Rows the user expanded, remembered across reloads and restarts;
+        # everything else starts collapsed so its children are never loaded
+        self.settings = QSettings("fluent-todo", "FluentTodo")
+        self.expanded_ids = {
+            int(value) for value in self.settings.value("tree/expanded", [], type=list) if str(value).isdigit()
+        }
         self.init_ui()
         self.load_todos()
 
@@ -37,8 +126,8 @@ class TodoInterface(QWidget):
         # self.main_layout.addWidget(title_label)
         
         # Input area
-        input_group = QGroupBox("Add New Todo")
-        input_form = QFormLayout(input_group)
+        self.input_group = QGroupBox("Add New Todo")
+        input_form = QFormLayout(self.input_group)
         
         # Todo text input
         self.todo_input = LineEdit()
@@ -105,18 +194,21 @@ class TodoInterface(QWidget):
         # button_layout.addStretch()  # Push buttons to the left
         input_form.addRow(button_layout)
         
-        self.main_layout.addWidget(input_group)
+        self.main_layout.addWidget(self.input_group)
         
         # Sorting controls
-        sort_group = QGroupBox("Sort Options")
-        sort_layout = QFormLayout(sort_group)
+        self.sort_group = QGroupBox("Sort Options")
+        sort_layout = QFormLayout(self.sort_group)
 
+        # Start with the sort order chosen last time
         self.sort_combo = ComboBox()
         self.sort_combo.addItems(["Create Date", "Priority", "Due Date", "Name"])
+        self.sort_combo.setCurrentText(self.settings.value("tree/sort_by", "Create Date", type=str))
         self.sort_combo.currentTextChanged.connect(self.sort_todos)
 
         self.sort_order_combo = ComboBox()
         self.sort_order_combo.addItems(["Ascending", "Descending"])
+        self.sort_order_combo.setCurrentText(self.settings.value("tree/sort_order", "Ascending", type=str))
         self.sort_order_combo.currentTextChanged.connect(self.sort_todos)
 
         sort_row_layout = QHBoxLayout()
@@ -128,24 +220,95 @@ class TodoInterface(QWidget):
         # sort_layout.addStretch()
 
         # sort_layout.addStretch()
-        self.main_layout.addWidget(sort_group)
-        
-        # Todo tree (for nested items)
-        self.todo_tree = TreeWidget()
-        self.todo_tree.setHeaderLabels(["Task", "Priority", "Due Date", "Created", "Actions"])
+        self.main_layout.addWidget(self.sort_group)
+
+        # Quick filters; they combine with each other and with the search text
+        self.filter_group = QGroupBox("Filter Options")
+        filter_layout = QFormLayout(self.filter_group)
+        filter_row_layout = QHBoxLayout()
+
+        self.hide_completed_check = CheckBox("Hide completed")
+        self.hide_completed_check.stateChanged.connect(self.apply_filters)
+        filter_row_layout.addWidget(self.hide_completed_check)
+
+        self.overdue_check = CheckBox("Overdue")
+        self.overdue_check.stateChanged.connect(self.apply_filters)
+        filter_row_layout.addWidget(self.overdue_check)
+
+        self.min_priority_combo = ComboBox()
+        self.min_priority_combo.addItems(["Any priority", "Medium or higher", "High or higher", "Critical"])
+        self.min_priority_combo.currentIndexChanged.connect(self.apply_filters)
+        filter_row_layout.addWidget(self.min_priority_combo)
+
+        self.due_within_check = CheckBox("Due within")
+        self.due_within_check.stateChanged.connect(self.apply_filters)
+        filter_row_layout.addWidget(self.due_within_check)
+
+        self.due_within_spin = SpinBox()
+        self.due_within_spin.setRange(0, 365)
+        self.due_within_spin.setValue(7)  # This week
+        self.due_within_spin.setSuffix(" days")
+        self.due_within_spin.valueChanged.connect(self.apply_filters)
+        filter_row_layout.addWidget(self.due_within_spin)
+        filter_row_layout.addStretch()
+        filter_layout.addRow("Show:", filter_row_layout)
+
+        self.main_layout.addWidget(self.filter_group)
+
+        # Search box; the tree shows the matching tasks and their parents
+        self.search_box = SearchLineEdit()
+        self.search_box.setPlaceholderText("Search tasks...")
+        self.search_box.textChanged.connect(self.search_timer.start)
+        self.search_box.searchSignal.connect(self.apply_filters)
+        self.search_box.clearSignal.connect(self.apply_filters)
+        self.main_layout.addWidget(self.search_box)
+        
+        # Todo tree (for nested items); rows are painted on demand from the model
+        self.todo_model = TodoTreeModel(self.store, self)
+        self.todo_model.set_sort_order(*self.sort_order())
+        self.todo_model.checkToggled.connect(self.on_todo_checked)
+        self.todo_tree = TreeView()
+        self.todo_tree.setModel(self.todo_model)
+        # Ctrl/Shift-click selects several tasks for the bulk actions in the context menu
+        self.todo_tree.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.todo_tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.todo_tree.customContextMenuRequested.connect(self.show_tree_menu)
+        delete_shortcut = QShortcut(QKeySequence(QKeySequence.StandardKey.Delete), self.todo_tree)
+        delete_shortcut.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+        delete_shortcut.activated.connect(self.remove_selected)
+        # Ctrl+Z / Ctrl+Y (and the platform's own keys) anywhere on the page,
+        # except in a text box, which undoes its own typing
+        redo_keys = QKeySequence.keyBindings(QKeySequence.StandardKey.Redo)
+        if QKeySequence("Ctrl+Y") not in redo_keys:
+            redo_keys.append(QKeySequence("Ctrl+Y"))
+        for keys, slot in ((QKeySequence.StandardKey.Undo, self.undo), (redo_keys, self.redo)):
+            shortcut = QShortcut(self)
+            shortcut.setKeys(keys)
+            shortcut.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+            shortcut.activated.connect(slot)
+        self.todo_tree.setItemDelegate(TodoItemDelegate(self.todo_tree))
+        self.actions_delegate = TodoActionsDelegate(self.todo_tree)
+        # Queued so the dialogs the actions open don't run inside the view's mouse handling
+        self.actions_delegate.actionTriggered.connect(self.on_todo_action, Qt.ConnectionType.QueuedConnection)
+        self.todo_tree.setItemDelegateForColumn(TodoTreeModel.ACTIONS_COLUMN, self.actions_delegate)
+        self.progress_delegate = TodoProgressDelegate(self.todo_tree)
+        self.todo_tree.setItemDelegateForColumn(TodoTreeModel.PROGRESS_COLUMN, self.progress_delegate)
+        self.todo_model.rowsInserted.connect(self.restore_expanded)
+        self.todo_tree.expanded.connect(self.on_item_expanded)
+        self.todo_tree.collapsed.connect(self.on_item_collapsed)
+        self.todo_tree.verticalScrollBar().valueChanged.connect(self.expand_more_filtered)
         self.todo_tree.setColumnWidth(0, 800)  # Increased width for checkbox and text
         self.todo_tree.setColumnWidth(1, 80)
         self.todo_tree.setColumnWidth(2, 100)
         self.todo_tree.setColumnWidth(3, 100)
-        self.todo_tree.setColumnWidth(4, 180)  # Increased width for action buttons
+        self.todo_tree.setColumnWidth(TodoTreeModel.PROGRESS_COLUMN, 150)
+        self.todo_tree.setColumnWidth(TodoTreeModel.NEXT_DUE_COLUMN, 100)
+        self.todo_tree.setColumnWidth(TodoTreeModel.TOP_PRIORITY_COLUMN, 100)
+        self.todo_tree.setColumnWidth(TodoTreeModel.ACTIONS_COLUMN, 180)  # Increased width for action buttons
         # Set uniform row height for better button display
         self.todo_tree.setUniformRowHeights(True)
         # Set indentation to provide space for expand icons
         self.todo_tree.setIndentation(30)  # Increase indentation for better spacing
-        # Increase row height for better visual appearance
-        self.todo_tree.setStyleSheet("QTreeWidget::item { height: 50px; }")
-        # Temporarily disconnect signal during tree population
-        self.todo_tree.itemChanged.connect(self.update_todo_status)
         self.main_layout.addWidget(self.todo_tree)
         
         
@@ -168,15 +331,13 @@ class TodoInterface(QWidget):
                 "create_date": create_date,
                 "children": []
             }
-            self.todos.append(todo)
-            self.sort_todos()  # Sort after adding
+            # Auto-save after adding todo
+            self.perform({"op": "add", "path": [], "item": todo})
             self.todo_input.clear()
             # Reset to defaults
             self.priority_combo.setCurrentIndex(1)  # Medium
             self.due_date_edit.setDate(QDate.currentDate().addDays(7))
             self.update_status()
-            # Auto-save after adding todo
-            self.save_todos(show_notification=False)
             InfoBar.success(
                 title='Success',
                 content=f'Added: {text}',
@@ -197,7 +358,7 @@ class TodoInterface(QWidget):
                 parent=self.window()
             )
 
-    def add_sub_todo_to_item(self, parent_todo, parent_item):
+    def add_sub_todo_to_item(self, parent_todo, parent_index):
         """Add sub-item to a specific parent item using dialog"""
         dialog = TodoEditDialog({}, self, is_new=True)
         dialog.setWindowTitle("Add Sub-item")
@@ -209,11 +370,10 @@ class TodoInterface(QWidget):
             new_data["completed"] = False
             new_data["children"] = []
             
-            parent_todo["children"].append(new_data)
-            self.sort_todos()  # Sort after adding
-            self.update_status()
             # Auto-save after adding sub-todo
-            self.save_todos(show_notification=False)
+            self.perform({"op": "add", "path": self.store.path_of(parent_todo), "item": new_data})
+            self.todo_tree.expand(self.todo_model.index_of(parent_todo))
+            self.update_status()
             InfoBar.success(
                 title='Success',
                 content=f'Added sub-item: {new_data["text"]}',
@@ -224,47 +384,12 @@ class TodoInterface(QWidget):
                 parent=self.window()
             )
 
-    def find_todo_by_item(self, item):
-        """Find the todo data structure corresponding to a tree widget item"""
-        def search_todos(todos, target_item, current_item=None):
-            for todo in todos:
-                if current_item is None:
-                    # This is a root level search
-                    root_items = [self.todo_tree.topLevelItem(i) for i in range(self.todo_tree.topLevelItemCount())]
-                    for i, root_item in enumerate(root_items):
-                        if root_item == target_item:
-                            return self.todos[i]
-                        result = search_in_children(self.todos[i]["children"], target_item, root_item)
-                        if result:
-                            return result
-                else:
-                    if current_item == target_item:
-                        return todo
-                    result = search_in_children(todo["children"], target_item, current_item)
-                    if result:
-                        return result
-            return None
-            
-        def search_in_children(children, target_item, parent_item):
-            for i, child_todo in enumerate(children):
-                child_item = parent_item.child(i)
-                if child_item == target_item:
-                    return child_todo
-                result = search_in_children(child_todo["children"], target_item, child_item)
-                if result:
-                    return result
-            return None
-            
-        return search_todos(self.todos, item)
-
-    def remove_todo_item(self, todo_data, tree_item):
+    def remove_todo_item(self, todo_data, index):
         """Remove a specific todo item"""
-        text = todo_data["text"]
-        self.remove_todo_from_data(tree_item)
-        self.update_todo_tree()
-        self.update_status()
+        text = todo_data.text
         # Auto-save after removing todo
-        self.save_todos(show_notification=False)
+        self.perform({"op": "remove", "path": self.store.path_of(todo_data)})
+        self.update_status()
         InfoBar.success(
             title='Success',
             content=f'Removed: {text}',
@@ -275,103 +400,200 @@ class TodoInterface(QWidget):
             parent=self.window()
         )
 
-    def remove_todo_from_data(self, item):
-        """Remove a todo item from the data structure"""
-        def remove_from_list(todos, target_item, parent_item=None):
-            if parent_item is None:
-                # Check root level
-                root_items = [self.todo_tree.topLevelItem(i) for i in range(self.todo_tree.topLevelItemCount())]
-                for i, root_item in enumerate(root_items):
-                    if root_item == target_item:
-                        del self.todos[i]
-                        return True
-                    if remove_from_children(self.todos[i]["children"], target_item, root_item):
-                        return True
-            return False
-            
-        def remove_from_children(children, target_item, parent_item):
-            for i, child_todo in enumerate(children):
-                child_item = parent_item.child(i)
-                if child_item == target_item:
-                    del children[i]
-                    return True
-                if remove_from_children(child_todo["children"], target_item, child_item):
-                    return True
-            return False
-            
-        remove_from_list(self.todos, item)
+    def on_todo_action(self, action, index):
+        """Run the Edit / Sub / Del button clicked on a row"""
+        if not index.isValid():
+            # The row went away before the queued click arrived
+            return
+        index = self.todo_model.index(index.row(), 0, index.parent())
+        todo_data = self.todo_model.todo_at(index)
+        if action == "edit":
+            self.edit_todo_item(todo_data, index)
+        elif action == "sub":
+            self.add_sub_todo_to_item(todo_data, index)
+        elif action == "del":
+            self.remove_todo_item(todo_data, index)
 
-    def on_fluent_checkbox_clicked(self, checked, todo_data, tree_item):
-        """Handle qfluentwidgets CheckBox click events"""
-        todo_data["completed"] = checked
-        
-        # Apply visual style to the current item
-        self.apply_completed_style(tree_item, checked)
-        
-        # Mark all children with the same completion status as parent
-        self.mark_children_completed(todo_data, checked)
-        # Update the tree display to reflect the changes
-        self.update_tree_item_children(tree_item, checked)
-        
+    def on_todo_checked(self, index, checked):
+        """Handle a click on a row's check box"""
+        index = self.todo_model.index(index.row(), 0, index.parent())
+        path = self.store.path_of(self.todo_model.todo_at(index))
+        # Also marks all children with the same completion status as parent;
+        # auto-saved like every change
+        self.perform({"op": "complete", "path": path, "completed": checked})
         self.update_status()
-        # Auto-save after status change
-        self.save_todos(show_notification=False)
-
-    def update_todo_status(self, item, column):
-        # This method is kept for backward compatibility but may not be used with fluent checkboxes
-        if column == 0:  # Only handle checkbox changes in the first column
-            todo_data = self.find_todo_by_item(item)
-            if todo_data:
-                is_completed = item.checkState(0) == Qt.CheckState.Checked
-                todo_data["completed"] = is_completed
-                
-                # Apply visual style to the current item
-                self.apply_completed_style(item, is_completed)
-                
-                # Mark all children with the same completion status as parent
-                self.mark_children_completed(todo_data, is_completed)
-                # Update the tree display to reflect the changes
-                self.update_tree_item_children(item, is_completed)
-                
-                self.update_status()
-                # Auto-save after status change
-                self.save_todos(show_notification=False)
-
-    def mark_children_completed(self, todo_data, completed_status):
-        """Recursively mark all children as completed or uncompleted"""
-        for child in todo_data["children"]:
-            child["completed"] = completed_status
-            # Recursively mark grandchildren
-            self.mark_children_completed(child, completed_status)
-
-    def update_tree_item_children(self, tree_item, completed_status):
-        """Recursively update the visual state of all child tree items"""
-        # Update all children of this tree item
-        for i in range(tree_item.childCount()):
-            child_item = tree_item.child(i)
-            
-            # Update fluent checkbox if it exists
-            child_item_id = id(child_item)
-            if child_item_id in self.item_widgets and self.item_widgets[child_item_id]['checkbox']:
-                self.item_widgets[child_item_id]['checkbox'].setChecked(completed_status)
-            else:
-                # Fallback to traditional checkbox
-                check_state = Qt.CheckState.Checked if completed_status else Qt.CheckState.Unchecked
-                child_item.setCheckState(0, check_state)
-            
-            # Apply visual style to child items
-            self.apply_completed_style(child_item, completed_status)
-            # Recursively update grandchildren
-            self.update_tree_item_children(child_item, completed_status)
+
+    def selected_todos(self):
+        """Return the todos of the selected rows"""
+        return [self.todo_model.todo_at(index) for index in self.todo_tree.selectionModel().selectedRows()]
+
+    def show_tree_menu(self, pos):
+        """Offer the bulk actions for the selected tasks"""
+        count = len(self.todo_tree.selectionModel().selectedRows())
+        if not count or self.loader is not None:
+            return
+        suffix = f" {count} tasks" if count > 1 else ""
+        menu = RoundMenu(parent=self)
+        menu.closedSignal.connect(menu.deleteLater)
+        menu.addAction(Action(FluentIcon.ACCEPT, f"Complete{suffix}", triggered=lambda: self.complete_selected(True)))
+        menu.addAction(Action(FluentIcon.CANCEL, f"Reopen{suffix}", triggered=lambda: self.complete_selected(False)))
+        priority_menu = RoundMenu("Set Priority", self)
+        priority_menu.setIcon(FluentIcon.FLAG)
+        for priority in PRIORITY_ORDER:
+            priority_menu.addAction(Action(priority, triggered=lambda _=False, p=priority: self.set_selected_priority(p)))
+        menu.addMenu(priority_menu)
+        menu.addAction(Action(FluentIcon.CALENDAR, "Reschedule...", triggered=self.reschedule_selected))
+        menu.addAction(Action(FluentIcon.MOVE, "Move To...", triggered=self.move_selected))
+        menu.addSeparator()
+        menu.addAction(Action(FluentIcon.DELETE, f"Delete{suffix}", triggered=self.remove_selected))
+        menu.exec(self.todo_tree.viewport().mapToGlobal(pos))
+
+    def perform(self, change):
+        """Make a change as one undo step and save it"""
+        with self.saving():
+            self.session.perform(change)
+
+    @contextmanager
+    def saving(self):
+        """Report a failure to save the changes made in a with block; schedule the save a whole-file backend needs"""
+        try:
+            yield
+        except SaveError as e:
+            print(f"Save error: {e}")  # Debug print
+            MessageBox("Error", f"Failed to save todos: {str(e)}", self.window()).exec()
+        if self.session.dirty:
+            self.mark_dirty()
+
+    def commit_bulk(self, changes, message):
+        """Make the changes of one bulk action as one undo step, saved as one record, and report them once"""
+        if not changes:
+            return
+        self.perform(changes[0] if len(changes) == 1 else {"op": "batch", "changes": changes})
+        self.report_done(message)
+
+    def undo(self):
+        """Undo the latest change (Ctrl+Z)"""
+        self.replay(self.session.undo, "Nothing to undo", "Undone")
+
+    def redo(self):
+        """Redo the latest undone change (Ctrl+Y)"""
+        self.replay(self.session.redo, "Nothing to redo", "Redone")
+
+    def replay(self, step, empty_message, message):
+        if self.loader is not None:
+            return
+        # The rows it touches update like for any other change
+        with self.saving():
+            change = step()
+        if change is None:
+            InfoBar.warning(
+                title='Warning',
+                content=empty_message,
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=2000,
+                parent=self.window()
+            )
+            return
+        self.report_done(message)
+
+    def report_done(self, message):
+        self.update_status()
+        InfoBar.success(
+            title='Success',
+            content=message,
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP_RIGHT,
+            duration=2000,
+            parent=self.window()
+        )
+
+    def complete_selected(self, completed):
+        """Mark the selected tasks (and their sub-items) completed or open"""
+        # Completing a task completes its sub-items anyway
+        paths = self.store.paths_of(self.store.outermost(self.selected_todos()))
+        self.commit_bulk(
+            [{"op": "complete", "path": path, "completed": completed} for path in paths],
+            f"{'Completed' if completed else 'Reopened'} {len(paths)} tasks"
+        )
+
+    def update_selected(self, fields, message):
+        """Change the same fields of every selected task; message gets the {count}"""
+        paths = self.store.paths_of(self.selected_todos())
+        self.commit_bulk([{"op": "edit", "path": path, "fields": fields} for path in paths],
+                         message.format(count=len(paths)))
+
+    def set_selected_priority(self, priority):
+        self.update_selected({"priority": priority}, f"Set {{count}} tasks to {priority} priority")
+
+    def reschedule_selected(self):
+        dialog = RescheduleDialog(self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            due_date = dialog.due_date()
+            self.update_selected({"due_date": due_date}, f"Rescheduled {{count}} tasks to {due_date}")
+
+    def remove_selected(self):
+        """Delete the selected tasks and their sub-items"""
+        todos = self.store.outermost(self.selected_todos())
+        if not todos or self.loader is not None:
+            return
+        if len(todos) > 1 and not MessageBox(
+            'Delete Tasks', f'Delete {len(todos)} tasks and their sub-items?', self.window()
+        ).exec():
+            return
+        self.commit_bulk(self.removal_changes(todos), f"Removed {len(todos)} tasks")
+
+    def removal_changes(self, todos):
+        """Change records removing todos (none inside another), last first so the other paths still hold"""
+        return [{"op": "remove", "path": path} for path in sorted(self.store.paths_of(todos), reverse=True)]
+
+    def move_selected(self):
+        """Move the selected tasks (with their sub-items) under another task or to the top level"""
+        todos = self.store.outermost(self.selected_todos())
+        if not todos:
+            return
+        moved_ids = {todo.id for todo in walk(todos)}
+        dialog = MoveTodosDialog(self.store, self.search_index, moved_ids, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        parent = dialog.target()
+        # Keep their order in the tree
+        paths = self.store.paths_of(todos)
+        todos = [todo for _, todo in sorted(zip(paths, todos), key=lambda pair: pair[0])]
+        removals = self.removal_changes(todos)
+        # The target's path is known once the todos are out of the tree
+        with self.saving(), self.session.group():
+            self.session.perform({"op": "batch", "changes": removals})
+            parent_path = [] if parent is None else self.store.path_of(parent)
+            self.session.perform({"op": "batch", "changes": [
+                {"op": "add", "path": parent_path, "item": todo} for todo in todos]})
+        if parent is not None:
+            self.expand_to(parent)
+        target = "the top level" if parent is None else parent.text
+        self.report_done(f"Moved {len(todos)} tasks to {target}")
+
+    def expand_to(self, todo):
+        """Expand a task and the tasks above it, fetching their rows, as far as the filter shows them"""
+        chain = []
+        while todo is not None:
+            chain.append(todo)
+            todo = self.store.parent_of(todo)
+        for todo in reversed(chain):
+            index = self.todo_model.index_of(todo)
+            if index is None:
+                # Filtered out, and so is everything below it
+                return
+            self.todo_model.fetchMore(index)
+            self.todo_tree.expand(index)
 
     def clear_completed(self):
-        completed_count = self.count_completed_root_todos(self.todos)
+        completed_count = self.store.count_completed_roots()
         if completed_count > 0:
-            self.todos = self.remove_completed_root_todos(self.todos)
-            self.update_todo_tree()
-            self.update_status()
             # Auto-save after clearing completed
-            self.save_todos(show_notification=False)
+            self.perform({"op": "clear_completed"})
+            self.update_status()
             InfoBar.success(
                 title='Success',
                 content=f'Cleared {completed_count} completed root items',
@@ -392,40 +614,6 @@ class TodoInterface(QWidget):
                 parent=self.window()
             )
 
-    def count_completed_todos(self, todos):
-        """Recursively count completed todos"""
-        count = 0
-        for todo in todos:
-            if todo["completed"]:
-                count += 1
-            count += self.count_completed_todos(todo["children"])
-        return count
-
-    def count_completed_root_todos(self, todos):
-        """Count only completed root-level todos (not sub-items)"""
-        count = 0
-        for todo in todos:
-            if todo["completed"]:
-                count += 1
-        return count
-
-    def remove_completed_root_todos(self, todos):
-        """Remove only completed root-level todos, preserve sub-items"""
-        filtered_todos = []
-        for todo in todos:
-            if not todo["completed"]:
-                filtered_todos.append(todo)
-        return filtered_todos
-
-    def remove_completed_todos(self, todos):
-        """Recursively remove completed todos (kept for other uses)"""
-        filtered_todos = []
-        for todo in todos:
-            if not todo["completed"]:
-                todo["children"] = self.remove_completed_todos(todo["children"])
-                filtered_todos.append(todo)
-        return filtered_todos
-
     def clear_all_todos(self):
         if len(self.todos) > 0:
             w = MessageBox(
@@ -434,11 +622,9 @@ class TodoInterface(QWidget):
                 self.window()
             )
             if w.exec():
-                self.todos.clear()
-                self.update_todo_tree()
-                self.update_status()
                 # Auto-save after clearing all
-                self.save_todos(show_notification=False)
+                self.perform({"op": "clear_all"})
+                self.update_status()
                 InfoBar.success(
                     title='Success',
                     content='Cleared all todos',
@@ -459,135 +645,46 @@ class TodoInterface(QWidget):
                 parent=self.window()
             )
 
-    def update_todo_tree(self):
-        # Temporarily disconnect the signal to prevent unwanted updates during population
-        try:
-            self.todo_tree.itemChanged.disconnect(self.update_todo_status)
-        except TypeError:
-            # Signal was not connected, ignore the error
-            pass
-        
-        # Clear widget references to avoid memory leaks
-        self.item_widgets.clear()
-        
-        self.todo_tree.clear()
-        self.populate_tree_items(self.todos, None)
-        self.todo_tree.expandAll()
-        # Reconnect the signal after population is complete
-        self.todo_tree.itemChanged.connect(self.update_todo_status)
-
-    def populate_tree_items(self, todos, parent_item):
-        """Recursively populate tree widget items"""
-        for todo in todos:
-            if parent_item is None:
-                item = QTreeWidgetItem(self.todo_tree)
-            else:
-                item = QTreeWidgetItem(parent_item)
-            
-            # Set text and additional info
-            item.setText(0, todo["text"])
-            item.setText(1, todo.get("priority", "Medium"))
-            # Format due date display to match create date format (yyyy-MM-dd)
-            due_date = todo.get("due_date", "")
-            if due_date:
-                try:
-                    date_obj = QDate.fromString(due_date, "yyyy-MM-dd")
-                    if date_obj.isValid():
-                        # Format as yyyy-MM-dd to match create date format
-                        formatted_date = date_obj.toString("yyyy-MM-dd")
-                        item.setText(2, formatted_date)
-                    else:
-                        item.setText(2, due_date)
-                except Exception:
-                    item.setText(2, due_date)
-            else:
-                item.setText(2, "")
-            item.setText(3, todo.get("create_date", "")[:10] if todo.get("create_date") else "")  # Show only date part
-            
-            # Create a custom checkbox widget with text using qfluentwidgets
-            checkbox_widget = QWidget()
-            checkbox_layout = QHBoxLayout(checkbox_widget)
-            
-            # Simple left margin to avoid overlap with expand icon
-            # The tree indentation will handle the hierarchical spacing
-            checkbox_layout.setContentsMargins(20, 0, 0, 0)
-            
-            fluent_checkbox = CheckBox()
-            fluent_checkbox.setChecked(todo["completed"])
-            fluent_checkbox.clicked.connect(lambda checked, t=todo, i=item: self.on_fluent_checkbox_clicked(checked, t, i))
-            checkbox_layout.addWidget(fluent_checkbox)
-            
-            # Add text label next to checkbox
-            text_label = BodyLabel(todo["text"])
-            text_label.setWordWrap(True)
-            checkbox_layout.addWidget(text_label)
-            checkbox_layout.addStretch()
-            
-            # Store references for later access using item's memory address as key
-            item_id = id(item)
-            self.item_widgets[item_id] = {
-                'checkbox': fluent_checkbox,
-                'text_label': text_label
-            }
-            
-            # Clear the item text since we're using custom widget
-            item.setText(0, "")
-            
-            # Set the checkbox widget in the first column
-            self.todo_tree.setItemWidget(item, 0, checkbox_widget)
-            
-            # Apply completed style
-            self.apply_completed_style(item, todo["completed"])
-            
-            # Color code by priority
-            self.apply_priority_style(item, todo.get("priority", "Medium"))
-            
-            # Add action buttons in the Actions column
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(2, 2, 2, 2)
-            actions_layout.setSpacing(2)
-            
-            # Edit button
-            edit_button = PushButton("Edit")
-            edit_button.setMaximumWidth(50)
-            # edit_button.setMaximumHeight(35)
-            edit_button.clicked.connect(lambda checked, t=todo, i=item: self.edit_todo_item(t, i))
-            actions_layout.addWidget(edit_button)
-            
-            # Add sub-item button
-            add_sub_button = PushButton("Sub")
-            add_sub_button.setMaximumWidth(50)
-            # add_sub_button.setMaximumHeight(35)
-            add_sub_button.clicked.connect(lambda checked, t=todo, i=item: self.add_sub_todo_to_item(t, i))
-            actions_layout.addWidget(add_sub_button)
-            
-            # Remove button
-            remove_button = PushButton("Del")
-            remove_button.setMaximumWidth(50)
-            # remove_button.setMaximumHeight(35)
-            remove_button.clicked.connect(lambda checked, t=todo, i=item: self.remove_todo_item(t, i))
-            actions_layout.addWidget(remove_button)
-            
-            self.todo_tree.setItemWidget(item, 4, actions_widget)
-            
-            # Recursively add children
-            if todo["children"]:
-                self.populate_tree_items(todo["children"], item)
+    def append_root_items(self, todos):
+        """Append root items to the end of the tree without rebuilding it"""
+        self.store.append_roots(todos)
+
+    def restore_expanded(self, parent, first, last):
+        """Re-expand new rows that were expanded before (fetching their children)"""
+        if not self.expanded_ids:
+            return
+        for row in range(first, last + 1):
+            index = self.todo_model.index(row, 0, parent)
+            if self.todo_model.todo_at(index).id in self.expanded_ids and self.todo_model.hasChildren(index):
+                self.todo_tree.expand(index)
+
+    def on_item_expanded(self, index):
+        # Rows opened to show filtered results aren't remembered
+        if self.todo_model.hasChildren(index) and not self.todo_model.is_filtered():
+            self.expanded_ids.add(self.todo_model.todo_at(index).id)
+
+    def on_item_collapsed(self, index):
+        if not self.todo_model.is_filtered():
+            self.expanded_ids.discard(self.todo_model.todo_at(index).id)
+
+    def save_view_state(self):
+        # Forget tasks that have been deleted
+        expanded = sorted(self.expanded_ids & self.store.nodes.keys())
+        self.settings.setValue("tree/expanded", [str(todo_id) for todo_id in expanded])
+        self.settings.setValue("tree/sort_by", self.sort_combo.currentText())
+        self.settings.setValue("tree/sort_order", self.sort_order_combo.currentText())
 
-    def edit_todo_item(self, todo_data, tree_item):
+    def edit_todo_item(self, todo_data, index):
         """Open edit dialog for a todo item"""
         dialog = TodoEditDialog(todo_data, self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             # Update the todo data with new values
             updated_data = dialog.get_updated_data()
-            todo_data.update(updated_data)
-            
-            # Refresh the tree display
-            self.sort_todos()  # This will refresh and sort
+            path = self.store.path_of(todo_data)
+            fields = {key: updated_data[key] for key in ("text", "priority", "due_date")}
+            # The view moves the row to its sorted place; auto-saved
+            self.perform({"op": "edit", "path": path, "fields": fields})
             self.update_status()
-            # Auto-save after editing
-            self.save_todos(show_notification=False)
             
             InfoBar.success(
                 title='Success',
@@ -599,101 +696,175 @@ class TodoInterface(QWidget):
                 parent=self.window()
             )
 
-    def apply_completed_style(self, item, is_completed):
-        """Apply or remove strikethrough style for completed items"""
-        # Style the custom text label in the checkbox widget
-        item_id = id(item)
-        if item_id in self.item_widgets and self.item_widgets[item_id]['text_label']:
-            text_label = self.item_widgets[item_id]['text_label']
-            font = text_label.font()
-            if is_completed:
-                # Add strikethrough for completed items
-                font.setStrikeOut(True)
-                text_label.setFont(font)
-                # Make text slightly grayed out
-                text_label.setStyleSheet("color: gray;")
-            else:
-                # Remove strikethrough for uncompleted items
-                font.setStrikeOut(False)
-                text_label.setFont(font)
-                # Restore normal text color
-                text_label.setStyleSheet("")
-        
-        # Style other columns (Priority, Due Date, Created)
-        for col in range(1, 4):  # Style columns 1-3 (Priority, Due Date, Created)
-            font = item.font(col)
-            if is_completed:
-                # Add strikethrough for completed items
-                font.setStrikeOut(True)
-                # Make text slightly grayed out
-                item.setForeground(col, self.palette().color(self.palette().ColorRole.PlaceholderText))
-            else:
-                # Remove strikethrough for uncompleted items
-                font.setStrikeOut(False)
-                # Restore normal text color
-                item.setForeground(col, self.palette().color(self.palette().ColorRole.Text))
-            item.setFont(col, font)
-
-    def apply_priority_style(self, item, priority):
-        """Apply color coding based on priority"""
-        from PyQt6.QtGui import QColor
-        
-        priority_colors = {
-            "Critical": QColor(255, 100, 100),  # Red
-            "High": QColor(255, 165, 0),        # Orange
-            "Medium": QColor(100, 149, 237),    # Blue
-            "Low": QColor(144, 238, 144)        # Light Green
-        }
-        
-        color = priority_colors.get(priority, priority_colors["Medium"])
-        item.setForeground(1, color)  # Color the priority column
+    def sort_order(self):
+        """Return the (sort_by, ascending) chosen in the sort options"""
+        return self.sort_combo.currentText(), self.sort_order_combo.currentText() == "Ascending"
 
     def sort_todos(self):
-        """Sort todos based on selected criteria"""
-        sort_by = self.sort_combo.currentText()
-        ascending = self.sort_order_combo.currentText() == "Ascending"
-        
-        def get_sort_key(todo):
-            if sort_by == "Create Date":
-                return todo.get("create_date", "")
-            elif sort_by == "Priority":
-                priority_order = {"Critical": 4, "High": 3, "Medium": 2, "Low": 1}
-                return priority_order.get(todo.get("priority", "Medium"), 2)
-            elif sort_by == "Due Date":
-                return todo.get("due_date", "9999-12-31")  # Put items without due date at end
-            elif sort_by == "Name":
-                return todo.get("text", "").lower()
-            return ""
-        
-        def sort_recursive(todos_list):
-            # Sort current level
-            todos_list.sort(key=get_sort_key, reverse=not ascending)
-            # Recursively sort children
-            for todo in todos_list:
-                if todo["children"]:
-                    sort_recursive(todo["children"])
-        
-        sort_recursive(self.todos)
-        self.update_todo_tree()
-        # Auto-save after sorting
-        self.save_todos(show_notification=False)
+        """Sort todos based on selected criteria
+
+        Only the view is sorted; the saved todos keep their order, so this
+        doesn't write anything. The choice is saved with the view state.
+        """
+        self.todo_model.set_sort_order(*self.sort_order())
+
+    def quick_filter(self):
+        """Return the QuickFilter chosen in the filter options"""
+        # "Any priority" is index 0, then the ranks from Medium up
+        min_priority = self.min_priority_combo.currentIndex()
+        return QuickFilter(
+            hide_completed=self.hide_completed_check.isChecked(),
+            min_priority=min_priority + PRIORITY_ORDER["Low"] if min_priority else None,
+            overdue=self.overdue_check.isChecked(),
+            due_within=self.due_within_spin.value() if self.due_within_check.isChecked() else None,
+        )
+
+    def apply_filters(self):
+        """Filter the tree down to the tasks that match the search text and the quick filters
+
+        Each condition is answered by an index and the id sets are intersected,
+        smallest first, so no filter walks the whole tree.
+        """
+        self.search_timer.stop()
+        query = self.search_box.text().strip()
+        quick_filter = self.quick_filter()
+        today = date.today()
+        selections = []
+        if query:
+            selections.append(self.search_index.search(query))
+        fields = self.field_index.select(quick_filter, today)
+        if fields is not None:
+            selections.append(fields)
+        if not selections:
+            if not self.todo_model.is_filtered():
+                return
+            self.todo_model.set_filter("", None)
+        else:
+            selections.sort(key=len)
+            matches = selections[0].intersection(*selections[1:])
+            folded = query.casefold()
+
+            def accepts(todo):
+                return folded in todo.text.casefold() and TodoFieldIndex.accepts(quick_filter, todo, today)
+
+            self.todo_model.set_filter(query, matches, accepts)
+        if query:
+            self.expand_filtered(self.todo_model.holds_matches)
+            return
+        # The rows stay as they were where they are still shown, so the rows
+        # opened for the search close again; quick filters show the rows the
+        # user had expanded, and no others
+        self.collapse_search_expanded()
+        if selections:
+            self.expand_filtered(lambda todo: todo.id in self.expanded_ids)
+        else:
+            self.filtered_expansion = None
+            # Rows the filter hid come back collapsed
+            self.expand_remembered()
+
+    def collapse_search_expanded(self):
+        """Collapse the rows expanded to show search matches that the user hadn't expanded"""
+        for todo_id in self.search_expanded:
+            todo = self.store.get(todo_id)
+            index = self.todo_model.index_of(todo) if todo is not None else None
+            if index is not None:
+                self.todo_tree.collapse(index)
+        self.search_expanded.clear()
+
+    def expand_remembered(self):
+        """Expand every shown row the user had expanded"""
+        for todo_id in self.expanded_ids:
+            todo = self.store.get(todo_id)
+            index = self.todo_model.index_of(todo) if todo is not None else None
+            # Rows under a branch never fetched are expanded as it is (see restore_expanded)
+            if index is not None and self.todo_model.hasChildren(index):
+                self.todo_tree.expand(index)
+
+    def expand_filtered(self, wanted):
+        """Expand the filtered rows wanted(todo) picks, from the top down as they are scrolled to
+
+        Expanding every branch at once would make the view lay out every row
+        the filter shows; this only goes a screenful past the bottom of the tree.
+        """
+        self.filtered_expansion = self.filtered_rows(wanted)
+        self.expand_more_filtered()
+
+    def filtered_rows(self, wanted):
+        """Walk the filtered rows in display order, expanding those wanted(todo) picks; yields every row"""
+        model = self.todo_model
+        pending = list(reversed(model.children_of(None)))
+        while pending:
+            todo = pending.pop()
+            # Rows removed or filtered out since the walk passed their parent
+            index = model.index_of(todo) if self.store.get(todo.id) is todo else None
+            if index is None:
+                continue
+            if wanted(todo) and model.hasChildren(index):
+                if todo.id not in self.expanded_ids:
+                    self.search_expanded.add(todo.id)
+                self.todo_tree.expand(index)
+                pending.extend(reversed(model.children_of(todo)))
+            yield todo
+
+    def expand_more_filtered(self):
+        """Walk on through the filtered rows until those past the bottom of the tree fill another screenful"""
+        if self.filtered_expansion is None:
+            return
+        height = self.todo_tree.viewport().height()
+        rows = height // TodoTreeModel.ROW_HEIGHT + 1
+        while True:
+            for _ in range(rows):
+                todo = next(self.filtered_expansion, None)
+                if todo is None:
+                    self.filtered_expansion = None
+                    return
+            if self.todo_tree.visualRect(self.todo_model.index_of(todo)).top() > 2 * height:
+                return
+
+    def on_reminders_due(self, due, overdue):
+        """Tell the user about tasks that have come due or become overdue"""
+        for todos, title, show in ((due, "Due today", InfoBar.info), (overdue, "Overdue", InfoBar.warning)):
+            if not todos:
+                continue
+            names = ", ".join(todo.text for todo in todos[:3])
+            if len(todos) > 3:
+                names += f" and {len(todos) - 3} more"
+            show(
+                title=title,
+                content=names,
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=10000,
+                parent=self.window()
+            )
 
     def update_status(self):
-        total = self.count_total_todos(self.todos)
-        completed = self.count_completed_todos(self.todos)
+        # Kept up to date by the store, so this is cheap after every change
+        total = self.store.total
+        completed = self.store.completed
         self.status_label.setText(f"Total: {total} | Completed: {completed}")
+        stats = self.save_stats()
+        self.status_label.setToolTip(
+            f"Changes: {stats['changes']} | Writes: {stats['written']} | Coalesced: {stats['coalesced']}"
+        )
 
-    def count_total_todos(self, todos):
-        """Recursively count total todos"""
-        count = len(todos)
-        for todo in todos:
-            count += self.count_total_todos(todo["children"])
-        return count
+    def mark_dirty(self):
+        """Schedule a coalesced background save after the current burst of edits"""
+        self.save_timer.start()
+
+    def save_stats(self):
+        """Return counters describing how many saves were coalesced"""
+        return self.session.save_stats()
 
     def save_todos(self, show_notification=False):
+        if self.loader is not None:
+            # Never write a partially loaded list; try again once loading is done
+            self.mark_dirty()
+            return
+        self.save_timer.stop()
         try:
-            with open(self.todo_file, 'w', encoding='utf-8') as f:
-                json.dump(self.todos, f, indent=2, ensure_ascii=False)
+            self.session.save()
             if show_notification:
                 InfoBar.success(
                     title='Success',
@@ -704,53 +875,101 @@ class TodoInterface(QWidget):
                     duration=2000,
                     parent=self.window()
                 )
-        except Exception as e:
+        except SaveError as e:
+            print(f"Save error: {e}")  # Debug print
+            MessageBox("Error", f"Failed to save todos: {str(e)}", self.window()).exec()
+
+    def flush_todos(self):
+        """Write pending changes now and wait for the storage (used when closing)"""
+        if self.loader is not None:
+            self.loader.wait()
+            self.finish_loading()
+        self.save_timer.stop()
+        try:
+            self.session.close()
+        except SaveError as e:
             print(f"Save error: {e}")  # Debug print
             MessageBox("Error", f"Failed to save todos: {str(e)}", self.window()).exec()
 
     def load_todos(self):
-        if os.path.exists(self.todo_file):
-            try:
-                with open(self.todo_file, 'r', encoding='utf-8') as f:
-                    loaded_todos = json.load(f)
-                
-                # Ensure backward compatibility - add children field if missing
-                self.todos = self.ensure_children_field(loaded_todos)
-                
-                self.update_todo_tree()
-                self.update_status()
-            except Exception as e:
-                print(f"Load error: {e}")  # Debug print
-                MessageBox("Error", f"Failed to load todos: {str(e)}", self.window()).exec()
+        """Stream todos in on a background thread; rows appear batch by batch"""
+        self.session.start_loading()
+        # Adding and searching would race with the rows still arriving;
+        # sorting only changes the view, so it stays available
+        self.input_group.setEnabled(False)
+        self.reminders.stop()
+        self.search_box.clear()
+        self.search_box.setEnabled(False)
+        self.filter_group.setEnabled(False)
+        self.status_label.setText("Loading...")
+        # The storage creates an empty file if it doesn't exist and migrates
+        # files written by older versions
+        self.loader = TodoLoader(self.storage, self)
+        self.loader.batch_ready.connect(self.batch_timer.start)
+        self.loader.load_failed.connect(self.on_todos_load_failed)
+        self.loader.finished.connect(self.batch_timer.start)
+        if self.painted:
+            self.loader.start()
         else:
-            # Create empty file if it doesn't exist
-            self.save_todos()
-
-    def ensure_children_field(self, todos):
-        """Ensure all todo items have required fields for backward compatibility"""
-        for todo in todos:
-            if "children" not in todo:
-                todo["children"] = []
-            # Ensure completed field exists and preserve its value
-            if "completed" not in todo:
-                todo["completed"] = False
-            # Ensure new fields exist with defaults
-            if "priority" not in todo:
-                todo["priority"] = "Medium"
-            if "due_date" not in todo:
-                todo["due_date"] = ""
-            if "create_date" not in todo:
-                todo["create_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            # Recursively process children
-            if todo["children"]:
-                todo["children"] = self.ensure_children_field(todo["children"])
-        return todos
+            # In case the page is never painted (a window started minimized)
+            QTimer.singleShot(1000, self.start_loader)
+
+    def start_loader(self):
+        """Start the loader thread of the load in progress, unless it has already run"""
+        if self.loader is not None and not self.loader.isRunning() and not self.loader.isFinished():
+            self.loader.start()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            # Right after this frame has been flushed to the screen
+            QTimer.singleShot(0, self.start_loader)
+
+    def take_loaded_batch(self):
+        """Move one batch parsed by the loader into the todo list and the tree"""
+        if self.loader is None:
+            return
+        try:
+            batch = self.loader.batches.get_nowait()
+        except queue.Empty:
+            if self.loader.done:
+                self.finish_loading()
+            return
+        self.append_root_items(batch)
+        self.status_label.setText(f"Loading... {len(self.todos)} items ({self.loader.progress:.0%})")
+        # Come back for the next batch after the window has repainted
+        self.batch_timer.start()
+
+    def on_todos_load_failed(self, message):
+        print(f"Load error: {message}")  # Debug print
+        MessageBox("Error", f"Failed to load todos: {message}", self.window()).exec()
+
+    def finish_loading(self):
+        """Take the remaining batches and re-enable editing once the loader is done"""
+        while not self.loader.batches.empty():
+            batch = self.loader.batches.get_nowait()
+            self.append_root_items(batch)
+        self.loader = None
+        # The loaded tree lives as long as the page. Freezing it here, once and
+        # on the GUI thread, moves it to the permanent generation so that full
+        # collections stop scanning it; the loader thread only pauses the
+        # collector, as the collector is shared by every thread
+        gc.freeze()
+        self.input_group.setEnabled(True)
+        self.search_box.setEnabled(True)
+        self.filter_group.setEnabled(True)
+        # Loading reset the tree; bring back the quick filters still checked
+        self.apply_filters()
+        self.reminders.start()
+        self.update_status()
 
 
 class TodoEditDialog(QDialog):
     def __init__(self, todo_data, parent=None, is_new=False):
         super().__init__(parent)
-        self.todo_data = todo_data.copy()  # Work with a copy
+        # Only read; the changes go back through get_updated_data()
+        self.todo_data = todo_data
         self.is_new = is_new
         self.init_ui()
         self.populate_fields()
@@ -845,605 +1064,237 @@ class TodoEditDialog(QDialog):
         }
 
 
-class JiraInterface(QWidget):
-    """Jira User Story生成器界面"""
+class RescheduleDialog(QDialog):
+    """Pick a new due date for the selected tasks"""
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.setWindowTitle("Reschedule")
+        self.setModal(True)
+        self.resize(500, 150)
+
+        layout = QVBoxLayout(self)
+        due_date_layout = QHBoxLayout()
+        self.due_date_edit = DateEdit()
+        self.due_date_edit.setCalendarPopup(True)
+        self.due_date_edit.setDisplayFormat("yyyy-MM-dd")
+        self.due_date_edit.setDate(QDate.currentDate())
+        due_date_layout.addWidget(self.due_date_edit)
+        for label, days in (("TDY", 0), ("TOM", 1), ("WEEK", 7)):
+            button = PushButton(label)
+            button.clicked.connect(lambda _=False, days=days: self.due_date_edit.setDate(QDate.currentDate().addDays(days)))
+            button.setMaximumWidth(80)
+            due_date_layout.addWidget(button)
+        form_layout = QFormLayout()
+        form_layout.addRow("Due Date:", due_date_layout)
+        layout.addLayout(form_layout)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def due_date(self):
+        return self.due_date_edit.date().toString("yyyy-MM-dd")
+
+
+class MoveTodosDialog(QDialog):
+    """Pick the task to move tasks under, or the top level
+
+    The candidates come from the search index, so the list stays short
+    however large the tree is.
+    """
+    MAX_RESULTS = 200
+
+    def __init__(self, store, search_index, excluded_ids, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.search_index = search_index
+        # The tasks being moved and their sub-items can't be the new parent
+        self.excluded_ids = excluded_ids
+        self.setWindowTitle("Move To")
+        self.setModal(True)
+        self.resize(600, 400)
+
+        layout = QVBoxLayout(self)
+        self.search_box = SearchLineEdit()
+        self.search_box.setPlaceholderText("Search for the new parent task...")
+        self.search_box.textChanged.connect(self.update_results)
+        layout.addWidget(self.search_box)
+        self.results = ListWidget()
+        self.results.itemDoubleClicked.connect(self.accept)
+        layout.addWidget(self.results)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+        self.update_results()
+
+    def update_results(self):
+        """List the top level and the tasks matching the search text (the root tasks without one)"""
+        query = self.search_box.text().strip()
+        if query:
+            candidates = (self.store.get(todo_id) for todo_id in self.search_index.search(query))
+        else:
+            candidates = iter(self.store.todos)
+        shown = []
+        for todo in candidates:
+            if todo.id not in self.excluded_ids:
+                shown.append(todo)
+                if len(shown) == self.MAX_RESULTS:
+                    break
+        shown.sort(key=lambda todo: todo.text.casefold())
+        self.results.clear()
+        top_level = QListWidgetItem("(Top level)")
+        top_level.setData(Qt.ItemDataRole.UserRole, None)
+        self.results.addItem(top_level)
+        for todo in shown:
+            item = QListWidgetItem(todo.text)
+            item.setData(Qt.ItemDataRole.UserRole, todo.id)
+            parent = self.store.parent_of(todo)
+            if parent is not None:
+                item.setToolTip(f"Under: {parent['text']}")
+            self.results.addItem(item)
+        self.results.setCurrentRow(0)
+
+    def target(self):
+        """Return the chosen parent todo (None for the top level)"""
+        item = self.results.currentItem()
+        todo_id = None if item is None else item.data(Qt.ItemDataRole.UserRole)
+        return None if todo_id is None else self.store.get(todo_id)
+
+
+class StatsInterface(QWidget):
+    """Statistics over the whole todo list, kept current while the page is shown"""
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        # Columns mirroring the store, built the first time the page is shown
+        self.columns = TodoColumns(store)
+        self.columns.updated = self.schedule_refresh
+        # Bursts of changes (loading, bulk actions) refresh the page once
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(200)
+        self.refresh_timer.timeout.connect(self.refresh)
         self.init_ui()
 
     def init_ui(self):
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setContentsMargins(20, 20, 20, 20)
-        
-        # 标题
-        title_label = BodyLabel("Jira User Story Generator")
+
+        title_label = BodyLabel("Statistics")
         title_label.setStyleSheet("font-size: 24px; font-weight: bold; margin-bottom: 20px;")
         self.main_layout.addWidget(title_label)
-        
-        # 输入区域
-        input_group = QGroupBox("Generate User Stories")
-        input_layout = QFormLayout(input_group)
-        
-        # 用户输入框
-        self.user_input = LineEdit()
-        self.user_input.setPlaceholderText("Enter your requirement or feature description...")
-        self.user_input.returnPressed.connect(self.generate_user_stories)
-        input_layout.addRow("Requirement:", self.user_input)
-        
-        # 生成和创建按钮行
-        buttons_layout = QHBoxLayout()
-        
-        self.generate_button = PrimaryPushButton("Generate User Stories")
-        self.generate_button.setIcon(Icon(FluentIcon.ROBOT))
-        self.generate_button.clicked.connect(self.generate_user_stories)
-        buttons_layout.addWidget(self.generate_button)
-        
-        self.create_all_button = PrimaryPushButton("Create All in Jira")
-        self.create_all_button.setIcon(Icon(FluentIcon.ADD))
-        self.create_all_button.clicked.connect(self.create_all_stories_in_jira)
-        self.create_all_button.setEnabled(False)
-        buttons_layout.addWidget(self.create_all_button)
-        
-        self.create_selected_button = PushButton("Create Selected")
-        self.create_selected_button.setIcon(Icon(FluentIcon.ADD))
-        self.create_selected_button.clicked.connect(self.create_selected_story_in_jira)
-        self.create_selected_button.setEnabled(False)
-        buttons_layout.addWidget(self.create_selected_button)
-        
-        input_layout.addRow(buttons_layout)
-        
-        self.main_layout.addWidget(input_group)
-        
-        # 结果显示区域
-        results_group = QGroupBox("Generated User Stories")
-        results_layout = QVBoxLayout(results_group)
-        
-        # 使用TreeWidget显示生成的User Stories
-        self.stories_tree = TreeWidget()
-        self.stories_tree.setHeaderLabels(["Title", "Type", "Priority"])
-        self.stories_tree.setColumnWidth(0, 400)
-        self.stories_tree.setColumnWidth(1, 100)
-        self.stories_tree.setColumnWidth(2, 100)
-        self.stories_tree.setMinimumHeight(200)  # 设置最小高度
-        self.stories_tree.setMaximumHeight(300)  # 设置最大高度
-        self.stories_tree.setStyleSheet("""
-            QTreeWidget::item { 
-                height: 35px; 
-                padding: 5px;
-                border-bottom: 1px solid #e0e0e0;
-            }
-            QTreeWidget::item:selected {
-                background-color: #e3f2fd;
-            }
-            QTreeWidget::item:hover {
-                background-color: #f5f5f5;
-            }
-        """)
-        self.stories_tree.itemClicked.connect(self.on_story_selected)
-        results_layout.addWidget(self.stories_tree)
-        
-        self.main_layout.addWidget(results_group)
-        
-        # 详细信息显示区域
-        details_group = QGroupBox("Story Details & Edit")
-        details_layout = QVBoxLayout(details_group)
-        details_layout.setSpacing(15)  # 增加垂直间距
-        
-        # 创建滚动区域
-        from PyQt6.QtWidgets import QScrollArea
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        # scroll_area.setMinimumHeight(300)
-        # scroll_area.setMaximumHeight(800)
-        
-        # 创建滚动内容容器
-        scroll_content = QWidget()
-        scroll_layout = QVBoxLayout(scroll_content)
-        scroll_layout.setSpacing(20)  # 增加组件间距
-        scroll_layout.setContentsMargins(10, 10, 10, 10)
-        
-        # 编辑表单
-        edit_form = QFormLayout()
-        edit_form.setVerticalSpacing(15)  # 增加表单行间距
-        
-        # 标题编辑
-        self.title_edit = LineEdit()
-        self.title_edit.setPlaceholderText("Story title...")
-        self.title_edit.setMinimumHeight(35)
-        edit_form.addRow("Title:", self.title_edit)
-        
-        # 类型选择
-        self.type_combo = ComboBox()
-        self.type_combo.addItems(["Story", "Task", "Epic", "Bug"])
-        self.type_combo.setMinimumHeight(35)
-        edit_form.addRow("Type:", self.type_combo)
-        
-        # 优先级选择
-        self.priority_combo = ComboBox()
-        self.priority_combo.addItems(["Low", "Medium", "High", "Critical"])
-        self.priority_combo.setMinimumHeight(35)
-        edit_form.addRow("Priority:", self.priority_combo)
-        
-        scroll_layout.addLayout(edit_form)
-        
-        # 描述编辑
-        desc_label = BodyLabel("Description:")
-        desc_label.setStyleSheet("font-weight: bold; margin-top: 10px; margin-bottom: 5px;")
-        scroll_layout.addWidget(desc_label)
-        
-        from PyQt6.QtWidgets import QTextEdit
-        self.description_edit = QTextEdit()
-        self.description_edit.setPlaceholderText("Enter story description...")
-        self.description_edit.setMinimumHeight(100)
-        self.description_edit.setMaximumHeight(150)
-        self.description_edit.setStyleSheet("""
-            QTextEdit {
-                border: 2px solid #e0e0e0;
-                border-radius: 8px;
-                padding: 8px;
-                font-size: 14px;
-                line-height: 1;
-            }
-            QTextEdit:focus {
-                border-color: #0078d4;
-            }
-        """)
-        scroll_layout.addWidget(self.description_edit)
-        
-        # 验收标准编辑
-        criteria_label = BodyLabel("Acceptance Criteria:")
-        criteria_label.setStyleSheet("font-weight: bold; margin-top: 15px; margin-bottom: 5px;")
-        scroll_layout.addWidget(criteria_label)
-        
-        self.criteria_edit = QTextEdit()
-        self.criteria_edit.setPlaceholderText("Enter acceptance criteria (one per line)...")
-        self.criteria_edit.setMinimumHeight(100)
-        self.criteria_edit.setMaximumHeight(150)
-        self.criteria_edit.setStyleSheet("""
-            QTextEdit {
-                border: 2px solid #e0e0e0;
-                border-radius: 8px;
-                padding: 8px;
-                font-size: 14px;
-                line-height: 1;
-            }
-            QTextEdit:focus {
-                border-color: #0078d4;
-            }
-        """)
-        scroll_layout.addWidget(self.criteria_edit)
-        
-        # 编辑按钮
-        edit_buttons_layout = QHBoxLayout()
-        edit_buttons_layout.setSpacing(10)
-        edit_buttons_layout.setContentsMargins(0, 15, 0, 0)
-        
-        self.update_story_button = PushButton("Update Story")
-        self.update_story_button.setIcon(Icon(FluentIcon.EDIT))
-        self.update_story_button.clicked.connect(self.update_selected_story)
-        self.update_story_button.setEnabled(False)
-        self.update_story_button.setMinimumHeight(35)
-        edit_buttons_layout.addWidget(self.update_story_button)
-        
-        self.delete_story_button = PushButton("Delete Story")
-        self.delete_story_button.setIcon(Icon(FluentIcon.DELETE))
-        self.delete_story_button.clicked.connect(self.delete_selected_story)
-        self.delete_story_button.setEnabled(False)
-        self.delete_story_button.setMinimumHeight(35)
-        edit_buttons_layout.addWidget(self.delete_story_button)
-        
-        edit_buttons_layout.addStretch()
-        scroll_layout.addLayout(edit_buttons_layout)
-        
-        # 设置滚动内容
-        scroll_area.setWidget(scroll_content)
-        details_layout.addWidget(scroll_area)
-        
-        self.main_layout.addWidget(details_group)
-        
-        # 存储当前选中的故事
-        self.current_selected_item = None
 
-    def generate_user_stories(self):
-        """生成用户故事"""
-        user_input = self.user_input.text().strip()
-        if not user_input:
-            InfoBar.warning(
-                title='Warning',
-                content='Please enter a requirement description',
-                orient=Qt.Orientation.Horizontal,
-                isClosable=True,
-                position=InfoBarPosition.TOP_RIGHT,
-                duration=2000,
-                parent=self.window()
-            )
-            return
-        
-        # 显示生成中状态
-        self.generate_button.setEnabled(False)
-        
-        # 使用Dummy数据模拟大模型生成
-        stories = self.generate_dummy_stories(user_input)
-        
-        # 清空之前的结果
-        self.stories_tree.clear()
-        self.clear_edit_form()
-        
-        # 填充生成的故事
-        for story in stories:
-            item = QTreeWidgetItem(self.stories_tree)
-            item.setText(0, story["title"])
-            item.setText(1, story["type"])
-            item.setText(2, story["priority"])
-            
-            # 存储完整的故事数据
-            item.setData(0, Qt.ItemDataRole.UserRole, story)
-        
-        # 展开所有项目
-        self.stories_tree.expandAll()
-        
-        # 更新状态
-        self.generate_button.setEnabled(True)
-        self.create_all_button.setEnabled(True)
-        
-        InfoBar.success(
-            title='Success',
-            content=f'Generated {len(stories)} user stories',
-            orient=Qt.Orientation.Horizontal,
-            isClosable=True,
-            position=InfoBarPosition.TOP_RIGHT,
-            duration=2000,
-            parent=self.window()
-        )
+        tasks_group = QGroupBox("Tasks")
+        tasks_form = QFormLayout(tasks_group)
+        self.total_label = BodyLabel()
+        tasks_form.addRow("Total:", self.total_label)
+        self.completed_label = BodyLabel()
+        tasks_form.addRow("Completed:", self.completed_label)
+        self.overdue_label = BodyLabel()
+        tasks_form.addRow("Overdue:", self.overdue_label)
+        self.due_soon_label = BodyLabel()
+        tasks_form.addRow(f"Due within {DUE_SOON_DAYS} days:", self.due_soon_label)
+        self.depth_label = BodyLabel()
+        tasks_form.addRow("Per level:", self.depth_label)
+        self.main_layout.addWidget(tasks_group)
 
-    def generate_dummy_stories(self, user_input):
-        """生成虚拟的用户故事数据"""
-        import random
-        
-        # 基于用户输入生成相关的故事
-        base_stories = [
-            {
-                "title": f"As a user, I want to {user_input.lower()}",
-                "type": "Story",
-                "priority": "High",
-                "description": f"As a user, I want to {user_input.lower()} so that I can achieve my goals efficiently.\n\nThis feature will enable users to perform the requested functionality with ease and reliability.",
-                "acceptance_criteria": [
-                    f"Given that I am a logged-in user",
-                    f"When I attempt to {user_input.lower()}",
-                    f"Then the system should allow me to complete the action successfully",
-                    f"And I should receive appropriate feedback",
-                    f"And the action should be logged for audit purposes"
-                ],
-                "acceptance_criteria_en": [
-                    f"Given that I am a logged-in user",
-                    f"When I attempt to {user_input.lower()}",
-                    f"Then the system should allow me to complete the action successfully",
-                    f"And I should receive appropriate feedback",
-                    f"And the action should be logged for audit purposes"
-                ]
-            },
-            {
-                "title": f"As an admin, I want to manage {user_input.lower()} settings",
-                "type": "Story", 
-                "priority": "Medium",
-                "description": f"As an administrator, I need to be able to configure and manage settings related to {user_input.lower()}.\n\nThis will ensure proper governance and control over the feature.",
-                "acceptance_criteria": [
-                    f"Given that I am an administrator",
-                    f"When I access the admin panel",
-                    f"Then I should see options to configure {user_input.lower()} settings",
-                    f"And I should be able to save changes",
-                    f"And changes should take effect immediately"
-                ],
-                "acceptance_criteria_en": [
-                    f"Given that I am an administrator",
-                    f"When I access the admin panel",
-                    f"Then I should see options to configure {user_input.lower()} settings",
-                    f"And I should be able to save changes",
-                    f"And changes should take effect immediately"
-                ]
-            },
-            {
-                "title": f"As a developer, I want to implement {user_input.lower()} API",
-                "type": "Task",
-                "priority": "High", 
-                "description": f"Implement the backend API endpoints required to support {user_input.lower()} functionality.\n\nThis includes creating the necessary controllers, services, and data models.",
-                "acceptance_criteria": [
-                    f"Given the API specification",
-                    f"When I implement the {user_input.lower()} endpoints",
-                    f"Then all endpoints should return proper HTTP status codes",
-                    f"And response data should match the specification",
-                    f"And proper error handling should be implemented"
-                ],
-                "acceptance_criteria_en": [
-                    f"Given the API specification",
-                    f"When I implement the {user_input.lower()} endpoints",
-                    f"Then all endpoints should return proper HTTP status codes",
-                    f"And response data should match the specification",
-                    f"And proper error handling should be implemented"
-                ]
-            }
-        ]
-        
-        # 随机选择1-3个故事
-        num_stories = random.randint(1, 3)
-        selected_stories = random.sample(base_stories, min(num_stories, len(base_stories)))
-        
-        return selected_stories
+        priority_group = QGroupBox("Open Tasks by Priority")
+        priority_form = QFormLayout(priority_group)
+        self.priority_labels = {}
+        for priority in reversed(Priority):
+            self.priority_labels[priority] = BodyLabel()
+            priority_form.addRow(f"{priority.label}:", self.priority_labels[priority])
+        self.main_layout.addWidget(priority_group)
 
-    def on_story_selected(self, item, column):
-        """当选择一个故事时加载到编辑表单"""
-        story_data = item.data(0, Qt.ItemDataRole.UserRole)
-        if story_data:
-            self.current_selected_item = item
-            
-            # 填充编辑表单
-            self.title_edit.setText(story_data['title'])
-            
-            # 设置类型
-            type_index = self.type_combo.findText(story_data['type'])
-            if type_index >= 0:
-                self.type_combo.setCurrentIndex(type_index)
-            
-            # 设置优先级
-            priority_index = self.priority_combo.findText(story_data['priority'])
-            if priority_index >= 0:
-                self.priority_combo.setCurrentIndex(priority_index)
-            
-            # 设置描述
-            self.description_edit.setPlainText(story_data['description'])
-            
-            # 设置验收标准
-            criteria_text = '\n'.join(story_data['acceptance_criteria'])
-            self.criteria_edit.setPlainText(criteria_text)
-            
-            # 启用编辑按钮
-            self.update_story_button.setEnabled(True)
-            self.delete_story_button.setEnabled(True)
-            self.create_selected_button.setEnabled(True)
-
-    def update_selected_story(self):
-        """更新选中的故事"""
-        if not self.current_selected_item:
-            return
-        
-        # 获取编辑后的数据
-        updated_story = {
-            'title': self.title_edit.text().strip(),
-            'type': self.type_combo.currentText(),
-            'priority': self.priority_combo.currentText(),
-            'description': self.description_edit.toPlainText().strip(),
-            'acceptance_criteria': [line.strip() for line in self.criteria_edit.toPlainText().split('\n') if line.strip()]
-        }
-        
-        # 验证数据
-        if not updated_story['title']:
-            InfoBar.warning(
-                title='Warning',
-                content='Title cannot be empty',
-                orient=Qt.Orientation.Horizontal,
-                isClosable=True,
-                position=InfoBarPosition.TOP_RIGHT,
-                duration=2000,
-                parent=self.window()
-            )
-            return
-        
-        # 更新树形控件显示
-        self.current_selected_item.setText(0, updated_story['title'])
-        self.current_selected_item.setText(1, updated_story['type'])
-        self.current_selected_item.setText(2, updated_story['priority'])
-        
-        # 更新存储的数据
-        self.current_selected_item.setData(0, Qt.ItemDataRole.UserRole, updated_story)
-        
-        InfoBar.success(
-            title='Success',
-            content='Story updated successfully',
-            orient=Qt.Orientation.Horizontal,
-            isClosable=True,
-            position=InfoBarPosition.TOP_RIGHT,
-            duration=2000,
-            parent=self.window()
-        )
+        week_group = QGroupBox(f"Tasks Created per Week (last {WEEKS})")
+        self.week_form = QFormLayout(week_group)
+        self.week_labels = []
+        for _ in range(WEEKS):
+            self.week_labels.append((BodyLabel(), BodyLabel()))
+            self.week_form.addRow(*self.week_labels[-1])
+        self.main_layout.addWidget(week_group)
 
-    def delete_selected_story(self):
-        """删除选中的故事"""
-        if not self.current_selected_item:
-            return
-        
-        # 确认删除
-        from qfluentwidgets import MessageBox
-        w = MessageBox(
-            'Delete Story',
-            'Are you sure you want to delete this story?',
-            self.window()
-        )
-        if w.exec():
-            # 从树形控件中移除
-            root = self.stories_tree.invisibleRootItem()
-            if root is None:
-                return
-            root.removeChild(self.current_selected_item)
-            
-            # 清空编辑表单
-            self.clear_edit_form()
-            self.current_selected_item = None
-            
-            # 更新按钮状态
-            self.update_story_button.setEnabled(False)
-            self.delete_story_button.setEnabled(False)
-            self.create_selected_button.setEnabled(False)
-            
-            # 检查是否还有故事
-            if self.stories_tree.topLevelItemCount() == 0:
-                self.create_all_button.setEnabled(False)
-            
-            InfoBar.success(
-                title='Success',
-                content='Story deleted successfully',
-                orient=Qt.Orientation.Horizontal,
-                isClosable=True,
-                position=InfoBarPosition.TOP_RIGHT,
-                duration=2000,
-                parent=self.window()
-            )
+        self.timing_label = BodyLabel()
+        self.main_layout.addWidget(self.timing_label)
+        self.main_layout.addStretch()
 
-    def clear_edit_form(self):
-        """清空编辑表单"""
-        self.title_edit.clear()
-        self.type_combo.setCurrentIndex(0)
-        self.priority_combo.setCurrentIndex(1)  # Medium
-        self.description_edit.clear()
-        self.criteria_edit.clear()
-        
-        # 重置按钮状态
-        self.update_story_button.setEnabled(False)
-        self.delete_story_button.setEnabled(False)
-        self.create_selected_button.setEnabled(False)
-        self.current_selected_item = None
-
-    def create_selected_story_in_jira(self):
-        """在Jira中创建选中的故事"""
-        if not self.current_selected_item:
-            return
-        
-        # 从环境变量读取项目键
-        project_key = os.getenv('JIRA_PROJECT_KEY', '').strip()
-        if not project_key:
-            InfoBar.warning(
-                title='Warning',
-                content='JIRA_PROJECT_KEY environment variable not set',
-                orient=Qt.Orientation.Horizontal,
-                isClosable=True,
-                position=InfoBarPosition.TOP_RIGHT,
-                duration=2000,
-                parent=self.window()
-            )
-            return
-        
-        story_data = self.current_selected_item.data(0, Qt.ItemDataRole.UserRole)
-        self.create_story_in_jira(story_data, project_key)
-
-    def create_all_stories_in_jira(self):
-        """在Jira中创建所有故事"""
-        # 从环境变量读取项目键
-        project_key = os.getenv('JIRA_PROJECT_KEY', '').strip()
-        if not project_key:
-            InfoBar.warning(
-                title='Warning',
-                content='JIRA_PROJECT_KEY environment variable not set',
-                orient=Qt.Orientation.Horizontal,
-                isClosable=True,
-                position=InfoBarPosition.TOP_RIGHT,
-                duration=2000,
-                parent=self.window()
-            )
-            return
-        
-        # 获取所有故事
-        stories = []
-        for i in range(self.stories_tree.topLevelItemCount()):
-            item = self.stories_tree.topLevelItem(i)
-            if item:
-                story_data = item.data(0, Qt.ItemDataRole.UserRole)
-                if story_data:
-                    stories.append(story_data)
-        
-        if not stories:
-            InfoBar.warning(
-                title='Warning',
-                content='No stories to create',
-                orient=Qt.Orientation.Horizontal,
-                isClosable=True,
-                position=InfoBarPosition.TOP_RIGHT,
-                duration=2000,
-                parent=self.window()
-            )
-            return
-        
-        # 创建所有故事
-        success_count = 0
-        for story in stories:
-            if self.create_story_in_jira(story, project_key, show_individual_notification=False):
-                success_count += 1
-        
-        InfoBar.success(
-            title='Success',
-            content=f'Created {success_count}/{len(stories)} stories in Jira',
-            orient=Qt.Orientation.Horizontal,
-            isClosable=True,
-            position=InfoBarPosition.TOP_RIGHT,
-            duration=3000,
-            parent=self.window()
+    def schedule_refresh(self):
+        if self.isVisible():
+            self.refresh_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def refresh(self):
+        self.refresh_timer.stop()
+        start = time.perf_counter()
+        stats = self.columns.stats()
+        elapsed = (time.perf_counter() - start) * 1000
+        self.total_label.setText(f"{stats.total:,}")
+        self.completed_label.setText(f"{stats.completed:,}")
+        self.overdue_label.setText(f"{stats.overdue:,}")
+        self.due_soon_label.setText(f"{stats.due_soon:,}")
+        self.depth_label.setText(
+            "  ".join(f"{level}: {count:,}" for level, count in enumerate(stats.by_depth)) or "-"
         )
+        for priority, label in self.priority_labels.items():
+            label.setText(f"{stats.open_by_priority[priority]:,}")
+        for (week_label, count_label), (monday, count) in zip(self.week_labels, stats.created_per_week):
+            week_label.setText(f"Week of {monday.isoformat()}:")
+            count_label.setText(f"{count:,}")
+        self.timing_label.setText(f"Computed in {elapsed:.1f} ms")
 
-    def create_story_in_jira(self, story_data, project_key, show_individual_notification=True):
-        """在Jira中创建单个故事 (使用Dummy数据模拟)"""
-        try:
-            # 模拟API调用延迟
-            import time
-            time.sleep(0.5)
-            
-            # 模拟Jira API调用
-            # 这里应该是真实的Jira API调用
-            jira_issue = {
-                'key': f'{project_key}-{hash(story_data["title"]) % 1000:03d}',
-                'summary': story_data['title'],
-                'description': story_data['description'],
-                'issuetype': story_data['type'],
-                'priority': story_data['priority'],
-                'acceptance_criteria': story_data['acceptance_criteria']
-            }
-            
-            # 模拟成功创建
-            if show_individual_notification:
-                InfoBar.success(
-                    title='Jira Story Created',
-                    content=f'Created: {jira_issue["key"]} - {story_data["title"][:50]}...',
-                    orient=Qt.Orientation.Horizontal,
-                    isClosable=True,
-                    position=InfoBarPosition.TOP_RIGHT,
-                    duration=3000,
-                    parent=self.window()
-                )
-            
-            return True
-            
-        except Exception as e:
-            if show_individual_notification:
-                InfoBar.error(
-                    title='Error',
-                    content=f'Failed to create story in Jira: {str(e)}',
-                    orient=Qt.Orientation.Horizontal,
-                    isClosable=True,
-                    position=InfoBarPosition.TOP_RIGHT,
-                    duration=3000,
-                    parent=self.window()
-                )
-            return False
+
+class LazyInterface(QWidget):
+    """A navigation page whose content is created the first time it is shown
+
+    Keeps pages that are seldom opened, and whatever they import, out of
+    startup.
+    """
+    def __init__(self, create, parent=None):
+        super().__init__(parent)
+        self.create = create
+        self.content = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def showEvent(self, event):
+        if self.content is None:
+            self.content = self.create()
+            self.layout().addWidget(self.content)
+        super().showEvent(event)
 
 
 class TodoApp(FluentWindow):
     def __init__(self):
         super().__init__()
         self.todo_interface = TodoInterface()
-        self.button_interface = JiraInterface()
+        # Built the first time their navigation items are selected
+        self.stats_interface = LazyInterface(lambda: StatsInterface(self.todo_interface.store))
+        self.button_interface = LazyInterface(self.create_jira_interface)
         self.init_ui()
         self.setup_window()
 
     def init_ui(self):
         # Set object name before adding the interface
         self.todo_interface.setObjectName("todoInterface")
+        self.stats_interface.setObjectName("statsInterface")
         self.button_interface.setObjectName("JiraInterface")
         
         # Add the todo interface to the FluentWindow
         self.addSubInterface(self.todo_interface, Icon(FluentIcon.HOME), "Todo List", NavigationItemPosition.TOP)
+        self.addSubInterface(self.stats_interface, Icon(FluentIcon.PIE_SINGLE), "Statistics", NavigationItemPosition.TOP)
         
         # Add the button interface to the FluentWindow
         self.addSubInterface(self.button_interface, Icon(FluentIcon.ROBOT), "Story Generator", NavigationItemPosition.TOP)
 
+    def create_jira_interface(self):
+        from jira_interface import JiraInterface
+        return JiraInterface()
+
     def setup_window(self):
         """Setup window properties - center and maximize"""
         self.setWindowTitle("Fluent Todo List")
@@ -1464,6 +1315,12 @@ class TodoApp(FluentWindow):
         # Maximize the window
         self.showMaximized()
 
+    def closeEvent(self, event):
+        # Make sure the write-behind saver has written everything before exiting
+        self.todo_interface.flush_todos()
+        self.todo_interface.save_view_state()
+        super().closeEvent(event)
+
 
 def main():
     app = QApplication(sys.argv)
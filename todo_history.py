@@ -0,0 +1,121 @@
+"""Undo and redo for the changes made to a TodoStore
+
+Every change the UI makes is described by a change record, the same records
+the storages save (see todo_storage.apply_change). TodoStore.apply makes the
+change and returns the record that undoes it, and that is all the history
+keeps: an edit keeps the old field values, a removal the removed todos
+themselves (which are no longer in the tree, so nothing is copied), a
+completion only the todos whose state differed from their parent's. An
+entry costs memory in proportion to the change, never to the whole tree.
+
+Undoing applies the kept record through the store, so a view updates just
+the rows it touches, as for any other change, and keeps the record that
+redoes it in turn. There is no limit on the number of entries, only on their
+(estimated) size in bytes; the oldest entries are dropped first.
+"""
+import sys
+from collections import deque
+from contextlib import contextmanager
+
+from todo_node import Todo
+
+
+def change_size(change):
+    """Estimate the bytes a change record keeps alive, todos it holds included"""
+    size = 0
+    pending = [change]
+    while pending:
+        value = pending.pop()
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, list):
+            pending.extend(value)
+        elif isinstance(value, Todo):
+            # The priority is a shared enum member
+            pending.extend((value.text, value.created, value.children))
+            if value.raw is not None:
+                pending.append(value.raw)
+    return size
+
+
+class TodoHistory:
+    """Undo and redo stacks of change records for a TodoStore"""
+
+    def __init__(self, store, max_bytes=64 * 1024 * 1024):
+        self.store = store
+        self.max_bytes = max_bytes
+        # (record, size) pairs; the next one to undo or redo is at the end
+        self.undo_stack = deque()
+        self.redo_stack = deque()
+        self.size = 0  # Bytes held by both stacks
+        # Undo records of the group in progress, in the order they were made
+        self._group = None
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def apply(self, change):
+        """Make a change through the store as a new undo step (or part of the group in progress)"""
+        undo = self.store.apply(change)
+        if self._group is not None:
+            self._group.append(undo)
+            return
+        self._clear(self.redo_stack)
+        self._push(self.undo_stack, undo)
+
+    @contextmanager
+    def group(self):
+        """Make the changes applied in a with block one undo step, in one store batch"""
+        if self._group is not None:
+            # Part of the enclosing group
+            yield self
+            return
+        self._group = []
+        try:
+            with self.store.batch():
+                yield self
+        finally:
+            undo, self._group = self._group, None
+            if undo:
+                undo.reverse()
+                self._clear(self.redo_stack)
+                self._push(self.undo_stack, undo[0] if len(undo) == 1 else {"op": "batch", "changes": undo})
+
+    def undo(self):
+        """Undo the latest step; return the change record it made (to be saved), or None"""
+        return self._replay(self.undo_stack, self.redo_stack)
+
+    def redo(self):
+        """Redo the latest undone step; return the change record it made, or None"""
+        return self._replay(self.redo_stack, self.undo_stack)
+
+    def clear(self):
+        """Forget every step, e.g. when another list is loaded"""
+        self._clear(self.undo_stack)
+        self._clear(self.redo_stack)
+
+    def _replay(self, source, target):
+        if not source:
+            return None
+        change, size = source.pop()
+        self.size -= size
+        self._push(target, self.store.apply(change))
+        return change
+
+    def _clear(self, stack):
+        self.size -= sum(size for _, size in stack)
+        stack.clear()
+
+    def _push(self, stack, change):
+        size = change_size(change)
+        stack.append((change, size))
+        self.size += size
+        # The oldest steps go first: the bottom of the undo stack, then the
+        # farthest redo
+        while self.size > self.max_bytes:
+            _, size = (self.undo_stack or self.redo_stack).popleft()
+            self.size -= size
@@ -0,0 +1,1076 @@
+"""Model/view classes for the todo tree
+
+TodoTreeModel exposes the hierarchical todo list of a TodoStore (Todo
+nodes with a children list) to a QTreeView. The view only asks for the
+rows it paints, so a tree with many thousands of tasks costs no more to show
+than a screenful; the check box and the action buttons are painted by
+delegates instead of being widgets of their own. Store changes are passed on
+as row insertions, removals, layout changes and dataChanged, so the view
+keeps its scroll position, selection and expanded rows.
+
+Children are handed to the view only once their parent has been expanded
+(canFetchMore/fetchMore), so collapsed branches of a deep hierarchy cost
+nothing until they are opened.
+
+The Progress, Next Due and Top Priority columns show the store's cached
+roll-ups of each task's subtree.
+
+During a store batch the rows to repaint are collected and sent when it ends
+(or before rows move, since they are counted in rows), as one dataChanged
+from the first to the last changed row of each parent. Qt walks every
+persistent index for each row insertion, removal or move, and the view every
+row it shows between the ends of a dataChanged, so once a batch has sent a
+few of either the rest of it goes out as one layout change instead.
+
+Sorting only changes what the view shows: the model keeps its own sorted
+copy of each fetched sibling list (with every task's sort key cached) and
+places new and edited tasks in it, while the store keeps the saved order.
+A filter works the same way: while it is set, the sibling lists only hold
+the tasks that pass it and their ancestors, and matched search text is
+highlighted. Tasks are tested again as they are added and change, and rows
+come and go with them.
+"""
+from bisect import bisect_left
+
+from PyQt6.QtCore import (
+    Qt, QAbstractItemModel, QModelIndex, QPersistentModelIndex, QEvent, QRectF, QSize, pyqtSignal
+)
+from PyQt6.QtGui import QBrush, QColor, QFont, QFontMetricsF, QPainter, QPalette
+from PyQt6.QtWidgets import QApplication, QStyle, QStyleOptionViewItem
+from qfluentwidgets import TreeItemDelegate, getFont, isDarkTheme, themeColor
+
+from todo_node import day_text
+from todo_storage import PRIORITY_ORDER, todo_at, todo_sort_key
+from todo_store import TodoStoreListener, walk
+
+
+PRIORITY_COLORS = {
+    "Critical": QColor(255, 100, 100),  # Red
+    "High": QColor(255, 165, 0),        # Orange
+    "Medium": QColor(100, 149, 237),    # Blue
+    "Low": QColor(144, 238, 144)        # Light Green
+}
+PRIORITY_NAMES = {rank: priority for priority, rank in PRIORITY_ORDER.items()}
+
+# Fraction of a task's descendants that are completed (None without descendants)
+ProgressRole = Qt.ItemDataRole.UserRole + 1
+# (start, length) of the search text in a task's text (None if it isn't there)
+MatchRole = Qt.ItemDataRole.UserRole + 2
+
+
+class TodoTreeModel(QAbstractItemModel, TodoStoreListener):
+    """Item model over the todos of a TodoStore"""
+    COLUMNS = ["Task", "Priority", "Due Date", "Created", "Progress", "Next Due", "Top Priority", "Actions"]
+    PROGRESS_COLUMN = 4
+    NEXT_DUE_COLUMN = 5
+    TOP_PRIORITY_COLUMN = 6
+    ACTIONS_COLUMN = 7
+    ROW_HEIGHT = 50
+    # Combined once: the view asks for the flags of every row it lays out or
+    # repaints, and or-ing enum flags in Python is slow
+    ROW_FLAGS = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+    TASK_FLAGS = ROW_FLAGS | Qt.ItemFlag.ItemIsUserCheckable
+    # Row changes and repaints in one store batch that are sent one by one;
+    # the rest of the batch goes out as one layout change
+    BATCH_ROW_CHANGES = 8
+
+    # Emitted with a QPersistentModelIndex and the new state when a check box is clicked
+    checkToggled = pyqtSignal(object, bool)
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.todos = store.todos
+        store.add_listener(self)
+        # Row of every todo the view has asked an index for, by todo id; filled
+        # lazily and checked against the store before use. Parents come from
+        # the store's id index.
+        self._rows = {}
+        # Ids of the todos whose children have been fetched by the view
+        self._fetched = set()
+        # Whether the rows of the store change in progress are hidden from the view
+        self._hidden_change = False
+        # Todos the store change in progress removes
+        self._removed = None
+        # (sort_by, ascending) the rows are shown in, or None for the stored
+        # order, with the key function and the cached key of every task that
+        # has been placed
+        self.sort_order = None
+        self._sort_key = None
+        self._keys = {}  # todo id -> sort key
+        # While filtered: the search text (for highlighting), the test a task
+        # has to pass, the ids of the tasks that pass and, for every task
+        # shown, how many tasks in its subtree pass (None shows every task)
+        self.filter_query = ""
+        self._accepts = None
+        self._passed = None
+        self._visible = None  # todo id -> count
+        # Children shown under every fetched parent while sorted or filtered
+        self._shown = {}  # parent id (None for the roots) -> children in display order
+        # Fonts and brushes are shared by all rows instead of built per call
+        self._done_font = QFont(getFont(13))
+        self._done_font.setStrikeOut(True)
+        self._done_brush = QBrush(QApplication.palette().color(QPalette.ColorRole.PlaceholderText))
+        self._priority_brushes = {priority: QBrush(color) for priority, color in PRIORITY_COLORS.items()}
+        self._row_size = QSize(0, self.ROW_HEIGHT)
+        # While a store batch is in progress: parent id (None for the roots) ->
+        # [parent index, first row, last row, first column, last column] to repaint
+        self._pending_changes = None
+        # Row changes and repaints sent during the store batch in progress, and
+        # once the rest are folded into a layout change: the persistent indexes
+        # from before it and the todos removed since
+        self._batch_row_changes = 0
+        self._layout_indexes = None
+        self._layout_removed = None
+
+    # TodoStoreListener interface
+
+    def about_to_reset(self):
+        self.beginResetModel()
+
+    def reset(self):
+        self._rows.clear()
+        self._fetched.clear()
+        self._keys.clear()
+        self._shown.clear()
+        # The filter results belong to the old tree
+        self.filter_query = ""
+        self._accepts = None
+        self._passed = None
+        self._visible = None
+        self.endResetModel()
+
+    def about_to_insert(self, parent_path, first, last):
+        if self._visible is not None:
+            # New rows are tested against the filter once they are in the store
+            return
+        parent = self.index_at(parent_path)
+        if parent is not None and parent.isValid() and not self.todo_at(parent).children:
+            # A first child has nothing to wait for; show it right away
+            self._fetched.add(self.todo_at(parent).id)
+        self._hidden_change = parent is None or not self.is_fetched(parent)
+        if self._hidden_change:
+            return
+        if self.sort_order is None:
+            if not self._fold_row_change():
+                self.beginInsertRows(parent, first, last)
+        else:
+            # The new rows are placed once they are in the store (see inserted)
+            self.children_of(self.todo_at(parent))
+
+    def inserted(self, parent_path, first, last):
+        todos = self.store.children(parent_path)[first:last + 1]
+        if self._visible is not None:
+            self._refilter(walk(todos))
+        elif self._hidden_change:
+            return
+        elif self.sort_order is None:
+            if self._layout_indexes is None:
+                self.endInsertRows()
+        else:
+            self._insert_shown(self.todo_at(self.index_at(parent_path)), todos)
+
+    def about_to_remove(self, parent_path, first, last):
+        todos = self._removed = self.store.children(parent_path)[first:last + 1]
+        if self._visible is not None:
+            self._hidden_change = False
+            self._refilter(walk(todos), removing=True)
+            return
+        parent = self.index_at(parent_path)
+        self._hidden_change = parent is None or not self.is_fetched(parent)
+        if self._hidden_change:
+            return
+        if self.sort_order is None:
+            if not self._fold_row_change():
+                self.beginRemoveRows(parent, first, last)
+        else:
+            self._remove_shown(self.todo_at(parent), todos)
+
+    def removed(self, parent_path, first, last):
+        if self._hidden_change:
+            return
+        if self._layout_indexes is not None:
+            self._layout_removed.extend(self._removed)
+        elif not self._projected():
+            self.endRemoveRows()
+        self._forget(self._removed)
+        self._removed = None
+
+    def changed(self, path, recursive):
+        todo = todo_at(self.todos, path)
+        if not recursive:
+            # An edit may change the sort key
+            self._keys.pop(todo.id, None)
+        if self._visible is not None:
+            self._refilter(walk([todo]) if recursive else [todo])
+        index = self.index_of(todo)
+        if index is None:
+            return
+        if not recursive and self.sort_order is not None:
+            index = self._resort(index)
+        if recursive:
+            self.subtree_changed(index)
+        else:
+            self.rows_changed(index.parent(), index.row(), index.row())
+
+    def rolled_up(self, todos):
+        for todo in todos:
+            index = self.index_of(todo)
+            if index is not None:
+                self.rows_changed(index.parent(), index.row(), index.row(),
+                                  self.PROGRESS_COLUMN, self.TOP_PRIORITY_COLUMN)
+
+    def batch_started(self):
+        self._pending_changes = {}
+        self._batch_row_changes = 0
+
+    def batch_finished(self):
+        self._end_layout_change()
+        self._flush_changes()
+        self._pending_changes = None
+
+    def todo_at(self, index):
+        """Return the todo behind an index (None for the invisible root)"""
+        if not index.isValid():
+            return None
+        return index.internalPointer()
+
+    def children_of(self, todo):
+        """Return the shown children of a todo (None for the roots) in display order"""
+        children = self.todos if todo is None else todo.children
+        if not self._projected():
+            return children
+        parent_id = None if todo is None else todo.id
+        shown = self._shown.get(parent_id)
+        if shown is None:
+            if self._visible is not None:
+                children = [child for child in children if child.id in self._visible]
+            if self.sort_order is not None:
+                children = sorted(children, key=self._key, reverse=not self.sort_order[1])
+            shown = self._shown[parent_id] = children
+        return shown
+
+    def _projected(self):
+        # Whether rows come from the model's own sorted or filtered lists
+        return self.sort_order is not None or self._visible is not None
+
+    def index_at(self, path):
+        """Return the index of the todo at a store path ([] gives the invisible root)
+
+        Returns None if the todo is in a branch the view hasn't fetched yet.
+        """
+        if not path:
+            return QModelIndex()
+        return self.index_of(todo_at(self.todos, path))
+
+    def index_of(self, todo):
+        """Return the index of a todo, or None if it is filtered out or in a branch the view hasn't fetched"""
+        if self._visible is not None and todo.id not in self._visible:
+            return None
+        parent_todo = self.store.parent_of(todo)
+        if parent_todo is None:
+            parent = QModelIndex()
+        else:
+            parent = self.index_of(parent_todo)
+            if parent is None or not self.is_fetched(parent):
+                return None
+        return self.createIndex(self._row_of(todo, parent_todo), 0, todo)
+
+    def _row_of(self, todo, parent_todo):
+        # The cached row of todo if it is still right, else its current row
+        row = self._rows.get(todo.id, 0)
+        siblings = self.children_of(parent_todo)
+        if row >= len(siblings) or siblings[row] is not todo:
+            # Rows were inserted or removed before it since the row was cached
+            row = self._rows[todo.id] = siblings.index(todo)
+        return row
+
+    def is_fetched(self, index):
+        """Whether the children of an index have been handed to the view"""
+        # The few rows a filter shows are handed over all at once
+        return not index.isValid() or self._visible is not None or index.internalPointer().id in self._fetched
+
+    def _forget(self, todos):
+        # Drop what is cached about todos that are being removed and their descendants
+        pending = list(todos)
+        while pending:
+            todo = pending.pop()
+            self._rows.pop(todo.id, None)
+            self._fetched.discard(todo.id)
+            self._keys.pop(todo.id, None)
+            self._shown.pop(todo.id, None)
+            pending.extend(todo.children)
+
+    def rows_changed(self, parent, first, last, first_column=0, last_column=None):
+        """Repaint rows first to last under parent (held back during a store batch)"""
+        if self._layout_indexes is not None:
+            # The layout change repaints every row
+            return
+        if last_column is None:
+            last_column = len(self.COLUMNS) - 1
+        if self._pending_changes is None:
+            self.dataChanged.emit(self.index(first, first_column, parent), self.index(last, last_column, parent))
+            return
+        key = parent.internalPointer().id if parent.isValid() else None
+        pending = self._pending_changes.get(key)
+        if pending is None:
+            self._pending_changes[key] = [parent, first, last, first_column, last_column]
+        else:
+            pending[1] = min(pending[1], first)
+            pending[2] = max(pending[2], last)
+            pending[3] = min(pending[3], first_column)
+            pending[4] = max(pending[4], last_column)
+
+    def _flush_changes(self):
+        """Send the repaints held back so far, while their row numbers still hold
+
+        One dataChanged per parent, or a layout change once the store batch
+        has sent more than BATCH_ROW_CHANGES row changes and repaints.
+        """
+        if not self._pending_changes:
+            return
+        pending, self._pending_changes = self._pending_changes, {}
+        self._batch_row_changes += len(pending)
+        if self._batch_row_changes > self.BATCH_ROW_CHANGES:
+            # The view repaints every row on a layout change; no row has
+            # moved, so the persistent indexes stay as they are
+            self.layoutAboutToBeChanged.emit()
+            self.layoutChanged.emit()
+            return
+        for parent, first, last, first_column, last_column in pending.values():
+            self.dataChanged.emit(self.index(first, first_column, parent), self.index(last, last_column, parent))
+
+    # Held back repaints are counted in rows, so they go out before rows change
+
+    def beginInsertRows(self, parent, first, last):
+        self._flush_changes()
+        super().beginInsertRows(parent, first, last)
+
+    def beginRemoveRows(self, parent, first, last):
+        self._flush_changes()
+        super().beginRemoveRows(parent, first, last)
+
+    def beginMoveRows(self, parent, first, last, destination, row):
+        self._flush_changes()
+        return super().beginMoveRows(parent, first, last, destination, row)
+
+    def beginResetModel(self):
+        self._end_layout_change()
+        self._flush_changes()
+        super().beginResetModel()
+
+    def _fold_row_change(self):
+        """Whether a change to shown rows is left to the layout change of the store batch
+
+        Each row change makes Qt walk every persistent index (expanded and
+        selected rows) up to the root, so a batch that changes rows in many
+        places is cheaper to show as one layout change. Called before the
+        store changes.
+        """
+        if self._pending_changes is None:
+            return False
+        if self._layout_indexes is None:
+            self._batch_row_changes += 1
+            if self._batch_row_changes <= self.BATCH_ROW_CHANGES:
+                return False
+            self._begin_layout_change()
+        return True
+
+    def _begin_layout_change(self):
+        """Start the layout change the rest of the store batch goes out as"""
+        # The layout change repaints the rows held back too
+        self._pending_changes = {}
+        self.layoutAboutToBeChanged.emit()
+        self._layout_indexes = self.persistentIndexList()
+        # Kept alive until the indexes pointing at them are dropped
+        self._layout_removed = []
+
+    def _end_layout_change(self):
+        """Send the layout change the store batch has built up, if any"""
+        if self._layout_indexes is None:
+            return
+        old, self._layout_indexes = self._layout_indexes, None
+        removed, self._layout_removed = self._layout_removed, None
+        # Removed rows are gone from the view, even if their todos were added back
+        gone = {todo.id for todo in walk(removed)}
+        self.changePersistentIndexList(old, self._moved_indexes(old, gone))
+        self.layoutChanged.emit()
+
+    def subtree_changed(self, index):
+        """Repaint an item and all of its fetched descendants, one row range per parent
+
+        Outside a store batch the repaints are held back and sent together as
+        well, so a large open subtree goes out as one layout change.
+        """
+        if self._pending_changes is None:
+            self.batch_started()
+            self.subtree_changed(index)
+            self.batch_finished()
+            return
+        self.rows_changed(index.parent(), index.row(), index.row())
+        # A filter shows every row that passes; otherwise only fetched rows have children
+        every = self._visible is not None
+        fetched = self._fetched
+        pending = [index]
+        while pending:
+            parent = pending.pop()
+            count = self.rowCount(parent)
+            if not count:
+                continue
+            self.rows_changed(parent, 0, count - 1)
+            for row, todo in enumerate(self.children_of(self.todo_at(parent))):
+                if todo.children and (every or todo.id in fetched):
+                    pending.append(self.createIndex(row, 0, todo))
+
+    def set_sort_order(self, sort_by, ascending=True):
+        """Show siblings sorted by a criterion (None shows the stored order)
+
+        Only the view is reordered; the store and the saved todos keep theirs.
+        """
+        sort_order = None if sort_by is None else (sort_by, ascending)
+        if sort_order == self.sort_order:
+            return
+        self._end_layout_change()
+        self._flush_changes()
+        self.layoutAboutToBeChanged.emit()
+        if sort_by is None or self.sort_order is None or self.sort_order[0] != sort_by:
+            self._sort_key = None if sort_by is None else todo_sort_key(sort_by)
+            self._keys.clear()
+        self.sort_order = sort_order
+        # Rebuilt as the view asks for them
+        self._shown.clear()
+        old = self.persistentIndexList()
+        self.changePersistentIndexList(old, self._moved_indexes(old))
+        self.layoutChanged.emit()
+
+    def _moved_indexes(self, old, gone=()):
+        """Return where the persistent indexes old point to now
+
+        Point the view's persistent indexes (selection, expanded rows, current
+        row) at the new rows of their todos; those of the todos with ids in
+        gone, or that the filter hides, no longer point anywhere.
+        """
+        new = []
+        positions = {}  # parent id -> {child id: row}, built once per sibling list
+        visible = self._visible
+        parent_of = self.store.parent_of
+        for index in old:
+            todo = index.internalPointer()
+            if todo.id in gone or visible is not None and todo.id not in visible:
+                new.append(QModelIndex())
+                continue
+            parent_todo = parent_of(todo)
+            parent_id = None if parent_todo is None else parent_todo.id
+            rows = positions.get(parent_id)
+            if rows is None:
+                rows = positions[parent_id] = {
+                    child.id: row for row, child in enumerate(self.children_of(parent_todo))
+                }
+                # Qt looks up the rows above each persistent index as rows come
+                # and go, so the sibling lists up to the root are listed now,
+                # while they match what the view has
+                above = parent_todo
+                while above is not None:
+                    above = parent_of(above)
+                    above_id = None if above is None else above.id
+                    if above_id in positions:
+                        break
+                    positions[above_id] = {
+                        child.id: row for row, child in enumerate(self.children_of(above))
+                    }
+            row = rows[todo.id]
+            self._rows[todo.id] = row
+            new.append(self.createIndex(row, index.column(), todo))
+        return new
+
+    def _key(self, todo):
+        key = self._keys.get(todo.id)
+        if key is None:
+            key = self._keys[todo.id] = self._sort_key(todo)
+        return key
+
+    def _bisect(self, ordered, key, after_equal, skip=None):
+        # Binary search over a sorted sibling list (without the row skip) for
+        # the first row whose todo doesn't sort before key
+        ascending = self.sort_order[1]
+        low, high = 0, len(ordered) - (skip is not None)
+        while low < high:
+            middle = (low + high) // 2
+            other = self._key(ordered[middle if skip is None or middle < skip else middle + 1])
+            if other == key:
+                before = after_equal
+            else:
+                before = other < key if ascending else other > key
+            if before:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _insert_shown(self, parent_todo, todos):
+        """Put rows for todos into the shown children of parent_todo
+
+        Sorted rows go to their sorted places, after rows with an equal key
+        like a stable sort; otherwise the rows keep the stored order.
+        """
+        parent_id = None if parent_todo is None else parent_todo.id
+        shown = self._shown_before(parent_id, parent_todo, todos, False)
+        if shown is None:
+            return
+        parent = QModelIndex() if parent_todo is None else self.index_of(parent_todo)
+        if self.sort_order is not None:
+            todos = sorted(todos, key=self._key, reverse=not self.sort_order[1])
+            places = [self._bisect(shown, self._key(todo), True) for todo in todos]
+        else:
+            siblings = self.todos if parent_todo is None else parent_todo.children
+            stored = {id(todo): row for row, todo in enumerate(siblings)}
+            todos = sorted(todos, key=lambda todo: stored[id(todo)])
+            shown_rows = [stored[id(todo)] for todo in shown]
+            places = [bisect_left(shown_rows, stored[id(todo)]) for todo in todos]
+        # Todos with the same place go in as one run
+        inserted = start = 0
+        for end in range(1, len(todos) + 1):
+            if end < len(todos) and places[end] == places[start]:
+                continue
+            row = places[start] + inserted
+            self.beginInsertRows(parent, row, row + end - start - 1)
+            shown[row:row] = todos[start:end]
+            self.endInsertRows()
+            inserted += end - start
+            start = end
+
+    def _shown_before(self, parent_id, parent_todo, todos, listed):
+        """Return the shown children of parent_todo as the view has them, before todos come or go
+
+        listed tells whether todos are among them. Returns None if the change
+        is left to the layout change of the store batch instead.
+        """
+        shown = self._shown.get(parent_id)
+        if shown is None and self._layout_indexes is not None:
+            # Listed when the view asks, once the layout change is out
+            return None
+        if self._fold_row_change():
+            self._shown.pop(parent_id, None)
+            return None
+        if shown is None:
+            changing = {todo.id for todo in todos}
+            shown = self._list_shown(parent_id, parent_todo, changing if listed else (), () if listed else changing)
+        return shown
+
+    def _list_shown(self, parent_id, parent_todo, going, coming):
+        """List the shown children of parent_todo as the view has them, with the ids going and without those coming
+
+        For a list not made since the last layout change, while the view still
+        has the rows.
+        """
+        children = self.todos if parent_todo is None else parent_todo.children
+        visible = self._visible
+        shown = [child for child in children
+                 if child.id in going or child.id not in coming and (visible is None or child.id in visible)]
+        if self.sort_order is not None:
+            shown.sort(key=self._key, reverse=not self.sort_order[1])
+        self._shown[parent_id] = shown
+        return shown
+
+    def _remove_shown(self, parent_todo, todos):
+        """Take the rows of todos out of the shown children of parent_todo"""
+        parent_id = None if parent_todo is None else parent_todo.id
+        shown = self._shown_before(parent_id, parent_todo, todos, True)
+        if shown is None:
+            return
+        parent = QModelIndex() if parent_todo is None else self.index_of(parent_todo)
+        if len(todos) == 1:
+            rows = [self._row_of(todos[0], parent_todo)]
+        else:
+            positions = {id(todo): row for row, todo in enumerate(shown)}
+            rows = sorted(positions[id(todo)] for todo in todos)
+        # In runs of adjacent rows from the bottom up so the rows above keep their numbers
+        end = len(rows)
+        while end:
+            start = end - 1
+            while start and rows[start - 1] == rows[start] - 1:
+                start -= 1
+            self.beginRemoveRows(parent, rows[start], rows[end - 1])
+            del shown[rows[start]:rows[end - 1] + 1]
+            self.endRemoveRows()
+            end = start
+
+    def _resort(self, index):
+        """Move an edited row to its sorted place and return its new index
+
+        Rows with an equal key keep their order relative to it, as a stable
+        sort would leave them.
+        """
+        todo = self.todo_at(index)
+        key = self._keys[todo.id] = self._sort_key(todo)
+        parent = index.parent()
+        ordered = self.children_of(self.todo_at(parent))
+        row = index.row()
+        first = self._bisect(ordered, key, False, row)
+        last = self._bisect(ordered, key, True, row)
+        new_row = min(max(row, first), last)
+        if new_row == row:
+            return index
+        if self._fold_row_change():
+            ordered.insert(new_row, ordered.pop(row))
+            return self.createIndex(new_row, 0, todo)
+        # Qt wants the row to insert before, counted with the moved row still there
+        self.beginMoveRows(parent, row, row, parent, new_row + 1 if new_row > row else new_row)
+        ordered.insert(new_row, ordered.pop(row))
+        self.endMoveRows()
+        return self.index(new_row, 0, parent)
+
+    def set_filter(self, query, matches, accepts=None):
+        """Show only the tasks with the given ids and their ancestors (None shows all)
+
+        query is the search text the ids were found by; it is highlighted in
+        the matching rows. accepts(todo) tells whether a task passes the
+        filter (by default, whether its text contains query); it decides about
+        tasks as they are added and change, so the rows stay filtered.
+
+        Going from one filter to another only shows and hides the rows of the
+        tasks that started or stopped passing, as when tasks change; setting
+        or clearing a filter is one layout change. Either way fetched rows,
+        and the expanded and selected rows still shown, stay as they are.
+        """
+        self._end_layout_change()
+        self._flush_changes()
+        if matches is None:
+            if self._visible is not None:
+                self._change_filter(self._unfilter)
+            return
+        query = query.casefold()
+        accepts = accepts or (lambda todo: self.match_span(todo) is not None)
+        passed = set(matches)
+        if self._visible is None:
+            self._change_filter(lambda: self._filter(query, accepts, passed))
+            return
+        old = self._passed
+        gained, lost = passed - old, old - passed
+        # Rows that still match show the new search text highlighted
+        kept = old & passed if query != self.filter_query else ()
+        self.filter_query = query
+        self._accepts = accepts
+        # Held back and sent as a store batch would be: a few row changes one
+        # by one, or one layout change if there are more
+        batch = self._pending_changes is None
+        if batch:
+            self.batch_started()
+        if len(gained) + len(lost) + len(kept) > self.BATCH_ROW_CHANGES:
+            self._begin_layout_change()
+        get = self.store.get
+        if self._layout_indexes is not None and len(gained) + len(lost) > len(passed) // 2:
+            # Counting up from the tasks that pass is about half the work per
+            # task of counting a change
+            self._shown.clear()
+            self._filter(query, accepts, passed)
+        else:
+            self._show_passing([(get(todo_id), True) for todo_id in gained] +
+                               [(get(todo_id), False) for todo_id in lost])
+        for todo_id in kept if self._layout_indexes is None else ():
+            index = self.index_of(get(todo_id))
+            self.rows_changed(index.parent(), index.row(), index.row(), 0, 0)
+        if batch:
+            self.batch_finished()
+        else:
+            # The view lays out the new rows next; the repaints wait for the store batch
+            self._end_layout_change()
+
+    def _change_filter(self, change):
+        # Set or clear the filter with change() as one layout change
+        self.layoutAboutToBeChanged.emit()
+        change()
+        # Rebuilt as the view asks for them
+        self._shown.clear()
+        old = self.persistentIndexList()
+        self.changePersistentIndexList(old, self._moved_indexes(old))
+        self.layoutChanged.emit()
+
+    def _filter(self, query, accepts, passed):
+        self.filter_query = query
+        self._accepts = accepts
+        self._passed = passed
+        visible = {}
+        # Straight from the store's parent links: this runs over every task that passes
+        parents = self.store.parents
+        for todo_id in passed:
+            while True:
+                visible[todo_id] = visible.get(todo_id, 0) + 1
+                parent = parents[todo_id]
+                if parent is None:
+                    break
+                todo_id = parent.id
+        self._visible = visible
+
+    def _unfilter(self):
+        self.filter_query = ""
+        self._accepts = None
+        self._passed = None
+        self._visible = None
+        # While filtered every row counted as fetched; the rows the view keeps
+        # (the expanded ones among them) and the rows above them stay so
+        for index in self.persistentIndexList():
+            todo = index.internalPointer()
+            while todo is not None and todo.id not in self._fetched:
+                self._fetched.add(todo.id)
+                todo = self.store.parent_of(todo)
+
+    def is_filtered(self):
+        """Whether a filter is set"""
+        return self._visible is not None
+
+    def holds_matches(self, todo):
+        """Whether tasks below a shown task pass the filter"""
+        return self._visible.get(todo.id, 0) > (todo.id in self._passed)
+
+    def _refilter(self, todos, removing=False):
+        """Test todos against the filter again and show or hide the rows that change
+
+        With removing, todos are about to leave the store and no longer pass.
+        """
+        self._show_passing([(todo, not removing and self._accepts(todo)) for todo in todos])
+
+    def _show_passing(self, results):
+        """Take in whether each todo of (todo, passes) pairs passes, and show or hide the rows that change"""
+        visible = self._visible
+        # Within a layout change only the counts are kept, and the sibling
+        # lists of the rows that come or go listed again
+        folded = self._layout_indexes is not None
+        was_visible = {}  # id -> (todo, visible before) for every count that changed
+        for todo, passes in results:
+            if passes == (todo.id in self._passed):
+                continue
+            if passes:
+                self._passed.add(todo.id)
+            else:
+                self._passed.discard(todo.id)
+            step = 1 if passes else -1
+            node = todo
+            while node is not None:
+                count = visible.get(node.id, 0)
+                parent = self.store.parent_of(node)
+                if not folded:
+                    was_visible.setdefault(node.id, (node, count > 0))
+                elif not count or count + step == 0:
+                    self._shown.pop(None if parent is None else parent.id, None)
+                if count + step:
+                    visible[node.id] = count + step
+                else:
+                    del visible[node.id]
+                node = parent
+        if folded:
+            return
+        # Rows that go or come under a parent that stays; the rows under them go
+        # or come with them
+        going, coming = {}, {}  # parent id -> (parent, todos)
+        for todo_id, (todo, before) in was_visible.items():
+            if (todo_id in visible) == before:
+                continue
+            parent = self.store.parent_of(todo)
+            parent_id = None if parent is None else parent.id
+            if before:
+                if parent_id is None or parent_id in visible:
+                    going.setdefault(parent_id, (parent, []))[1].append(todo)
+            elif parent_id is None or was_visible.get(parent_id, (None, parent_id in visible))[1]:
+                coming.setdefault(parent_id, (parent, []))[1].append(todo)
+        # Qt and index_of look up rows, and so list siblings, while rows go;
+        # each list changed here is made now, as the view has it
+        for parent_id, (parent, todos) in going.items():
+            if parent_id not in self._shown:
+                later = coming.get(parent_id, (parent, ()))[1]
+                self._list_shown(parent_id, parent, {todo.id for todo in todos}, {todo.id for todo in later})
+        for parent_id, (parent, todos) in coming.items():
+            if parent_id not in self._shown:
+                self._list_shown(parent_id, parent, (), {todo.id for todo in todos})
+        for parent, todos in going.values():
+            self._remove_shown(parent, todos)
+            # Their shown children are listed again if they come back
+            pending = list(todos)
+            while pending:
+                shown = self._shown.pop(pending.pop().id, None)
+                if shown:
+                    pending.extend(shown)
+        for parent, todos in coming.values():
+            self._insert_shown(parent, todos)
+
+    def match_span(self, todo):
+        """Return (start, length) of the search text in a task's text, or None"""
+        text = todo.text.casefold()
+        start = text.find(self.filter_query)
+        if start < 0:
+            return None
+        if len(text) != len(todo.text):
+            # Casefolding changed the length; positions don't carry over
+            return 0, 0
+        return start, len(self.filter_query)
+
+    # QAbstractItemModel interface
+
+    def index(self, row, column, parent=QModelIndex()):
+        # The checks of rowCount, without building the sibling list twice
+        if parent.column() > 0 or not 0 <= column < len(self.COLUMNS) or not self.is_fetched(parent):
+            return QModelIndex()
+        children = self.children_of(self.todo_at(parent))
+        if not 0 <= row < len(children):
+            return QModelIndex()
+        todo = children[row]
+        self._rows[todo.id] = row
+        return self.createIndex(row, column, todo)
+
+    def parent(self, index=None):
+        if index is None:
+            # QObject.parent()
+            return super().parent()
+        # Qt asks for the parents of every persistent index on each row
+        # removal, so this avoids the helper calls of the other lookups
+        if not index.isValid():
+            return QModelIndex()
+        parents = self.store.parents
+        parent_todo = parents.get(index.internalPointer().id)
+        if parent_todo is None:
+            return QModelIndex()
+        parent_id = parent_todo.id
+        row = self._rows.get(parent_id, 0)
+        if self._projected():
+            return self.createIndex(self._row_of(parent_todo, parents[parent_id]), 0, parent_todo)
+        grandparent = parents[parent_id]
+        siblings = self.todos if grandparent is None else grandparent.children
+        if row >= len(siblings) or siblings[row] is not parent_todo:
+            row = self._rows[parent_id] = siblings.index(parent_todo)
+        return self.createIndex(row, 0, parent_todo)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0 or not self.is_fetched(parent):
+            return 0
+        return len(self.children_of(self.todo_at(parent)))
+
+    def hasChildren(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return False
+        todo = self.todo_at(parent)
+        if self._visible is not None:
+            return bool(self.children_of(todo))
+        # Show the expand arrow even before the children are fetched
+        return bool(self.todos if todo is None else todo.children)
+
+    def canFetchMore(self, parent):
+        return not self.is_fetched(parent) and bool(self.todo_at(parent).children)
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent):
+            return
+        count = len(self.todo_at(parent).children)
+        self.beginInsertRows(parent, 0, count - 1)
+        self._fetched.add(self.todo_at(parent).id)
+        self.endInsertRows()
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return self.TASK_FLAGS if index.column() == 0 else self.ROW_FLAGS
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        todo = index.internalPointer()
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return todo.text
+            if column == 1:
+                return todo["priority"]
+            if column == 2:
+                return todo["due_date"]
+            if column == 3:
+                return todo["create_date"][:10]  # Show only date part
+            if column == self.PROGRESS_COLUMN:
+                rollup = self.store.rollup(todo)
+                return f"{rollup.completed}/{rollup.descendants}" if rollup.descendants else None
+            if column == self.NEXT_DUE_COLUMN:
+                return day_text(self.store.rollup(todo).earliest_due)
+            if column == self.TOP_PRIORITY_COLUMN:
+                return PRIORITY_NAMES.get(self.store.rollup(todo).top_priority, "")
+            return None
+        if role == MatchRole:
+            if column == 0 and self.filter_query:
+                return self.match_span(todo)
+            return None
+        if role == ProgressRole:
+            rollup = self.store.rollup(todo)
+            return rollup.completed / rollup.descendants if rollup.descendants else None
+        if role == Qt.ItemDataRole.CheckStateRole:
+            if column == 0:
+                return Qt.CheckState.Checked if todo.completed else Qt.CheckState.Unchecked
+            return None
+        if role == Qt.ItemDataRole.FontRole:
+            if todo.completed and column != self.ACTIONS_COLUMN:
+                return self._done_font
+            return None
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if column == 1:
+                # Color code by priority
+                return self._priority_brushes.get(todo["priority"], self._priority_brushes["Medium"])
+            if column == self.TOP_PRIORITY_COLUMN:
+                return self._priority_brushes.get(PRIORITY_NAMES.get(self.store.rollup(todo).top_priority))
+            if todo.completed and column != self.ACTIONS_COLUMN:
+                return self._done_brush
+            return None
+        if role == Qt.ItemDataRole.SizeHintRole:
+            return self._row_size
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if index.isValid() and index.column() == 0 and role == Qt.ItemDataRole.CheckStateRole:
+            # The owner updates the todo (and its children) and saves the change
+            self.checkToggled.emit(QPersistentModelIndex(index), Qt.CheckState(value) == Qt.CheckState.Checked)
+            return True
+        return False
+
+
+class TodoItemDelegate(TreeItemDelegate):
+    """Fluent tree delegate whose painted check box also takes the clicks
+
+    It also highlights the search text in the rows that match it.
+    """
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        span = index.data(MatchRole)
+        if span is None or not span[1]:
+            return
+        start, length = span
+        option = QStyleOptionViewItem(option)
+        self.initStyleOption(option, index)
+        style = option.widget.style() if option.widget else QApplication.style()
+        rect = QRectF(style.subElementRect(QStyle.SubElement.SE_ItemViewItemText, option, option.widget))
+        # The style draws the text this far into its rect
+        margin = style.pixelMetric(QStyle.PixelMetric.PM_FocusFrameHMargin, None, option.widget) + 1
+        metrics = QFontMetricsF(option.font)
+        x = rect.x() + margin + metrics.horizontalAdvance(option.text[:start])
+        width = metrics.horizontalAdvance(option.text[start:start + length])
+        highlight = QRectF(x, rect.center().y() - metrics.height() / 2, width, metrics.height()).intersected(rect)
+        if highlight.isEmpty():
+            return
+        color = QColor(themeColor())
+        color.setAlpha(90)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(color)
+        painter.drawRoundedRect(highlight, 2, 2)
+        painter.restore()
+
+    def check_rect(self, option):
+        # TreeItemDelegate paints the 19x19 box 23px into the first column
+        rect = option.rect
+        return QRectF(rect.x() + 23, rect.center().y() - 9, 19, 19)
+
+    def editorEvent(self, event, model, option, index):
+        if index.column() != 0 or not index.flags() & Qt.ItemFlag.ItemIsUserCheckable:
+            return False
+        if event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease,
+                                QEvent.Type.MouseButtonDblClick):
+            return False
+        if event.button() != Qt.MouseButton.LeftButton or not self.check_rect(option).contains(event.position()):
+            return False
+        if event.type() == QEvent.Type.MouseButtonRelease:
+            checked = Qt.CheckState(index.data(Qt.ItemDataRole.CheckStateRole)) == Qt.CheckState.Checked
+            state = Qt.CheckState.Unchecked if checked else Qt.CheckState.Checked
+            model.setData(index, state, Qt.ItemDataRole.CheckStateRole)
+        # Presses on the box neither select nor expand the row
+        return True
+
+
+class TodoProgressDelegate(TreeItemDelegate):
+    """Paints a task's subtree progress as a bar followed by done/total"""
+    BAR_HEIGHT = 4
+    LABEL_WIDTH = 56
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        option.text = ""  # The label is painted next to the bar instead
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        progress = index.data(ProgressRole)
+        if progress is None:
+            return
+        rect = option.rect
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        bar = QRectF(rect.x() + 8, rect.center().y() - self.BAR_HEIGHT / 2 + 1,
+                     max(rect.width() - 16 - self.LABEL_WIDTH, 0), self.BAR_HEIGHT)
+        painter.setBrush(QColor(255, 255, 255, 40) if isDarkTheme() else QColor(0, 0, 0, 30))
+        painter.drawRoundedRect(bar, 2, 2)
+        if progress > 0:
+            painter.setBrush(themeColor())
+            painter.drawRoundedRect(QRectF(bar.x(), bar.y(), bar.width() * progress, bar.height()), 2, 2)
+        painter.setPen(Qt.GlobalColor.white if isDarkTheme() else Qt.GlobalColor.black)
+        painter.setFont(getFont(12))
+        label = QRectF(bar.right() + 6, rect.y(), self.LABEL_WIDTH, rect.height())
+        painter.drawText(label, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft,
+                         index.data(Qt.ItemDataRole.DisplayRole))
+        painter.restore()
+
+
+class TodoActionsDelegate(TreeItemDelegate):
+    """Paints the Edit / Sub / Del buttons of a row and reports clicks on them"""
+    ACTIONS = (("edit", "Edit"), ("sub", "Sub"), ("del", "Del"))
+    BUTTON_WIDTH = 50
+    BUTTON_HEIGHT = 32
+    SPACING = 2
+
+    # Emitted with the action name and a QPersistentModelIndex of the row
+    actionTriggered = pyqtSignal(str, object)
+
+    def button_rects(self, rect):
+        top = rect.center().y() - self.BUTTON_HEIGHT / 2 + 1
+        left = rect.x() + self.SPACING
+        step = self.BUTTON_WIDTH + self.SPACING
+        return [QRectF(left + i * step, top, self.BUTTON_WIDTH, self.BUTTON_HEIGHT)
+                for i in range(len(self.ACTIONS))]
+
+    def action_at(self, option, pos):
+        for (action, _), rect in zip(self.ACTIONS, self.button_rects(option.rect)):
+            if rect.contains(pos):
+                return action
+        return None
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setFont(getFont(13))
+        if isDarkTheme():
+            border, background, text = QColor(255, 255, 255, 19), QColor(255, 255, 255, 15), QColor(Qt.GlobalColor.white)
+        else:
+            border, background, text = QColor(0, 0, 0, 25), QColor(255, 255, 255, 178), QColor(Qt.GlobalColor.black)
+        for (_, label), rect in zip(self.ACTIONS, self.button_rects(option.rect)):
+            painter.setPen(border)
+            painter.setBrush(background)
+            painter.drawRoundedRect(rect.adjusted(0.5, 0.5, -0.5, -0.5), 5, 5)
+            painter.setPen(text)
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, label)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease,
+                                QEvent.Type.MouseButtonDblClick):
+            return False
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+        action = self.action_at(option, event.position())
+        if action is None:
+            return False
+        if event.type() == QEvent.Type.MouseButtonRelease:
+            self.actionTriggered.emit(action, QPersistentModelIndex(index))
+        return True
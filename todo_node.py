@@ -0,0 +1,324 @@
+"""Compact in-memory todos
+
+Loaded as dicts, a large todo list is mostly overhead: a dict per task and,
+per task again, the same few priority and date strings. Todo keeps a task in
+a fixed set of slots, with its fields in typed form: the priority as a
+Priority (an int enum, so one shared object per level), the due date as a day
+ordinal and the create date as seconds since 0001-01-01. Those are also what
+sorting, filtering and reminders compare, so nothing parses dates after
+loading. They are converted from and to the strings of todos.json only at
+the boundary: from_dict() when a list is read, to_json() when it is written.
+
+Values the typed form can't give back exactly (a date in another format, a
+priority this version doesn't know, a key it doesn't know) are kept as read,
+in raw, so writing a list gives back exactly what was read.
+
+todo["due_date"] and the like read and write the fields as saved. Code that
+deals in saved values (the change records, the storages, the edit dialog)
+works on a Todo as it did on the dict it came from.
+"""
+from datetime import date, datetime
+from enum import IntEnum
+from functools import lru_cache
+
+
+class Priority(IntEnum):
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    CRITICAL = 4
+
+    @property
+    def label(self):
+        """The name saved in todos.json ("Low" to "Critical")"""
+        return PRIORITY_LABELS[self]
+
+
+# Indexed by Priority
+PRIORITY_LABELS = ("", "Low", "Medium", "High", "Critical")
+PRIORITIES = {PRIORITY_LABELS[priority]: priority for priority in Priority}
+# Indexed by int; much faster than calling Priority
+PRIORITY_BY_RANK = (None, *Priority)
+# Day ordinal of a todo without a due date, so it sorts after every dated one
+NO_DUE_DATE = date.max.toordinal()
+# Keys of todos.json in the order they are written
+FIELDS = ("text", "completed", "priority", "due_date", "create_date", "children", "id")
+FIELD_SET = frozenset(FIELDS)
+# " HH:MM" and ":SS" of a create date, both ways; only the exact texts are
+# keys, so a time that parses is written back as it was read
+CLOCK_MINUTES = [f" {minute // 60:02}:{minute % 60:02}" for minute in range(24 * 60)]
+CLOCK_SECONDS = [f":{second:02}" for second in range(60)]
+MINUTE_OF_DAY = {text: minute for minute, text in enumerate(CLOCK_MINUTES)}
+SECOND_OF_MINUTE = {text: second for second, text in enumerate(CLOCK_SECONDS)}
+
+
+@lru_cache(maxsize=1 << 16)
+def parse_day(text):
+    """Day ordinal of a "YYYY-MM-DD" date ("" is NO_DUE_DATE); None for any other text
+
+    Cached, so the many todos due on the same day share one int.
+    """
+    if not text:
+        return NO_DUE_DATE
+    if len(text) != 10 or not text.isascii():
+        return None
+    try:
+        day = date.fromisoformat(text)
+    except ValueError:
+        return None
+    # fromisoformat also takes forms like "20250105" that would not be written
+    # back as read, and the last day is the NO_DUE_DATE ordinal
+    if day.isoformat() != text or day == date.max:
+        return None
+    return day.toordinal()
+
+
+@lru_cache(maxsize=1 << 16)
+def day_text(day):
+    """The "YYYY-MM-DD" text of a day ordinal ("" for NO_DUE_DATE)"""
+    return "" if day == NO_DUE_DATE else date.fromordinal(day).isoformat()
+
+
+def parse_moment(text):
+    """Seconds since 0001-01-01 of a "YYYY-MM-DD HH:MM:SS" time; None for any other text"""
+    if len(text) != 19:
+        return None
+    day = parse_day(text[:10])
+    minute = MINUTE_OF_DAY.get(text[10:16])
+    second = SECOND_OF_MINUTE.get(text[16:])
+    if day is None or minute is None or second is None:
+        return None
+    return day * 86400 + minute * 60 + second
+
+
+def moment_text(moment):
+    """The "YYYY-MM-DD HH:MM:SS" text of seconds since 0001-01-01"""
+    day, second = divmod(moment, 86400)
+    minute, second = divmod(second, 60)
+    return day_text(day) + CLOCK_MINUTES[minute] + CLOCK_SECONDS[second]
+
+
+class Todo:
+    """One task and its sub-tasks
+
+    id - unique integer, None until the store gives it one
+    text, completed - as saved
+    priority - a Priority
+    due - day ordinal of the due date, NO_DUE_DATE for none
+    created - seconds since 0001-01-01 of the create date (0 if unreadable)
+    (dates that aren't in the form written here are ordered as before)
+    children - list of Todo
+    raw - None, or the saved values of keys the fields above don't hold exactly
+    """
+
+    __slots__ = ("id", "text", "completed", "priority", "due", "created", "children", "raw")
+
+    def __init__(self, text="", completed=False, priority="Medium", due_date="", create_date="",
+                 children=None, id=None):
+        """Make a todo from field values as saved in todos.json"""
+        self.id = id
+        self.text = text
+        self.raw = None
+        self.children = [] if children is None else children
+        self._set_completed(completed)
+        self._set_priority(priority)
+        self._set_due_date(due_date)
+        self._set_create_date(create_date)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Make a todo and its children from a dict as saved in todos.json
+
+        A Todo is returned as it is, so lists mixing both can be converted.
+        """
+        if isinstance(data, Todo):
+            return data
+        # __init__ inlined for the values of a well-formed file, this runs
+        # for every task loaded
+        get = data.get
+        todo = cls.__new__(cls)
+        todo.id = get("id")
+        todo.text = get("text", "")
+        todo.raw = None
+        todo.children = [cls.from_dict(child) for child in get("children", ())]
+        completed = get("completed", False)
+        if completed is True or completed is False:
+            todo.completed = completed
+        else:
+            todo._set_completed(completed)
+        priority = get("priority", "Medium")
+        todo.priority = PRIORITIES.get(priority) if priority.__class__ is str else None
+        if todo.priority is None:
+            todo._set_priority(priority)
+        due_date = get("due_date", "")
+        todo.due = parse_day(due_date) if due_date.__class__ is str else None
+        if todo.due is None:
+            todo._set_due_date(due_date)
+        create_date = get("create_date", "")
+        todo.created = parse_moment(create_date) if create_date.__class__ is str else None
+        if todo.created is None:
+            todo._set_create_date(create_date)
+        if not FIELD_SET.issuperset(data):
+            for key, value in data.items():
+                if key not in FIELD_SET:
+                    todo._keep_raw(key, value)
+        return todo
+
+    def to_json(self):
+        """The todo as the dict todos.json holds, children left as Todo (see json.dumps default)"""
+        data = {
+            "text": self.text,
+            "completed": self.completed,
+            "priority": PRIORITY_LABELS[self.priority],
+            "due_date": day_text(self.due),
+            # Otherwise raw holds the text that was read
+            "create_date": moment_text(self.created) if self.created else "",
+            "children": self.children,
+        }
+        if self.id is not None:
+            data["id"] = self.id
+        if self.raw is not None:
+            data.update(self.raw)
+        return data
+
+    def to_dict(self):
+        """The todo and its children as the dicts todos.json holds"""
+        data = self.to_json()
+        data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+    def pack(self):
+        """The todo and its children as nested tuples of plain values (what marshal can write)"""
+        return (self.id, self.text, self.completed, int(self.priority), self.due, self.created, self.raw,
+                tuple(child.pack() for child in self.children))
+
+    @classmethod
+    def unpack(cls, packed):
+        """Make a todo and its children from what pack() returned"""
+        todo = cls.__new__(cls)
+        todo.id, todo.text, todo.completed, priority, todo.due, todo.created, todo.raw, children = packed
+        todo.priority = PRIORITY_BY_RANK[priority]
+        todo.children = [cls.unpack(child) for child in children]
+        return todo
+
+    def _keep_raw(self, key, value):
+        if self.raw is None:
+            self.raw = {}
+        self.raw[key] = value
+
+    def _drop_raw(self, key):
+        if self.raw is not None and key in self.raw:
+            del self.raw[key]
+            if not self.raw:
+                self.raw = None
+
+    def _set_completed(self, value):
+        self.completed = bool(value)
+        # An old file might hold 0 or 1
+        if value is not self.completed:
+            self._keep_raw("completed", value)
+
+    def _set_priority(self, value):
+        priority = PRIORITIES.get(value) if isinstance(value, str) else None
+        if priority is None:
+            # Ranked like Medium, as before
+            self.priority = Priority.MEDIUM
+            self._keep_raw("priority", value)
+        else:
+            self.priority = priority
+
+    def _set_due_date(self, value):
+        due = parse_day(value) if isinstance(value, str) else None
+        if due is None:
+            # Ordered as any ISO date reads, unreadable ones as no due date
+            try:
+                due = date.fromisoformat(value).toordinal()
+            except (TypeError, ValueError):
+                due = NO_DUE_DATE
+            self._keep_raw("due_date", value)
+        self.due = due
+
+    def _set_create_date(self, value):
+        created = parse_moment(value) if isinstance(value, str) else None
+        if created is None:
+            # Ordered as any ISO time reads, unreadable ones first
+            try:
+                moment = datetime.fromisoformat(value)
+                created = moment.toordinal() * 86400 + moment.hour * 3600 + moment.minute * 60 + moment.second
+            except (TypeError, ValueError):
+                created = 0
+            self._keep_raw("create_date", value)
+        self.created = created
+
+    # The fields as saved in todos.json
+
+    def __getitem__(self, key):
+        if self.raw is not None and key in self.raw:
+            return self.raw[key]
+        if key == "text":
+            return self.text
+        if key == "completed":
+            return self.completed
+        if key == "priority":
+            return PRIORITY_LABELS[self.priority]
+        if key == "due_date":
+            return day_text(self.due)
+        if key == "create_date":
+            return moment_text(self.created)
+        if key == "children":
+            return self.children
+        if key == "id" and self.id is not None:
+            return self.id
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self._drop_raw(key)
+        if key == "text":
+            self.text = value
+        elif key == "completed":
+            self._set_completed(value)
+        elif key == "priority":
+            self._set_priority(value)
+        elif key == "due_date":
+            self._set_due_date(value)
+        elif key == "create_date":
+            self._set_create_date(value)
+        elif key == "children":
+            self.children = value
+        elif key == "id":
+            self.id = value
+        else:
+            self._keep_raw(key, value)
+
+    def __contains__(self, key):
+        if key == "id":
+            return self.id is not None
+        return key in FIELD_SET or (self.raw is not None and key in self.raw)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def update(self, fields):
+        """Set fields given as saved (e.g. the fields of an edit record)"""
+        for key, value in fields.items():
+            self[key] = value
+
+    def __eq__(self, other):
+        if not isinstance(other, Todo):
+            return NotImplemented
+        return (self.id == other.id and self.text == other.text and self.completed == other.completed
+                and self.priority == other.priority and self.due == other.due
+                and self.created == other.created and self.raw == other.raw and self.children == other.children)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Todo(id={self.id!r}, text={self.text!r}, {len(self.children)} children)"
+
+
+def todos_from_dicts(todos):
+    """Convert a list of todos as saved in todos.json (or already converted) to Todo"""
+    return [Todo.from_dict(todo) for todo in todos]
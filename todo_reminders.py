@@ -0,0 +1,193 @@
+"""Reminders for tasks as they come due and become overdue
+
+ReminderQueue keeps the open tasks that have a due date in a min-heap of the
+days they need a reminder on: the due day itself, then the day after, when
+the task is overdue. Adding, editing, completing or removing a task pushes
+at most one entry per task (O(log n)) and leaves the entry it replaces in
+the heap; such stale entries are skipped when they reach the top and the
+heap is rebuilt once most of it is stale. Nothing scans the tasks to find
+out what is due.
+
+ReminderScheduler runs a single timer armed for the earliest entry and
+emits remindersDue when it fires. Its clock is a parameter, so reminders can
+be driven by a simulated clock (see benchmarks/bench_reminders.py).
+"""
+import heapq
+from datetime import date, datetime, time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from todo_node import NO_DUE_DATE
+from todo_storage import todo_at
+from todo_store import TodoStoreListener, walk
+
+
+class ReminderQueue(TodoStoreListener):
+    """Min-heap of the reminders for the open tasks of a TodoStore"""
+
+    def __init__(self, store):
+        self.store = store
+        store.add_listener(self)
+        self.heap = []  # (day ordinal of the reminder, todo id, generation)
+        # id -> (due day ordinal, generation) of every open task with a due
+        # date; an entry is live while its generation matches. The generation
+        # is None once the overdue reminder has been given.
+        self.scheduled = {}
+        self.live = 0  # Live entries in the heap
+        self.generation = 0
+        # Called when the earliest reminder may have moved earlier
+        self.head_changed = None
+
+    def _unschedule(self, todo_id):
+        entry = self.scheduled.pop(todo_id, None)
+        if entry is not None and entry[1] is not None:
+            self.live -= 1
+
+    def _schedule(self, todo):
+        """Bring the reminder of a task in line with its fields
+
+        Returns the new heap entry for the caller to add, or None if the
+        task needs none.
+        """
+        day = todo.due
+        if todo.completed or day == NO_DUE_DATE:
+            self._unschedule(todo.id)
+            return None
+        entry = self.scheduled.get(todo.id)
+        if entry is not None and entry[0] == day:
+            return None
+        self._unschedule(todo.id)
+        self.generation += 1
+        self.scheduled[todo.id] = day, self.generation
+        self.live += 1
+        return day, todo.id, self.generation
+
+    def _is_live(self, entry):
+        scheduled = self.scheduled.get(entry[1])
+        return scheduled is not None and scheduled[1] == entry[2]
+
+    def _rebuild(self):
+        self.heap = [entry for entry in self.heap if self._is_live(entry)]
+        heapq.heapify(self.heap)
+
+    def _update(self, todos):
+        """Reschedule todos, keeping the heap valid, and report a new head"""
+        head = self.heap[0] if self.heap else None
+        pushed = 0
+        for todo in todos:
+            entry = self._schedule(todo)
+            if entry is not None:
+                heapq.heappush(self.heap, entry)
+                pushed += 1
+        # Drop the stale entries once they outnumber the live ones
+        if len(self.heap) > 2 * self.live + 64:
+            self._rebuild()
+        if pushed and self.head_changed is not None and self.heap and self.heap[0] != head:
+            self.head_changed()
+
+    def next_day(self):
+        """Return the day ordinal of the earliest reminder, or None if there are none"""
+        heap = self.heap
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def take(self, today):
+        """Pop the reminders due by day ordinal today
+
+        Returns the todos due today and the todos overdue, each reported
+        once; a task found overdue is not reported as due first.
+        """
+        due, overdue = [], []
+        heap = self.heap
+        while heap and heap[0][0] <= today:
+            entry = heapq.heappop(heap)
+            if not self._is_live(entry):
+                continue
+            todo_id = entry[1]
+            day, generation = self.scheduled[todo_id]
+            if today > day:
+                overdue.append(self.store.get(todo_id))
+                self.scheduled[todo_id] = day, None
+                self.live -= 1
+            else:
+                due.append(self.store.get(todo_id))
+                # Come back when it is overdue
+                heapq.heappush(heap, (day + 1, todo_id, generation))
+        return due, overdue
+
+    # TodoStoreListener interface
+
+    def reset(self):
+        self.heap = []
+        self.scheduled.clear()
+        self.live = 0
+        for todo in self.store.nodes.values():
+            entry = self._schedule(todo)
+            if entry is not None:
+                self.heap.append(entry)
+        heapq.heapify(self.heap)
+        if self.head_changed is not None:
+            self.head_changed()
+
+    def inserted(self, parent_path, first, last):
+        self._update(walk(self.store.children(parent_path)[first:last + 1]))
+
+    def about_to_remove(self, parent_path, first, last):
+        for todo in walk(self.store.children(parent_path)[first:last + 1]):
+            self._unschedule(todo.id)
+
+    def changed(self, path, recursive):
+        todo = todo_at(self.store.todos, path)
+        # Completion cascades to the whole subtree
+        self._update(walk([todo]) if recursive else [todo])
+
+
+class ReminderScheduler(QObject):
+    """Emits remindersDue as tasks come due and become overdue
+
+    clock returns the current local time; reminders are given at the start
+    of the day.
+    """
+    remindersDue = pyqtSignal(list, list)  # Todos due today, todos overdue
+    # Wake up at least this often, so a changed system clock is noticed
+    MAX_WAIT_MS = 60 * 60 * 1000
+
+    def __init__(self, store, clock=datetime.now, parent=None):
+        super().__init__(parent)
+        self.clock = clock
+        self.queue = ReminderQueue(store)
+        self.queue.head_changed = self.arm
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.check)
+        self.running = False
+
+    def start(self):
+        """Report what is already due and start reminding"""
+        self.running = True
+        self.check()
+
+    def stop(self):
+        self.running = False
+        self.timer.stop()
+
+    def check(self):
+        """Report the reminders that are due and arm the timer for the next one"""
+        if not self.running:
+            return
+        due, overdue = self.queue.take(self.clock().date().toordinal())
+        if due or overdue:
+            self.remindersDue.emit(due, overdue)
+        self.arm()
+
+    def arm(self):
+        """Arm the timer for the earliest reminder"""
+        if not self.running:
+            return
+        day = self.queue.next_day()
+        if day is None:
+            self.timer.stop()
+            return
+        wait = datetime.combine(date.fromordinal(day), time.min) - self.clock()
+        self.timer.start(max(0, min(int(wait.total_seconds() * 1000), self.MAX_WAIT_MS)))
@@ -0,0 +1,239 @@
+"""Indexes for finding tasks by their text and fields
+
+TodoSearchIndex keeps the casefolded text of every task and, for every
+three-character sequence (trigram), the ids of the tasks whose text contains
+it. A query intersects the id sets of its trigrams, smallest first, and only
+checks the few candidates left for the whole query, so it never scans every
+task. Queries shorter than a trigram scan the texts instead.
+
+TodoFieldIndex answers the quick filters (see QuickFilter) from per-field
+indexes: the set of completed tasks, a set of tasks per priority and a
+sorted list of due dates, so a filter costs set operations and a couple of
+binary searches instead of a pass over every task.
+
+Both indexes listen to a TodoStore and are updated as tasks are added,
+edited, completed and removed. They are built on first use, so a tree that
+is never searched or filtered costs nothing to load.
+"""
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+from datetime import date
+
+from todo_node import NO_DUE_DATE, Priority
+from todo_storage import todo_at
+from todo_store import TodoStoreListener, walk
+
+# Conditions a task has to meet to be shown; all that are set apply:
+# hide_completed - only open tasks
+# min_priority - Priority the priority has to reach (None for any)
+# overdue - only open tasks due before today
+# due_within - only tasks due from today to this many days on (None for any)
+QuickFilter = namedtuple(
+    "QuickFilter", "hide_completed min_priority overdue due_within", defaults=(False, None, False, None)
+)
+
+
+def trigrams(text):
+    """Return the set of three-character sequences in a (casefolded) text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TodoSearchIndex(TodoStoreListener):
+    """Text search over the todos of a TodoStore"""
+
+    def __init__(self, store):
+        self.store = store
+        store.add_listener(self)
+        # Both None until the first search
+        self.texts = None  # todo id -> casefolded text
+        self.postings = None  # trigram -> set of todo ids
+
+    def _build(self):
+        self.texts = {}
+        self.postings = {}
+        self._add(self.store.nodes.values())
+
+    def _add(self, todos):
+        texts = self.texts
+        postings = self.postings
+        for todo in todos:
+            text = texts[todo.id] = todo.text.casefold()
+            for trigram in trigrams(text):
+                ids = postings.get(trigram)
+                if ids is None:
+                    ids = postings[trigram] = set()
+                ids.add(todo.id)
+
+    def _remove(self, todo_id):
+        postings = self.postings
+        for trigram in trigrams(self.texts.pop(todo_id)):
+            ids = postings[trigram]
+            ids.discard(todo_id)
+            if not ids:
+                del postings[trigram]
+
+    def search(self, query):
+        """Return the ids of the tasks whose text contains query, ignoring case"""
+        if self.texts is None:
+            self._build()
+        query = query.casefold()
+        if len(query) < 3:
+            return {todo_id for todo_id, text in self.texts.items() if query in text}
+        postings = sorted((self.postings.get(trigram, ()) for trigram in trigrams(query)), key=len)
+        if not postings[0]:
+            return set()
+        candidates = postings[0].intersection(*postings[1:])
+        if len(query) == 3:
+            return candidates
+        # Having all the trigrams doesn't mean having them in a row
+        texts = self.texts
+        return {todo_id for todo_id in candidates if query in texts[todo_id]}
+
+    # TodoStoreListener interface
+
+    def reset(self):
+        if self.texts is not None:
+            self._build()
+
+    def inserted(self, parent_path, first, last):
+        if self.texts is not None:
+            self._add(walk(self.store.children(parent_path)[first:last + 1]))
+
+    def about_to_remove(self, parent_path, first, last):
+        if self.texts is not None:
+            for todo in walk(self.store.children(parent_path)[first:last + 1]):
+                self._remove(todo.id)
+
+    def changed(self, path, recursive):
+        # Only edits (not completion changes, which are recursive) touch the text
+        if self.texts is None or recursive:
+            return
+        todo = todo_at(self.store.todos, path)
+        if self.texts[todo.id] != todo.text.casefold():
+            self._remove(todo.id)
+            self._add([todo])
+
+
+class TodoFieldIndex(TodoStoreListener):
+    """Indexes over the completed, priority and due_date fields of a TodoStore"""
+
+    def __init__(self, store):
+        self.store = store
+        store.add_listener(self)
+        # All None until the first query
+        self.completed = None  # ids of completed tasks
+        self.priorities = None  # Priority -> set of ids
+        self.due = None  # sorted (day ordinal, id) of the tasks with a due date
+        self.fields = None  # id -> (rank, day ordinal) as indexed
+
+    def _build(self):
+        self.completed = set()
+        self.priorities = {rank: set() for rank in Priority}
+        self.due = []
+        self.fields = {}
+        todos = list(self.store.nodes.values())
+        for todo in todos:
+            self._add_fields(todo)
+        self.due.sort()
+        self.completed.update(todo.id for todo in todos if todo.completed)
+
+    def _add_fields(self, todo, keep_sorted=False):
+        rank = todo.priority
+        day = todo.due
+        self.fields[todo.id] = rank, day
+        self.priorities[rank].add(todo.id)
+        if day != NO_DUE_DATE:
+            if keep_sorted:
+                insort(self.due, (day, todo.id))
+            else:
+                self.due.append((day, todo.id))
+
+    def _remove_fields(self, todo_id):
+        rank, day = self.fields.pop(todo_id)
+        self.priorities[rank].discard(todo_id)
+        if day != NO_DUE_DATE:
+            del self.due[bisect_left(self.due, (day, todo_id))]
+
+    def _due_between(self, first, last):
+        """Ids of the tasks due on day ordinals first to last"""
+        due = self.due
+        return {todo_id for _, todo_id in due[bisect_left(due, (first,)):bisect_right(due, (last, float("inf")))]}
+
+    def select(self, quick_filter, today=None):
+        """Return the ids of the tasks that meet every condition of a QuickFilter
+
+        Returns None if no condition is set.
+        """
+        if self.fields is None:
+            self._build()
+        today = (today or date.today()).toordinal()
+        required = []
+        if quick_filter.min_priority is not None:
+            required.append(set().union(*(
+                ids for rank, ids in self.priorities.items() if rank >= quick_filter.min_priority
+            )))
+        if quick_filter.overdue:
+            required.append(self._due_between(0, today - 1))
+        if quick_filter.due_within is not None:
+            required.append(self._due_between(today, today + quick_filter.due_within))
+        hide_completed = quick_filter.hide_completed or quick_filter.overdue
+        if not required:
+            if not hide_completed:
+                return None
+            return self.fields.keys() - self.completed
+        required.sort(key=len)
+        ids = required[0].intersection(*required[1:])
+        if hide_completed:
+            ids -= self.completed
+        return ids
+
+    @staticmethod
+    def accepts(quick_filter, todo, today=None):
+        """Whether a single task meets every condition of a QuickFilter"""
+        today = (today or date.today()).toordinal()
+        if todo.completed and (quick_filter.hide_completed or quick_filter.overdue):
+            return False
+        if quick_filter.min_priority is not None and todo.priority < quick_filter.min_priority:
+            return False
+        day = todo.due
+        if quick_filter.overdue and not day < today:
+            return False
+        if quick_filter.due_within is not None and not today <= day <= today + quick_filter.due_within:
+            return False
+        return True
+
+    # TodoStoreListener interface
+
+    def reset(self):
+        if self.fields is not None:
+            self._build()
+
+    def inserted(self, parent_path, first, last):
+        if self.fields is None:
+            return
+        for todo in walk(self.store.children(parent_path)[first:last + 1]):
+            self._add_fields(todo, keep_sorted=True)
+            if todo.completed:
+                self.completed.add(todo.id)
+
+    def about_to_remove(self, parent_path, first, last):
+        if self.fields is None:
+            return
+        for todo in walk(self.store.children(parent_path)[first:last + 1]):
+            self._remove_fields(todo.id)
+            self.completed.discard(todo.id)
+
+    def changed(self, path, recursive):
+        if self.fields is None:
+            return
+        todo = todo_at(self.store.todos, path)
+        if recursive:
+            # Completion cascades to the whole subtree
+            for child in walk([todo]):
+                if child.completed:
+                    self.completed.add(child.id)
+                else:
+                    self.completed.discard(child.id)
+        elif self.fields[todo.id] != (todo.priority, todo.due):
+            self._remove_fields(todo.id)
+            self._add_fields(todo, keep_sorted=True)
@@ -0,0 +1,131 @@
+"""A todo list opened from storage, without any UI
+
+TodoSession ties together what the Todo List page works on: the storage
+backend, the TodoStore holding the tree, and the TodoHistory of its changes.
+Every change goes through perform() as a change record, which makes it on
+the store (so views and indexes update), keeps its undo step and saves it:
+an incremental backend is handed the record, a whole-file one is marked
+dirty and written by save(), whenever the caller chooses (the page waits
+for edits to go quiet). Nothing here imports Qt, so batch jobs and
+benchmarks can script a todo list headless:
+
+    session = TodoSession.open("todos.json", "sqlite")
+    session.load()
+    session.perform({"op": "complete", "path": [0], "completed": True})
+    session.close()
+"""
+from contextlib import contextmanager
+
+from todo_history import TodoHistory
+from todo_storage import open_storage
+from todo_store import Change, TodoStore
+
+
+class SaveError(Exception):
+    """The storage failed to save a change; the store has made it all the same"""
+
+
+class TodoSession:
+    """The store, undo history and storage of one todo list"""
+
+    def __init__(self, storage, debug=False):
+        self.storage = storage
+        # With debug the store re-checks its counters after every change
+        self.store = TodoStore(debug=debug)
+        self.history = TodoHistory(self.store)
+        self.change_count = 0
+        # Changes a whole-file backend hasn't written yet
+        self.dirty = False
+        # Change records of the group in progress, saved as one batch
+        self._group = None
+
+    @classmethod
+    def open(cls, todo_file: str, kind: str = "json", debug: bool = False) -> "TodoSession":
+        """Open a todo list with one of the open_storage backends (not loaded yet)"""
+        return cls(open_storage(todo_file, kind), debug=debug)
+
+    def load(self) -> None:
+        """Load the whole list in one go"""
+        self.start_loading()
+        self.store.reset(self.storage.load())
+
+    def start_loading(self) -> None:
+        """Empty the tree for a list about to be streamed in (see storage.stream)"""
+        self.store.reset([])
+        # Steps made on the list that was there can't be undone on this one
+        self.history.clear()
+        self.dirty = False
+
+    def perform(self, change: Change) -> None:
+        """Make a change as one undo step (or part of the group in progress) and save it"""
+        self.history.apply(change)
+        self.record(change)
+
+    @contextmanager
+    def group(self):
+        """Make the changes performed in a with block one undo step, saved as one record"""
+        if self._group is not None:
+            yield self
+            return
+        self._group = []
+        try:
+            with self.history.group():
+                yield self
+        finally:
+            changes, self._group = self._group, None
+            if changes:
+                self.record(changes[0] if len(changes) == 1 else {"op": "batch", "changes": changes})
+
+    def undo(self) -> Change | None:
+        """Undo the latest step and save that; return the change it made, or None"""
+        change = self.history.undo()
+        if change is not None:
+            self.record(change)
+        return change
+
+    def redo(self) -> Change | None:
+        """Redo the latest undone step and save that; return the change it made, or None"""
+        change = self.history.redo()
+        if change is not None:
+            self.record(change)
+        return change
+
+    def record(self, change: Change) -> None:
+        """Save a change already made on the store: hand it to an incremental backend or mark the list dirty"""
+        if self._group is not None:
+            self._group.append(change)
+            return
+        self.change_count += 1
+        if not self.storage.incremental:
+            self.dirty = True
+            return
+        try:
+            self.storage.apply(change)
+        except Exception as e:
+            raise SaveError(str(e)) from e
+
+    def save(self) -> None:
+        """Write the whole list (whole-file backends; an import for the others)"""
+        self.dirty = False
+        try:
+            self.storage.save(self.store.todos)
+        except Exception as e:
+            raise SaveError(str(e)) from e
+
+    def close(self) -> None:
+        """Save what is still dirty and wait for the storage to finish writing"""
+        if self.dirty:
+            self.save()
+        try:
+            self.storage.close()
+        except Exception as e:
+            raise SaveError(str(e)) from e
+
+    def save_stats(self) -> dict:
+        """Return counters describing how many saves were coalesced"""
+        written = self.storage.stats()["written"]
+        return {
+            "changes": self.change_count,
+            "written": written,
+            "coalesced": max(self.change_count - written, 0),
+        }
@@ -0,0 +1,243 @@
+"""Statistics over a whole todo list, from columns kept alongside the tree
+
+TodoColumns mirrors the fields of every todo of a TodoStore as a struct of
+arrays: a row per todo and a column each for the row of its parent, its
+depth, its priority, whether it is completed, its due day and its create
+time. A statistic is then a reduction over a column or two (a count per
+priority, per depth, per week) rather than a walk over the tree. With NumPy
+installed the columns are viewed as NumPy arrays without copying and every
+statistic is a vectorized count: all of them take about a millisecond over
+100,000 todos (see benchmarks/bench_stats.py). NumPy is optional: without
+it the same counts run over the arrays in Python, some 50 times slower.
+
+The columns listen to the store, so adding, editing, completing or removing
+todos only touches their rows. The row of a removed todo is blanked (its
+values then fall outside every count) and reused by the next todo added.
+Like the search indexes, the columns are built on first use.
+"""
+from array import array
+from collections import Counter, namedtuple
+from datetime import date
+from itertools import compress
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from todo_node import NO_DUE_DATE, Priority
+from todo_storage import todo_at
+from todo_store import TodoStoreListener, walk
+
+# Depth of a blank row; deeper todos are counted at MAX_DEPTH
+FREE = 255
+MAX_DEPTH = FREE - 1
+# Weeks of creation counts, up to the current one
+WEEKS = 12
+# As the "Due within" quick filter starts out
+DUE_SOON_DAYS = 7
+SECONDS_PER_DAY = 86400
+# Turns the completed column into 1 for open (or blank) rows, for compress()
+OPEN_ROWS = bytes([1, 0]) + bytes(254)
+
+# total - number of todos
+# completed - how many of them are completed
+# open_by_priority - Priority -> number of open todos with it
+# overdue - open todos due before today
+# due_soon - open todos due from today to DUE_SOON_DAYS days on
+# by_depth - number of todos per depth, roots first (depth 0)
+# created_per_week - (Monday, todos created that week) for the last WEEKS
+#   weeks, the current one last
+TodoStats = namedtuple("TodoStats", "total completed open_by_priority overdue due_soon by_depth created_per_week")
+
+
+def week_of(day):
+    """Number of the Monday-to-Sunday week of a day ordinal (day 1 is a Monday)"""
+    return (day - 1) // 7
+
+
+class TodoColumns(TodoStoreListener):
+    """The fields of every todo of a TodoStore in parallel columns"""
+
+    def __init__(self, store):
+        self.store = store
+        store.add_listener(self)
+        self._clear()
+        # None until the first query
+        self.rows = None  # id -> row
+        # Called after the columns have changed
+        self.updated = None
+
+    def _clear(self):
+        self.rows = {}
+        self.free = []  # Blank rows, reused first
+        self.parent = array("i")  # Row of the parent, -1 for roots and blank rows
+        self.depth = bytearray()  # 0 for roots, FREE for blank rows
+        self.priority = bytearray()  # Priority, 0 for blank rows
+        self.completed = bytearray()  # 1 if completed
+        self.due = array("i")  # Day ordinal, NO_DUE_DATE for none
+        self.created = array("q")  # Seconds since 0001-01-01, 0 if unreadable
+
+    def _build(self):
+        self._clear()
+        parent, depth, priority, completed, due, created = [], [], [], [], [], []
+        pending = [(todo, -1, 0) for todo in reversed(self.store.todos)]
+        while pending:
+            todo, parent_row, level = pending.pop()
+            row = self.rows[todo.id] = len(parent)
+            parent.append(parent_row)
+            depth.append(min(level, MAX_DEPTH))
+            priority.append(todo.priority)
+            completed.append(todo.completed)
+            due.append(todo.due)
+            created.append(todo.created)
+            pending.extend((child, row, level + 1) for child in reversed(todo.children))
+        self.parent.extend(parent)
+        self.depth = bytearray(depth)
+        self.priority = bytearray(priority)
+        self.completed = bytearray(completed)
+        self.due.extend(due)
+        self.created.extend(created)
+
+    def _set_fields(self, row, todo):
+        self.priority[row] = todo.priority
+        self.completed[row] = todo.completed
+        self.due[row] = todo.due
+        self.created[row] = todo.created
+
+    def _add_subtree(self, todo, parent_row, level):
+        pending = [(todo, parent_row, level)]
+        while pending:
+            todo, parent_row, level = pending.pop()
+            if self.free:
+                row = self.free.pop()
+                self.parent[row] = parent_row
+                self.depth[row] = min(level, MAX_DEPTH)
+                self._set_fields(row, todo)
+            else:
+                row = len(self.parent)
+                self.parent.append(parent_row)
+                self.depth.append(min(level, MAX_DEPTH))
+                self.priority.append(todo.priority)
+                self.completed.append(todo.completed)
+                self.due.append(todo.due)
+                self.created.append(todo.created)
+            self.rows[todo.id] = row
+            pending.extend((child, row, level + 1) for child in todo.children)
+
+    def _blank(self, row):
+        self.parent[row] = -1
+        self.depth[row] = FREE
+        self.priority[row] = 0
+        self.completed[row] = 0
+        self.due[row] = NO_DUE_DATE
+        self.created[row] = 0
+        self.free.append(row)
+
+    def _changed(self):
+        if self.updated is not None:
+            self.updated()
+
+    def stats(self, today=None):
+        """Return the TodoStats of the whole list as of today (a date, default today)"""
+        if self.rows is None:
+            self._build()
+        today = (today or date.today()).toordinal()
+        if numpy is not None:
+            return self._numpy_stats(today)
+        return self._python_stats(today)
+
+    def _numpy_stats(self, today):
+        # Views of the columns; they must be gone before a column next grows.
+        # Counting matches is much faster than selecting rows with a mask.
+        priority = numpy.frombuffer(self.priority, numpy.uint8)
+        completed = numpy.frombuffer(self.completed, numpy.bool_)
+        open_priority = priority * ~completed  # 0 for completed and blank rows
+        per_priority = [0] + [int(numpy.count_nonzero(open_priority == rank)) for rank in Priority]
+        due = numpy.frombuffer(self.due, self.due.typecode)
+        open_rows = open_priority != 0
+        overdue = int(numpy.count_nonzero(open_rows & (due < today)))
+        due_soon = int(numpy.count_nonzero(open_rows & (due >= today) & (due <= today + DUE_SOON_DAYS)))
+        by_depth = numpy.bincount(numpy.frombuffer(self.depth, numpy.uint8), minlength=FREE + 1)[:FREE]
+        by_depth = by_depth[:numpy.flatnonzero(by_depth)[-1] + 1].tolist() if by_depth.any() else []
+        first_week = week_of(today) - WEEKS + 1
+        since = (first_week * 7 + 1) * SECONDS_PER_DAY
+        created = numpy.frombuffer(self.created, self.created.typecode)
+        # Weeks since first_week; earlier times wrap around to huge unsigned
+        # numbers, so they land in the WEEKS bin with the later ones
+        weeks = numpy.minimum((created - since).view(numpy.uint64) // (7 * SECONDS_PER_DAY), WEEKS)
+        per_week = numpy.bincount(weeks, minlength=WEEKS + 1)[:WEEKS].tolist()
+        return self._stats(int(numpy.count_nonzero(completed)), per_priority, overdue, due_soon, by_depth,
+                           first_week, per_week)
+
+    def _python_stats(self, today):
+        # Blank rows count as open here, but have no priority and no due date
+        open_rows = self.completed.translate(OPEN_ROWS)
+        per_priority = Counter(compress(self.priority, open_rows))
+        due_days = Counter(compress(self.due, open_rows))
+        overdue = sum(count for day, count in due_days.items() if day < today)
+        due_soon = sum(count for day, count in due_days.items() if today <= day <= today + DUE_SOON_DAYS)
+        depths = Counter(self.depth)
+        depths.pop(FREE, None)
+        by_depth = [depths[level] for level in range(max(depths, default=-1) + 1)]
+        first_week = week_of(today) - WEEKS + 1
+        since = (first_week * 7 + 1) * SECONDS_PER_DAY
+        weeks = Counter(week_of(moment // SECONDS_PER_DAY) for moment in self.created if moment >= since)
+        per_week = [weeks[first_week + week] for week in range(WEEKS)]
+        return self._stats(self.completed.count(1), per_priority, overdue, due_soon, by_depth, first_week, per_week)
+
+    def _stats(self, completed, per_priority, overdue, due_soon, by_depth, first_week, per_week):
+        return TodoStats(
+            total=len(self.rows),
+            completed=completed,
+            open_by_priority={priority: per_priority[priority] for priority in Priority},
+            overdue=overdue,
+            due_soon=due_soon,
+            by_depth=tuple(by_depth),
+            created_per_week=tuple(
+                (date.fromordinal((first_week + week) * 7 + 1), count) for week, count in enumerate(per_week)
+            ),
+        )
+
+    # TodoStoreListener interface
+
+    def reset(self):
+        if self.rows is not None:
+            self._build()
+            self._changed()
+
+    def inserted(self, parent_path, first, last):
+        if self.rows is None:
+            return
+        if parent_path:
+            parent_row = self.rows[todo_at(self.store.todos, parent_path).id]
+            level = self.depth[parent_row] + 1
+        else:
+            parent_row, level = -1, 0
+        for todo in self.store.children(parent_path)[first:last + 1]:
+            self._add_subtree(todo, parent_row, level)
+        self._changed()
+
+    def about_to_remove(self, parent_path, first, last):
+        if self.rows is None:
+            return
+        siblings = self.store.children(parent_path)
+        if not parent_path and first == 0 and last == len(siblings) - 1:
+            # Everything goes
+            self._clear()
+            return
+        for todo in walk(siblings[first:last + 1]):
+            self._blank(self.rows.pop(todo.id))
+
+    def removed(self, parent_path, first, last):
+        if self.rows is not None:
+            self._changed()
+
+    def changed(self, path, recursive):
+        if self.rows is None:
+            return
+        todo = todo_at(self.store.todos, path)
+        # Completion cascades to the whole subtree
+        for todo in walk([todo]) if recursive else [todo]:
+            self._set_fields(self.rows[todo.id], todo)
+        self._changed()
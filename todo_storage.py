@@ -0,0 +1,997 @@
+import gc
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import queue
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from todo_node import PRIORITIES, Todo, todos_from_dicts
+
+
+# Highest first, as the priority choices are listed
+PRIORITY_ORDER = dict(reversed(PRIORITIES.items()))
+
+# Version of the todos.json document written by this code. Files from before
+# the version header are a bare list and count as version 1; version 3 gave
+# every todo a unique integer "id".
+SCHEMA_VERSION = 3
+MIGRATIONS = {}  # version -> step upgrading a todo list from that version to the next
+
+JSON_WHITESPACE = " \t\r\n"
+
+
+@contextmanager
+def gc_paused():
+    """Keep the cyclic garbage collector away from a large tree being built
+
+    Decoding creates millions of dicts and lists that can never form a cycle,
+    and every collection while they are built would scan all of them again.
+    Collection is only paused: the collector is process-wide, so this also
+    holds it off the GUI thread, but just for the decode. Refcounting still
+    frees everything. The page freezes the loaded tree once on the GUI thread
+    (see TodoInterface.finish_loading).
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def atomic_write(path, data):
+    """Atomically replace path with str or bytes data (temp file + fsync + rename)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        # mkstemp creates the file private (0600); keep the permissions of the file we replace
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        if isinstance(data, bytes):
+            f = os.fdopen(fd, 'wb')
+        else:
+            f = os.fdopen(fd, 'w', encoding='utf-8')
+        with f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    # Make the rename itself durable (not supported on every platform)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def iter_json_array(read, chunk_size=1 << 16):
+    """Incrementally decode the elements of a top-level JSON array
+
+    read(size) returns the next chunk of text ("" at end of file). Only the
+    element being decoded has to fit in memory, so the first items of a large
+    file are available long before the whole file has been read.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    state = "start"  # start -> first -> (item -> next)*
+    while True:
+        while pos < len(buffer) and buffer[pos] in JSON_WHITESPACE:
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of file in JSON array")
+            buffer, pos = read(chunk_size), 0
+            eof = not buffer
+            continue
+        char = buffer[pos]
+        if state == "start":
+            if char != "[":
+                raise ValueError("Expected a JSON array")
+            pos += 1
+            state = "first"
+        elif char == "]" and state in ("first", "next"):
+            return
+        elif state == "next":
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+            pos += 1
+            state = "item"
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                complete = end < len(buffer) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                # The element straddles the end of the buffer: read at least as
+                # much again so a huge element is not re-parsed quadratically
+                chunk = read(max(chunk_size, len(buffer) - pos))
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield item
+            pos = end
+            state = "next"
+
+
+def open_document_stream(read, chunk_size=1 << 16):
+    """Parse the header of a todos.json stream up to its todo array
+
+    Returns (header, read) where read continues at the start of the todo
+    array, ready for iter_json_array. Unversioned files (a bare list) get
+    the header {"version": 1}.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    header, key = {}, None
+    state = "start"  # start -> (key -> colon -> value -> comma)* until the "todos" key
+    while True:
+        while pos < len(buffer) and buffer[pos] in JSON_WHITESPACE:
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of file in todos.json header")
+            chunk = read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        char = buffer[pos]
+        if state == "start":
+            if char == "[":
+                header = {"version": 1}
+                break
+            if char != "{":
+                raise ValueError("Expected a JSON array or object")
+            pos += 1
+            state = "key"
+        elif state == "colon":
+            if char != ":":
+                raise ValueError(f"Expected ':' in todos.json header, got {char!r}")
+            pos += 1
+            state = "value"
+        elif state == "comma":
+            if char != ",":
+                raise ValueError("todos.json has no todo list")
+            pos += 1
+            state = "key"
+        elif state == "value" and key == "todos":
+            break
+        else:
+            try:
+                token, end = decoder.raw_decode(buffer, pos)
+                complete = end < len(buffer) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                chunk = read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            if state == "key":
+                key, state = token, "colon"
+            else:
+                header[key], state = token, "comma"
+            pos = end
+
+    pending = [buffer[pos:]]
+
+    def read_rest(size):
+        # Hand back what is left of the buffer before reading further
+        return pending.pop() if pending else read(size)
+
+    return header, read_rest
+
+
+class WriteBehindWriter:
+    """Background writer that persists the latest submitted document
+
+    Only the newest payload matters: if several payloads are submitted while
+    the worker is busy, the older ones are dropped and counted as coalesced.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.submitted = 0  # Payloads handed to the writer
+        self.written = 0  # Payloads actually written to disk
+        self.coalesced = 0  # Payloads replaced before they were written
+        self._pending = None
+        self._writing = False
+        self._closed = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="todo-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """Queue text to be written, replacing any payload not yet written"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("writer is closed")
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = text
+            self.submitted += 1
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Block until every submitted payload has been written"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def close(self):
+        """Flush outstanding writes and stop the worker thread"""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def take_error(self):
+        """Return (and clear) the last error raised by the worker, if any"""
+        with self._cond:
+            error, self._error = self._error, None
+            return error
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                text, self._pending = self._pending, None
+                self._writing = True
+            try:
+                atomic_write(self.path, text)
+            except Exception as e:
+                print(f"Save error: {e}")  # Debug print
+                with self._cond:
+                    self._error = e
+            else:
+                with self._cond:
+                    self.written += 1
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+
+def migration(from_version):
+    """Register a step that upgrades a todo list from from_version to the next version"""
+    def register(step):
+        MIGRATIONS[from_version] = step
+        return step
+    return register
+
+
+@migration(1)
+def ensure_todo_fields(todos):
+    """Ensure all todo items have required fields for backward compatibility"""
+    for todo in todos:
+        if "children" not in todo:
+            todo["children"] = []
+        # Ensure completed field exists and preserve its value
+        if "completed" not in todo:
+            todo["completed"] = False
+        # Ensure new fields exist with defaults
+        if "priority" not in todo:
+            todo["priority"] = "Medium"
+        if "due_date" not in todo:
+            todo["due_date"] = ""
+        if "create_date" not in todo:
+            todo["create_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Recursively process children
+        if todo["children"]:
+            todo["children"] = ensure_todo_fields(todo["children"])
+    return todos
+
+
+@migration(2)
+def assign_todo_ids(todos):
+    """Give every todo without an "id" a unique integer one, above any existing id"""
+    next_id = 1
+    missing = []
+    pending = list(reversed(todos))
+    # Depth-first in display order so ids follow the tree from top to bottom
+    while pending:
+        todo = pending.pop()
+        if "id" in todo:
+            next_id = max(next_id, todo["id"] + 1)
+        else:
+            missing.append(todo)
+        pending.extend(reversed(todo["children"]))
+    for todo in missing:
+        todo["id"] = next_id
+        next_id += 1
+    return todos
+
+
+def migrate_todos(todos, version):
+    """Run every registered step needed to bring todos from version to SCHEMA_VERSION"""
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"todos.json uses schema version {version}, newer than this app ({SCHEMA_VERSION})")
+    while version < SCHEMA_VERSION:
+        todos = MIGRATIONS[version](todos)
+        version += 1
+    return todos
+
+
+def parse_document(document):
+    """Return (version, todos) for a decoded todos.json document"""
+    if isinstance(document, list):
+        return 1, document  # Unversioned file from before the header existed
+    return document["version"], document["todos"]
+
+
+def dump_document(todos):
+    """Serialize todos (Todo or saved dicts) as a current-version todos.json document"""
+    # "version" comes first so readers can stream the todo list that follows
+    return json.dumps({"version": SCHEMA_VERSION, "todos": todos}, indent=2, ensure_ascii=False,
+                      default=Todo.to_json)
+
+
+# Sort keys are plain typed values (ints and casefolded strings) so they can
+# be computed once per todo, cached and compared cheaply; a Todo holds the
+# dates and the priority that way already
+
+def create_date_key(todo):
+    """Seconds since 0001-01-01 of the create date (unparsable dates first)"""
+    return todo.created
+
+
+def priority_key(todo):
+    return todo.priority
+
+
+def due_date_key(todo):
+    """Day ordinal of the due date (items without one at the end)"""
+    return todo.due
+
+
+def name_key(todo):
+    return todo.text.casefold()
+
+
+SORT_KEYS = {
+    "Create Date": create_date_key,
+    "Priority": priority_key,
+    "Due Date": due_date_key,
+    "Name": name_key,
+}
+
+
+def todo_sort_key(sort_by):
+    """Return the key function used to order sibling todos"""
+    return SORT_KEYS.get(sort_by, lambda todo: 0)
+
+
+def sort_todo_list(todos, sort_by, ascending=True):
+    """Recursively sort a todo list in place by the given criterion"""
+    get_sort_key = todo_sort_key(sort_by)
+    pending = [todos]
+    while pending:
+        todos_list = pending.pop()
+        todos_list.sort(key=get_sort_key, reverse=not ascending)
+        pending.extend(todo.children for todo in todos_list if todo.children)
+
+
+def set_children_completed(todo, completed):
+    """Recursively mark all descendants of a todo as completed or uncompleted"""
+    for child in todo.children:
+        child.completed = completed
+        set_children_completed(child, completed)
+
+
+def todo_at(todos, path):
+    """Return the todo addressed by a list of sibling indexes"""
+    todo = None
+    for index in path:
+        todo = todos[index]
+        todos = todo.children
+    return todo
+
+
+def apply_change(todos, change):
+    """Replay one journal record onto a list of Todo (must mirror TodoStore.apply)"""
+    op = change["op"]
+    if op == "add":
+        siblings = todo_at(todos, change["path"]).children if change["path"] else todos
+        # Without a row the item is appended
+        siblings.insert(change.get("row", len(siblings)), Todo.from_dict(change["item"]))
+    elif op == "edit":
+        # The fields as saved
+        todo_at(todos, change["path"]).update(change["fields"])
+    elif op == "remove":
+        path = change["path"]
+        siblings = todo_at(todos, path[:-1]).children if len(path) > 1 else todos
+        del siblings[path[-1]]
+    elif op == "move":
+        # Journals written while the store kept siblings in sort order hold
+        # these and "sort" records; the store makes neither any more
+        path = change["path"]
+        siblings = todo_at(todos, path[:-1]).children if len(path) > 1 else todos
+        siblings.insert(change["row"], siblings.pop(path[-1]))
+    elif op == "complete":
+        todo = todo_at(todos, change["path"])
+        todo.completed = change["completed"]
+        set_children_completed(todo, change["completed"])
+    elif op == "clear_completed":
+        todos[:] = [todo for todo in todos if not todo.completed]
+    elif op == "clear_all":
+        todos.clear()
+    elif op == "batch":
+        # The changes of one bulk action, in the order they were made
+        for sub_change in change["changes"]:
+            apply_change(todos, sub_change)
+    elif op == "sort":
+        sort_todo_list(todos, change["by"], change["ascending"])
+    else:
+        raise ValueError(f"Unknown journal op: {op}")
+
+
+class SnapshotCache:
+    """Binary copy of an already-migrated todo tree, kept next to todos.json
+
+    The cache is a marshal dump of the todos as Todo.pack() tuples behind a
+    small header recording the mtime and size of the JSON file it was made
+    from. It is only used while those still match, which lets startup skip
+    JSON parsing, the migration pass and converting the dates.
+    """
+
+    MAGIC = b"TODOCACHE"
+    FORMAT = 2
+    # magic, format, schema version, Python major/minor, marshal version, source mtime_ns, source size
+    HEADER = struct.Struct("<9sHHBBHqq")
+
+    def __init__(self, path):
+        self.path = path
+
+    def _header(self, source_path):
+        stat = os.stat(source_path)
+        return self.HEADER.pack(self.MAGIC, self.FORMAT, SCHEMA_VERSION, *sys.version_info[:2],
+                                marshal.version, stat.st_mtime_ns, stat.st_size)
+
+    def read(self, source_path):
+        """Return the cached todos, or None if the cache is missing or stale"""
+        try:
+            expected = self._header(source_path)
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:self.HEADER.size] != expected:
+                    return None
+                # Decode straight from the mapping without copying the payload
+                with memoryview(mm) as view, view[self.HEADER.size:] as payload, gc_paused():
+                    return [Todo.unpack(packed) for packed in marshal.loads(payload)]
+        except (OSError, ValueError, EOFError, TypeError):
+            # Missing, empty (mmap can't map 0 bytes) or corrupt cache
+            return None
+
+    def write(self, source_path, todos):
+        """Cache todos (Todo, or dicts as saved) as the migrated contents of source_path as it is now"""
+        packed = [Todo.from_dict(todo).pack() for todo in todos]
+        atomic_write(self.path, self._header(source_path) + marshal.dumps(packed))
+
+
+class JsonStorage:
+    """Whole-document storage: todos.json rewritten by a write-behind thread"""
+
+    incremental = False  # Needs the full list on save; has no apply()
+
+    def __init__(self, path):
+        self.path = path
+        self.writer = WriteBehindWriter(path)
+        self.cache = SnapshotCache(path + ".cache")
+        # The list that todos.json holds once pending writes finish, and
+        # whether the cache still has to be refreshed from it on close
+        self._snapshot = None
+        self._cache_stale = False
+
+    def load(self):
+        """Load todos.json, creating an empty file if it doesn't exist
+
+        Files written by an older version are migrated once and saved back.
+        """
+        if not os.path.exists(self.path):
+            self.save([])
+            return []
+        todos = self.cache.read(self.path)
+        if todos is not None:
+            self._snapshot, self._cache_stale = todos, False
+            return todos
+        with open(self.path, 'r', encoding='utf-8') as f, gc_paused():
+            version, todos = parse_document(json.load(f))
+            if version != SCHEMA_VERSION:
+                todos = migrate_todos(todos, version)
+            todos = todos_from_dicts(todos)
+        if version != SCHEMA_VERSION:
+            self.save(todos)
+        self._snapshot, self._cache_stale = todos, True
+        return todos
+
+    def stream(self, first_batch=100, batch_size=1000):
+        """Yield (todos, progress) batches of root items while parsing todos.json
+
+        The first batch is small so the first screen can be shown right away;
+        progress is the fraction of the file read so far. Files that need
+        migrating are loaded (and saved back) in one pass instead.
+        """
+        if not os.path.exists(self.path):
+            self.save([])
+            yield [], 1.0
+            return
+        todos = self.cache.read(self.path)
+        if todos is not None:
+            # Already migrated and decoded in one go; no need to stream
+            self._snapshot, self._cache_stale = todos, False
+            yield todos, 1.0
+            return
+        self._snapshot, self._cache_stale = [], True
+        total = os.path.getsize(self.path) or 1
+        consumed = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            def read(size):
+                nonlocal consumed
+                chunk = f.read(size)
+                consumed += len(chunk)  # Characters, close enough to bytes for progress
+                return chunk
+
+            header, read = open_document_stream(read)
+            current = header.get("version") == SCHEMA_VERSION
+            if current:
+                batch, limit = [], first_batch
+                for todo in iter_json_array(read):
+                    batch.append(Todo.from_dict(todo))
+                    if len(batch) >= limit:
+                        self._snapshot.extend(batch)
+                        yield batch, min(consumed / total, 1.0)
+                        batch, limit = [], batch_size
+                self._snapshot.extend(batch)
+                yield batch, 1.0
+        if not current:
+            yield self.load(), 1.0
+
+    def save(self, todos):
+        """Queue the whole list for a background write"""
+        # Report a failure from a previous background write
+        error = self.writer.take_error()
+        if error is not None:
+            raise error
+        # Serialize on the caller's thread (the list is not shared), write on the worker
+        self.writer.submit(dump_document(todos))
+        self._snapshot, self._cache_stale = todos, True
+
+    def close(self):
+        self.writer.close()
+        error = self.writer.take_error()
+        if error is not None:
+            raise error
+        # todos.json is final now, so the cache can be stamped with its mtime
+        if self._cache_stale and self._snapshot is not None:
+            self.cache.write(self.path, self._snapshot)
+            self._cache_stale = False
+
+    def stats(self):
+        return {"written": self.writer.written, "coalesced": self.writer.coalesced}
+
+
+def snapshot_hash(data):
+    """Fingerprint of a snapshot file's bytes, used to pair a journal with it"""
+    return hashlib.sha1(data).hexdigest()
+
+
+class JournalStorage:
+    """Append-only mutation log kept next to the todos.json snapshot
+
+    Each mutation is appended as one JSON line, so the cost of saving is
+    proportional to the change rather than to the size of the list. The
+    first line of the journal records the hash of the snapshot it applies
+    to; a journal whose base no longer matches (e.g. after a crash between
+    writing a compacted snapshot and resetting the log) is discarded.
+
+    Appends and compaction both run on one worker thread, so records are
+    written in order and compaction never races with an append.
+    """
+
+    def __init__(self, snapshot_path, compact_threshold=256 * 1024):
+        self.snapshot_path = snapshot_path
+        self.path = snapshot_path + ".journal"
+        self.compact_threshold = compact_threshold
+        self.appended = 0  # Records written to the journal
+        self.compactions = 0  # Times the journal was folded into the snapshot
+        self._size = 0
+        self._file = None
+        self._error = None
+        self._queue = queue.Queue()
+        self._thread = None
+
+    incremental = True  # Consumes change records via apply()
+
+    def load(self):
+        """Load the snapshot, replay the journal onto it and start the worker
+
+        A snapshot written by an older version is migrated and written back
+        first, so every record appended from now on applies to exactly what
+        is on disk.
+        """
+        if not os.path.exists(self.snapshot_path):
+            atomic_write(self.snapshot_path, dump_document([]))
+        with open(self.snapshot_path, 'rb') as f:
+            data = f.read()
+        with gc_paused():
+            version, todos = parse_document(json.loads(data.decode('utf-8')))
+            todos = todos_from_dicts(migrate_todos(todos, version))
+        records = self._read_records(snapshot_hash(data))
+        if version != SCHEMA_VERSION:
+            for change in records or []:
+                apply_change(todos, change)
+            # Items added by old records predate ids too
+            assign_todo_ids(todos)
+            text = dump_document(todos)
+            atomic_write(self.snapshot_path, text)
+            data = text.encode('utf-8')
+            records = None
+        for change in records or []:
+            apply_change(todos, change)
+        if records is None or not os.path.exists(self.path):
+            self._reset(snapshot_hash(data))
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._size = os.path.getsize(self.path)
+        self._thread = threading.Thread(target=self._run, name="todo-journal", daemon=True)
+        self._thread.start()
+        return todos
+
+    def stream(self):
+        """Yield the whole list as one batch (the journal replays onto a full snapshot)"""
+        yield self.load(), 1.0
+
+    def apply(self, change):
+        """Queue one mutation record for the journal"""
+        self._raise_error()
+        self._queue.put(("append", json.dumps(change, ensure_ascii=False, default=Todo.to_json)))
+
+    def save(self, todos):
+        """Queue a compaction of the journal into the snapshot
+
+        The journal already holds every change, so todos is not needed.
+        """
+        self._raise_error()
+        self._queue.put(("compact", None))
+
+    def flush(self):
+        """Block until every queued record has been written"""
+        self._queue.join()
+
+    def close(self):
+        """Flush outstanding records and stop the worker thread"""
+        if self._thread is None:
+            return
+        self._queue.put(("stop", None))
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+        self._raise_error()
+
+    def stats(self):
+        return {"written": self.appended, "compactions": self.compactions}
+
+    def _raise_error(self):
+        # Report a failure from the worker thread on the caller's thread
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _read_records(self, base):
+        # Returns [] for an empty journal and None if it belongs to another snapshot
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            header = f.readline()
+            try:
+                if json.loads(header).get("base") != base:
+                    return None
+            except ValueError:
+                return None
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break  # Torn final line from an interrupted append
+        return records
+
+    def _reset(self, base):
+        # Start a fresh journal that applies to the snapshot with the given hash
+        atomic_write(self.path, json.dumps({"base": base}) + "\n")
+
+    def _run(self):
+        while True:
+            task, payload = self._queue.get()
+            try:
+                if task == "stop":
+                    return
+                if task == "append":
+                    self._file.write(payload + "\n")
+                    self._size += len(payload) + 1
+                    self.appended += 1
+                # Drain whatever else is already queued before syncing once
+                if self._queue.empty() or task == "compact":
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                if task == "compact" or self._size > self.compact_threshold:
+                    self._compact()
+            except Exception as e:
+                print(f"Journal error: {e}")  # Debug print
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _compact(self):
+        # Rebuild the current state from disk (never from the GUI's live list)
+        self._file.close()
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                data = f.read()
+            _, todos = parse_document(json.loads(data.decode('utf-8')))
+            todos = todos_from_dicts(todos)
+            for change in self._read_records(snapshot_hash(data)) or []:
+                apply_change(todos, change)
+            text = dump_document(todos)
+            atomic_write(self.snapshot_path, text)
+            self._reset(snapshot_hash(text.encode('utf-8')))
+            self.compactions += 1
+        finally:
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._size = os.path.getsize(self.path)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY,
+    parent_id INTEGER REFERENCES todos(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    priority TEXT NOT NULL DEFAULT 'Medium',
+    due_date TEXT NOT NULL DEFAULT '',
+    create_date TEXT NOT NULL DEFAULT '',
+    task_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_todos_parent ON todos(parent_id, position);
+CREATE INDEX IF NOT EXISTS idx_todos_completed ON todos(completed);
+CREATE INDEX IF NOT EXISTS idx_todos_priority ON todos(priority);
+CREATE INDEX IF NOT EXISTS idx_todos_due_date ON todos(due_date);
+"""
+
+# Fields an "edit" change may update, mapped to their columns
+SQLITE_EDITABLE_COLUMNS = ("text", "priority", "due_date")
+
+
+class SqliteStorage:
+    """Adjacency-list storage in SQLite
+
+    Every task is one row pointing at its parent, ordered by position among
+    its siblings. Change records are applied as a handful of single-row
+    statements in one transaction instead of rewriting the whole list.
+    """
+
+    incremental = True  # Consumes change records via apply()
+
+    def __init__(self, path, import_from=None):
+        self.path = path
+        self.import_from = import_from  # todos.json migrated on first open
+        self.changes = 0
+        self.conn = None
+
+    def open(self):
+        """Open (creating if needed) the database; returns True if it was created"""
+        if self.conn is not None:
+            return False
+        created = not os.path.exists(self.path)
+        # The connection is opened by the background loader and then used by the GUI
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SQLITE_SCHEMA)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(todos)")]
+        if "task_id" not in columns:
+            # Database from before task ids; the row ids are unique already
+            with self.conn:
+                self.conn.execute("ALTER TABLE todos ADD COLUMN task_id INTEGER")
+                self.conn.execute("UPDATE todos SET task_id = id")
+        self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_todos_task_id ON todos(task_id)")
+        return created
+
+    def load(self):
+        """Load the whole tree"""
+        if self.open() and self.import_from and os.path.exists(self.import_from):
+            # One-shot migration of an existing todos.json
+            with open(self.import_from, 'r', encoding='utf-8') as f:
+                version, todos = parse_document(json.load(f))
+            self.save(migrate_todos(todos, version))
+        rows = self.conn.execute("""
+            SELECT id, parent_id, task_id, text, completed, priority, due_date, create_date
+            FROM todos ORDER BY parent_id, position
+        """).fetchall()
+        nodes = {}
+        for todo_id, _, task_id, text, completed, priority, due_date, create_date in rows:
+            nodes[todo_id] = Todo(text, bool(completed), priority, due_date, create_date, id=task_id)
+        # Link in a second pass: a child can have a smaller id than its parent
+        todos = []
+        for todo_id, parent_id, *_ in rows:
+            siblings = todos if parent_id is None else nodes[parent_id].children
+            siblings.append(nodes[todo_id])
+        return todos
+
+    def stream(self):
+        """Yield the whole tree as one batch"""
+        yield self.load(), 1.0
+
+    def apply(self, change):
+        """Apply one change record (a batch as a whole) in a single transaction"""
+        with self.conn:
+            self._apply(change)
+        self.changes += 1
+
+    def _apply(self, change):
+        op = change["op"]
+        if op == "batch":
+            for sub_change in change["changes"]:
+                self._apply(sub_change)
+        elif op == "add":
+            parent_id = self._resolve(change["path"])
+            if "row" in change:
+                position = change["row"]
+                self.conn.execute(
+                    "UPDATE todos SET position = position + 1 WHERE parent_id IS ? AND position >= ?",
+                    (parent_id, position))
+            else:
+                (position,) = self.conn.execute(
+                    "SELECT COUNT(*) FROM todos WHERE parent_id IS ?", (parent_id,)).fetchone()
+            self._insert(change["item"], parent_id, position)
+        elif op == "edit":
+            fields = {k: v for k, v in change["fields"].items() if k in SQLITE_EDITABLE_COLUMNS}
+            assignments = ", ".join(f"{column} = ?" for column in fields)
+            self.conn.execute(f"UPDATE todos SET {assignments} WHERE id = ?",
+                              (*fields.values(), self._resolve(change["path"])))
+        elif op == "remove":
+            todo_id = self._resolve(change["path"])
+            parent_id, position = self.conn.execute(
+                "SELECT parent_id, position FROM todos WHERE id = ?", (todo_id,)).fetchone()
+            self.conn.execute("DELETE FROM todos WHERE id = ?", (todo_id,))
+            self.conn.execute(
+                "UPDATE todos SET position = position - 1 WHERE parent_id IS ? AND position > ?",
+                (parent_id, position))
+        elif op == "complete":
+            self.conn.execute("""
+                WITH RECURSIVE subtree(id) AS (
+                    SELECT ? UNION ALL
+                    SELECT t.id FROM todos t JOIN subtree ON t.parent_id = subtree.id
+                )
+                UPDATE todos SET completed = ? WHERE id IN subtree
+            """, (self._resolve(change["path"]), int(change["completed"])))
+        elif op == "clear_completed":
+            self.conn.execute("DELETE FROM todos WHERE parent_id IS NULL AND completed = 1")
+            self.conn.execute("""
+                WITH ranked AS (
+                    SELECT id, ROW_NUMBER() OVER (ORDER BY position) - 1 AS rank
+                    FROM todos WHERE parent_id IS NULL
+                )
+                UPDATE todos SET position = ranked.rank FROM ranked WHERE todos.id = ranked.id
+            """)
+        elif op == "clear_all":
+            self.conn.execute("DELETE FROM todos")
+        else:
+            raise ValueError(f"Unknown change op: {op}")
+
+    def save(self, todos):
+        """Replace the whole database with todos (import)"""
+        self.open()
+        with self.conn:
+            self.conn.execute("DELETE FROM todos")
+            for position, todo in enumerate(todos):
+                self._insert(todo, None, position)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def stats(self):
+        return {"written": self.changes}
+
+    def _resolve(self, path):
+        # Map a list of sibling indexes to a row id (None for the root)
+        todo_id = None
+        for index in path:
+            row = self.conn.execute(
+                "SELECT id FROM todos WHERE parent_id IS ? AND position = ?", (todo_id, index)).fetchone()
+            if row is None:
+                raise IndexError(f"No todo at {path}")
+            todo_id = row[0]
+        return todo_id
+
+    def _insert(self, todo, parent_id, position):
+        cursor = self.conn.execute(
+            "INSERT INTO todos (parent_id, position, text, completed, priority, due_date, create_date, task_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (parent_id, position, todo["text"], int(todo.get("completed", False)),
+             todo.get("priority", "Medium"), todo.get("due_date", ""), todo.get("create_date", ""),
+             todo.get("id")))
+        for child_position, child in enumerate(todo.get("children", [])):
+            self._insert(child, cursor.lastrowid, child_position)
+
+
+def open_storage(todo_file, kind="json"):
+    """Create the storage backend selected by kind ("json", "journal" or "sqlite")"""
+    if kind == "json":
+        return JsonStorage(todo_file)
+    if kind == "journal":
+        return JournalStorage(todo_file)
+    if kind == "sqlite":
+        return SqliteStorage(os.path.splitext(todo_file)[0] + ".db", import_from=todo_file)
+    raise ValueError(f"Unknown storage backend: {kind}")
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """One-shot import of a todos.json file into a new SQLite database"""
+    if os.path.exists(db_path):
+        raise FileExistsError(f"{db_path} already exists")
+    storage = SqliteStorage(db_path, import_from=json_path)
+    try:
+        storage.load()
+    finally:
+        storage.close()
+
+
+def export_sqlite_to_json(db_path, json_path):
+    """Write the contents of a SQLite database out as a todos.json file"""
+    storage = SqliteStorage(db_path)
+    try:
+        todos = storage.load()
+    finally:
+        storage.close()
+    atomic_write(json_path, dump_document(todos))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert todo lists between JSON and SQLite storage")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="import a todos.json file into a new SQLite database")
+    migrate_parser.add_argument("json_path")
+    migrate_parser.add_argument("db_path")
+    export_parser = commands.add_parser("export", help="export a SQLite database to a todos.json file")
+    export_parser.add_argument("db_path")
+    export_parser.add_argument("json_path")
+    args = parser.parse_args()
+    if args.command == "migrate":
+        migrate_json_to_sqlite(args.json_path, args.db_path)
+    else:
+        export_sqlite_to_json(args.db_path, args.json_path)
@@ -0,0 +1,511 @@
+"""In-memory todo tree with change notifications
+
+TodoStore owns the list of todos shown by the UI and performs every
+mutation on it. Listeners are told about each change as it happens: before
+and after rows are inserted, removed or moved under a parent, and when the
+fields of a todo change. That is what lets a view update just the rows a
+change touches instead of rebuilding the whole tree. The store keeps todos in
+the order they are saved in; sorting them for display is up to the view.
+
+The todos are Todo nodes (see todo_node); the methods that take todos also
+take dicts as saved in todos.json and convert them.
+
+Parents and rows are addressed by paths, lists of sibling indexes from the
+root ([] is the invisible root), the same addressing the storages use. Every
+todo also has a unique integer id, and the store keeps an index from ids
+to todos and to their parents so a todo can be found without walking the
+tree. The total and completed counts are kept up to date the same way.
+
+Each todo also has a cached roll-up of its subtree (see Rollup). A change
+only recomputes the roll-ups of the todos on the path from the change up to
+the root, each from the roll-ups of its children.
+
+Mutations made inside batch() are announced as usual, but listeners are also
+told where the batch starts and ends so they can hold back their own updates
+(a view repainting, say) until the end, and the roll-up changes are
+announced once, after the last mutation.
+
+apply() makes a change described by one of the change records the storages
+save and returns the record that undoes it (see TodoHistory).
+
+Nothing here depends on Qt: a view adapts the listener callbacks to its own
+toolkit (see TodoTreeModel), and TodoSession pairs a store with a storage.
+"""
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator
+
+from todo_node import NO_DUE_DATE, Todo, todos_from_dicts
+from todo_storage import todo_at
+
+
+# Sibling indexes from the root; [] is the invisible root
+Path = list[int]
+# A change record, e.g. {"op": "edit", "path": [0, 2], "fields": {"text": "..."}}
+# (see todo_storage.apply_change for the ops)
+Change = dict[str, Any]
+
+
+# Aggregates over the descendants of a todo (not the todo itself):
+# descendants - number of descendants
+# completed - how many of them are completed
+# earliest_due - day ordinal of the earliest due date of an open descendant
+#   (NO_DUE_DATE if none)
+# top_priority - highest Priority of an open descendant (0 if none)
+Rollup = namedtuple("Rollup", "descendants completed earliest_due top_priority")
+EMPTY_ROLLUP = Rollup(0, 0, NO_DUE_DATE, 0)
+
+
+def walk(todos: Iterable[Todo]) -> Iterator[Todo]:
+    """Yield todos and all of their descendants"""
+    pending = list(todos)
+    while pending:
+        todo = pending.pop()
+        yield todo
+        pending.extend(todo.children)
+
+
+class TodoStoreListener:
+    """Callbacks a TodoStore makes around each mutation; all default to no-ops
+
+    first and last are inclusive row numbers under parent_path.
+    """
+
+    def about_to_reset(self):
+        pass
+
+    def reset(self):
+        pass
+
+    def about_to_insert(self, parent_path, first, last):
+        pass
+
+    def inserted(self, parent_path, first, last):
+        pass
+
+    def about_to_remove(self, parent_path, first, last):
+        pass
+
+    def removed(self, parent_path, first, last):
+        pass
+
+    def changed(self, path, recursive):
+        pass
+
+    def rolled_up(self, todos):
+        """The roll-ups of these todos changed"""
+        pass
+
+    def batch_started(self):
+        pass
+
+    def batch_finished(self):
+        pass
+
+
+class TodoStore:
+    """The todo tree and the operations the UI performs on it"""
+
+    def __init__(self, debug=False):
+        # Never rebound, so other holders of the list always see the current tree
+        self.todos = []
+        self.listeners = []
+        self.nodes = {}  # id -> todo
+        self.parents = {}  # id -> parent todo (None for root todos)
+        self.next_id = 1
+        # Counts over the whole tree, adjusted by every mutation
+        self.total = 0
+        self.completed = 0
+        self.rollups = {}  # id -> Rollup
+        self._batch_depth = 0
+        # Todos whose roll-ups changed during the batch in progress, by id
+        self._rolled_up = None
+        # Recount everything after each mutation and fail loudly on a mismatch
+        self.debug = debug
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def _notify(self, event, *args):
+        for listener in self.listeners:
+            getattr(listener, event)(*args)
+        if self.debug and not event.startswith("about_to"):
+            self.verify()
+
+    def verify(self):
+        """Check the id index and the counters against a full walk of the tree"""
+        total = completed = 0
+        visited = []
+        pending = [(todo, None) for todo in self.todos]
+        while pending:
+            todo, parent = pending.pop()
+            visited.append(todo)
+            total += 1
+            completed += todo.completed
+            assert self.nodes.get(todo.id) is todo, f"todo {todo.id} missing from the id index"
+            assert self.parents[todo.id] is parent, f"wrong parent indexed for todo {todo.id}"
+            pending.extend((child, todo) for child in todo.children)
+        assert len(self.nodes) == total, f"{len(self.nodes)} todos indexed, {total} in the tree"
+        recounted = {}
+        for todo in reversed(visited):
+            recounted[todo.id] = expected = self._compute_rollup(todo, lambda child: recounted[child.id])
+            assert self.rollups[todo.id] == expected, (
+                f"roll-up of todo {todo.id} is {self.rollups[todo.id]}, recount gives {expected}")
+        assert (self.total, self.completed) == (total, completed), (
+            f"counters say {self.total} total / {self.completed} completed, "
+            f"recount gives {total} / {completed}")
+
+    def children(self, parent_path: Path) -> list[Todo]:
+        """Return the sibling list under a parent path"""
+        return todo_at(self.todos, parent_path).children if parent_path else self.todos
+
+    def get(self, todo_id: int) -> Todo:
+        """Return the todo with the given id"""
+        return self.nodes[todo_id]
+
+    def parent_of(self, todo: Todo) -> Todo | None:
+        """Return the parent todo of a todo (None for root todos)"""
+        return self.parents[todo.id]
+
+    def path_of(self, todo: Todo) -> Path:
+        """Return the path of a todo"""
+        path = []
+        while todo is not None:
+            parent = self.parents[todo.id]
+            path.append((self.todos if parent is None else parent.children).index(todo))
+            todo = parent
+        path.reverse()
+        return path
+
+    def paths_of(self, todos: Iterable[Todo]) -> list[Path]:
+        """Return the paths of many todos, looking up the rows of each sibling list once"""
+        rows = {}  # parent id (None for the roots) -> {todo id: row}
+
+        def row_of(todo):
+            parent = self.parents[todo.id]
+            key = None if parent is None else parent.id
+            siblings = rows.get(key)
+            if siblings is None:
+                siblings = rows[key] = {
+                    child.id: row for row, child in enumerate(self.todos if parent is None else parent.children)
+                }
+            return siblings[todo.id]
+
+        paths = []
+        for todo in todos:
+            path = []
+            while todo is not None:
+                path.append(row_of(todo))
+                todo = self.parents[todo.id]
+            path.reverse()
+            paths.append(path)
+        return paths
+
+    def outermost(self, todos: Iterable[Todo]) -> list[Todo]:
+        """Leave out the todos that are descendants of other todos in todos"""
+        ids = {todo.id for todo in todos}
+        kept = []
+        for todo in todos:
+            parent = self.parents[todo.id]
+            while parent is not None and parent.id not in ids:
+                parent = self.parents[parent.id]
+            if parent is None:
+                kept.append(todo)
+        return kept
+
+    def rollup(self, todo: Todo) -> Rollup:
+        """Return the cached Rollup of a todo's subtree"""
+        return self.rollups[todo.id]
+
+    def count_completed_roots(self) -> int:
+        """Return how many root todos are completed (what clear_completed removes)"""
+        return sum(todo.completed for todo in self.todos)
+
+    def _compute_rollup(self, todo, rollup_of):
+        """Combine the children of a todo and their roll-ups into its roll-up"""
+        descendants = completed = top_priority = 0
+        earliest_due = NO_DUE_DATE
+        for child in todo.children:
+            sub = rollup_of(child)
+            descendants += 1 + sub.descendants
+            completed += sub.completed
+            if child.completed:
+                completed += 1
+            else:
+                earliest_due = min(earliest_due, child.due)
+                top_priority = max(top_priority, child.priority)
+            earliest_due = min(earliest_due, sub.earliest_due)
+            top_priority = max(top_priority, sub.top_priority)
+        if not descendants:
+            return EMPTY_ROLLUP
+        return Rollup(descendants, completed, earliest_due, top_priority)
+
+    def _update_rollups(self, todos):
+        """Recompute the roll-ups of todos (ordered children before parents)"""
+        for todo in todos:
+            self.rollups[todo.id] = self._compute_rollup(todo, self.rollup)
+
+    def _roll_up_from(self, todo):
+        """Recompute the roll-ups from todo (None for none) up to its root; return that chain"""
+        chain = []
+        while todo is not None:
+            chain.append(todo)
+            todo = self.parents[todo.id]
+        self._update_rollups(chain)
+        return chain
+
+    def _notify_rolled_up(self, chain):
+        # After the change itself has been announced
+        if not chain:
+            return
+        if self._rolled_up is not None:
+            for todo in chain:
+                self._rolled_up.setdefault(todo.id, todo)
+            return
+        self._notify("rolled_up", chain)
+
+    @contextmanager
+    def batch(self):
+        """Group the mutations made in a with block (batches may nest)"""
+        self._batch_depth += 1
+        if self._batch_depth == 1:
+            self._rolled_up = {}
+            self._notify("batch_started")
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                rolled_up, self._rolled_up = self._rolled_up, None
+                # Leave out todos the batch went on to remove
+                todos = [todo for todo_id, todo in rolled_up.items() if self.nodes.get(todo_id) is todo]
+                if todos:
+                    self._notify("rolled_up", todos)
+                self._notify("batch_finished")
+
+    def _index(self, todos, parent):
+        """Add todos and their descendants to the id index
+
+        Todos without an id (or whose id is already taken) get a new one.
+        """
+        added = []
+        pending = [(todo, parent) for todo in todos]
+        while pending:
+            todo, parent = pending.pop()
+            added.append((todo, parent))
+            pending.extend((child, todo) for child in todo.children)
+        # Take ids loaded from disk first so new ones are never reused
+        for todo, _ in added:
+            if todo.id is not None:
+                self.next_id = max(self.next_id, todo.id + 1)
+        for todo, parent in added:
+            if todo.id is None or todo.id in self.nodes:
+                todo.id = self.next_id
+                self.next_id += 1
+            self.nodes[todo.id] = todo
+            self.parents[todo.id] = parent
+            self.completed += todo.completed
+        self.total += len(added)
+        # Parents come before their children in added
+        self._update_rollups(todo for todo, _ in reversed(added))
+
+    def _unindex(self, todos):
+        """Drop todos and their descendants from the id index"""
+        pending = list(todos)
+        while pending:
+            todo = pending.pop()
+            del self.nodes[todo.id]
+            del self.parents[todo.id]
+            del self.rollups[todo.id]
+            self.total -= 1
+            self.completed -= todo.completed
+            pending.extend(todo.children)
+
+    def reset(self, todos: list[Todo]) -> None:
+        """Replace the whole tree"""
+        self._notify("about_to_reset")
+        self.todos[:] = todos_from_dicts(todos)
+        self.nodes.clear()
+        self.parents.clear()
+        self.rollups.clear()
+        self.total = self.completed = 0
+        self._index(self.todos, None)
+        self._notify("reset")
+
+    def append_roots(self, todos: list[Todo]) -> None:
+        """Append root todos, e.g. a batch that has just been loaded"""
+        self.append([], todos)
+
+    def append(self, parent_path: Path, todos: list[Todo]) -> int:
+        """Append todos under a parent in one insertion; return the row of the first
+
+        Todos that keep their ids (e.g. ones just removed from elsewhere in
+        the tree) keep them here too.
+        """
+        siblings = self.children(parent_path)
+        first = len(siblings)
+        if not todos:
+            return first
+        todos = todos_from_dicts(todos)
+        self._notify("about_to_insert", parent_path, first, first + len(todos) - 1)
+        siblings.extend(todos)
+        parent = todo_at(self.todos, parent_path)
+        self._index(todos, parent)
+        chain = self._roll_up_from(parent)
+        self._notify("inserted", parent_path, first, first + len(todos) - 1)
+        self._notify_rolled_up(chain)
+        return first
+
+    def insert(self, parent_path: Path, todo: Todo, row: int | None = None) -> int:
+        """Insert a todo under a parent (at the end by default) and return its row
+
+        The todo is given an id if it doesn't have one yet.
+        """
+        todo = Todo.from_dict(todo)
+        parent = todo_at(self.todos, parent_path)
+        siblings = self.children(parent_path)
+        if row is None:
+            row = len(siblings)
+        self._notify("about_to_insert", parent_path, row, row)
+        siblings.insert(row, todo)
+        self._index([todo], parent)
+        chain = self._roll_up_from(parent)
+        self._notify("inserted", parent_path, row, row)
+        self._notify_rolled_up(chain)
+        return row
+
+    def remove(self, path: Path) -> None:
+        """Remove a todo and its children"""
+        parent_path, row = path[:-1], path[-1]
+        self._notify("about_to_remove", parent_path, row, row)
+        siblings = self.children(parent_path)
+        self._unindex(siblings[row:row + 1])
+        del siblings[row]
+        chain = self._roll_up_from(todo_at(self.todos, parent_path))
+        self._notify("removed", parent_path, row, row)
+        self._notify_rolled_up(chain)
+
+    def update(self, path: Path, fields: dict[str, Any]) -> None:
+        """Change fields (text, priority, due date) of one todo"""
+        todo = todo_at(self.todos, path)
+        todo.update(fields)
+        chain = self._roll_up_from(self.parents[todo.id])
+        self._notify("changed", path, False)
+        self._notify_rolled_up(chain)
+
+    def set_completed(self, path: Path, completed: bool) -> None:
+        """Mark a todo and all of its descendants completed or uncompleted"""
+        # Same cascade as set_children_completed, counting the todos that flip
+        top = todo_at(self.todos, path)
+        subtree = []
+        pending = [top]
+        while pending:
+            todo = pending.pop()
+            subtree.append(todo)
+            if todo.completed != completed:
+                todo.completed = completed
+                self.completed += 1 if completed else -1
+            pending.extend(todo.children)
+        # Every roll-up in the subtree changes too; children before parents
+        self._update_rollups(reversed(subtree))
+        chain = self._roll_up_from(self.parents[top.id])
+        self._notify("changed", path, True)
+        self._notify_rolled_up(chain)
+
+    def clear_completed(self) -> int:
+        """Remove completed root todos (with their children); return how many went"""
+        removed = 0
+        row = len(self.todos)
+        with self.batch():
+            # Remove runs of completed rows from the end so earlier rows keep their numbers
+            while row > 0:
+                if not self.todos[row - 1].completed:
+                    row -= 1
+                    continue
+                last = row - 1
+                while row > 0 and self.todos[row - 1].completed:
+                    row -= 1
+                self._notify("about_to_remove", [], row, last)
+                self._unindex(self.todos[row:last + 1])
+                del self.todos[row:last + 1]
+                self._notify("removed", [], row, last)
+                removed += last - row + 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove every todo"""
+        if not self.todos:
+            return
+        last = len(self.todos) - 1
+        self._notify("about_to_remove", [], 0, last)
+        self.todos.clear()
+        self.nodes.clear()
+        self.parents.clear()
+        self.rollups.clear()
+        self.total = self.completed = 0
+        self._notify("removed", [], 0, last)
+
+    def apply(self, change: Change) -> Change:
+        """Make the change a change record describes; return the record that undoes it
+
+        The records are the ones the storages save (see apply_change), so an
+        undo can be saved like any other change. The undo record of a removal
+        holds the removed todos themselves rather than copies.
+        """
+        op = change["op"]
+        if op == "add":
+            parent_path = change["path"]
+            # An item given as a saved dict is replaced by the Todo made from
+            # it, so the record saved next carries the id it was given
+            change["item"] = Todo.from_dict(change["item"])
+            row = self.insert(parent_path, change["item"], change.get("row"))
+            return {"op": "remove", "path": parent_path + [row]}
+        if op == "remove":
+            path = change["path"]
+            todo = todo_at(self.todos, path)
+            self.remove(path)
+            return {"op": "add", "path": path[:-1], "row": path[-1], "item": todo}
+        if op == "edit":
+            todo = todo_at(self.todos, change["path"])
+            old = {key: todo[key] for key in change["fields"]}
+            self.update(change["path"], change["fields"])
+            return {"op": "edit", "path": change["path"], "fields": old}
+        if op == "complete":
+            undo = self._completion_undo(change["path"])
+            self.set_completed(change["path"], change["completed"])
+            return undo
+        if op == "clear_completed":
+            rows = [(row, todo) for row, todo in enumerate(self.todos) if todo.completed]
+            self.clear_completed()
+            return {"op": "batch", "changes": [
+                {"op": "add", "path": [], "row": row, "item": todo} for row, todo in rows]}
+        if op == "clear_all":
+            todos = list(self.todos)
+            self.clear()
+            return {"op": "batch", "changes": [{"op": "add", "path": [], "item": todo} for todo in todos]}
+        if op == "batch":
+            with self.batch():
+                undo = [self.apply(sub_change) for sub_change in change["changes"]]
+            undo.reverse()
+            return {"op": "batch", "changes": undo}
+        raise ValueError(f"Unknown change op: {op}")
+
+    def _completion_undo(self, path):
+        """Return the record that puts back the completed states of a subtree
+
+        Completing a todo completes its whole subtree, so the record completes
+        the todo as it is now, then each descendant whose state differs from
+        its parent's, parents first.
+        """
+        top = todo_at(self.todos, path)
+        changes = [{"op": "complete", "path": path, "completed": top.completed}]
+        pending = [(path, top)]
+        while pending:
+            parent_path, parent = pending.pop()
+            for row, child in enumerate(parent.children):
+                child_path = parent_path + [row]
+                if child.completed != parent.completed:
+                    changes.append({"op": "complete", "path": child_path, "completed": child.completed})
+                if child.children:
+                    pending.append((child_path, child))
+        return changes[0] if len(changes) == 1 else {"op": "batch", "changes": changes}